@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+import pytz
+
+from .utils import Attendee
+
+Mode = Literal["optimal", "suboptimal"]
+MODES: Tuple[Mode, Mode] = ("optimal", "suboptimal")
+RESOLUTION = timedelta(minutes=15)
+
+
+class AvailabilityGrid:
+    """
+    The availability of an event's attendees as bit arrays of fixed-size time slots.
+
+    Every attendee gets one row per mode, with a slot set when one of their timeframes
+    covers it completely. The grid is built once per change of the event and all the
+    overlap queries are vectorized over it.
+    """
+
+    def __init__(
+        self, attendees: Dict[str, Attendee], resolution: timedelta = RESOLUTION
+    ):
+        self.resolution = int(resolution.total_seconds())
+        self.user_ids = [int(user_id) for user_id in attendees]
+        self._hourly: Dict[
+            str, Tuple[List[datetime], np.ndarray, np.ndarray, np.ndarray]
+        ] = {}
+
+        frames: Dict[Mode, List[Tuple[int, float, float]]] = {
+            mode: [] for mode in MODES
+        }
+        for row, attendee in enumerate(attendees.values()):
+            for mode in MODES:
+                for timeframe in attendee.get(mode) or []:
+                    start = datetime.fromisoformat(timeframe["from"]).timestamp()
+                    end = datetime.fromisoformat(timeframe["to"]).timestamp()
+                    if end > start:
+                        frames[mode].append((row, start, end))
+
+        bounds = [t for mode in MODES for _, *times in frames[mode] for t in times]
+        if not bounds:
+            self.origin = 0
+            self.slots = 0
+        else:
+            self.origin = int(min(bounds)) // self.resolution * self.resolution
+            self.slots = -(-(int(max(bounds)) - self.origin) // self.resolution)
+
+        self.optimal = self._fill(frames["optimal"])
+        self.suboptimal = self._fill(frames["suboptimal"])
+        self.available = self.optimal | self.suboptimal
+
+    def _fill(self, frames: List[Tuple[int, float, float]]) -> np.ndarray:
+        # +1 at the first fully covered slot and -1 after the last one, so a cumulative
+        # sum along each row marks every covered slot in one pass.
+        diff = np.zeros((len(self.user_ids), self.slots + 1), np.int32)
+        if frames:
+            rows, starts, ends = (np.array(column) for column in zip(*frames))
+            first = np.ceil((starts - self.origin) / self.resolution).astype(np.int64)
+            stop = np.floor((ends - self.origin) / self.resolution).astype(np.int64)
+            valid = stop > first
+            np.add.at(diff, (rows[valid], first[valid]), 1)
+            np.add.at(diff, (rows[valid], stop[valid]), -1)
+        return np.cumsum(diff, axis=1)[:, : self.slots] > 0
+
+    def __len__(self) -> int:
+        return self.slots
+
+    def slot_time(self, slot: int) -> datetime:
+        return datetime.fromtimestamp(
+            self.origin + slot * self.resolution, tz=timezone.utc
+        )
+
+    def counts(self, include_suboptimal: bool = True) -> np.ndarray:
+        """The number of attendees available in every slot."""
+        grid = self.available if include_suboptimal else self.optimal
+        return grid.sum(axis=0)
+
+    def best_windows(
+        self,
+        min_attendees: int,
+        length: timedelta,
+        limit: int = 5,
+        include_suboptimal: bool = True,
+    ) -> List[Tuple[datetime, datetime, List[int]]]:
+        """
+        Non-overlapping windows of ``length`` in which at least ``min_attendees`` are
+        available for the whole window, most attendees first (ties go to the window
+        with more optimal availability, then the earliest one).
+        """
+        width = max(1, -(-int(length.total_seconds()) // self.resolution))
+        if width > self.slots:
+            return []
+
+        def covering(grid: np.ndarray) -> np.ndarray:
+            cumulative = np.zeros((grid.shape[0], grid.shape[1] + 1), np.int32)
+            np.cumsum(grid, axis=1, out=cumulative[:, 1:])
+            return (cumulative[:, width:] - cumulative[:, :-width]) == width
+
+        free = covering(self.available if include_suboptimal else self.optimal)
+        counts = free.sum(axis=0)
+        optimal_counts = covering(self.optimal).sum(axis=0)
+
+        candidates = np.flatnonzero(counts >= min_attendees)
+        order = np.lexsort(
+            (candidates, -optimal_counts[candidates], -counts[candidates])
+        )
+        taken = np.zeros(self.slots, bool)
+        windows = []
+        for start in candidates[order]:
+            if taken[start : start + width].any():
+                continue
+            taken[start : start + width] = True
+            attendees = [self.user_ids[i] for i in np.flatnonzero(free[:, start])]
+            windows.append(
+                (self.slot_time(start), self.slot_time(start + width), attendees)
+            )
+            if len(windows) == limit:
+                break
+        return windows
+
+    def hourly(
+        self, tz: pytz.BaseTzInfo
+    ) -> Tuple[List[datetime], np.ndarray, np.ndarray]:
+        """
+        Group the slots into the hours of a timezone.
+
+        Returns the start of every local hour that has a slot, and the number of optimal
+        and suboptimal slots of every attendee in each of those hours.
+        """
+        return self._group_hours(tz)[:3]
+
+    def common_hours(self, tz: pytz.BaseTzInfo, min_attendees: int = 2) -> np.ndarray:
+        """
+        The columns of ``hourly`` with a slot in which at least ``min_attendees`` are
+        available at the same time.
+        """
+        hours, *_, index = self._group_hours(tz)
+        common = np.zeros(len(hours), bool)
+        np.logical_or.at(common, index, self.counts() >= min_attendees)
+        return np.flatnonzero(common)
+
+    def _group_hours(
+        self, tz: pytz.BaseTzInfo
+    ) -> Tuple[List[datetime], np.ndarray, np.ndarray, np.ndarray]:
+        if (cached := self._hourly.get(tz.zone)) is not None:
+            return cached
+
+        utc = self.origin + np.arange(self.slots) * self.resolution
+        offsets = np.array(
+            [
+                datetime.fromtimestamp(ts, tz=tz).utcoffset().total_seconds()
+                for ts in utc.tolist()
+            ],
+            np.int64,
+        )
+        local_hours, index = np.unique((utc + offsets) // 3600, return_inverse=True)
+        optimal = np.zeros((len(self.user_ids), len(local_hours)), np.int32)
+        suboptimal = np.zeros_like(optimal)
+        np.add.at(optimal.T, index, self.optimal.T)
+        np.add.at(suboptimal.T, index, self.suboptimal.T)
+
+        starts = [
+            tz.localize(
+                datetime.fromtimestamp(int(hour) * 3600, timezone.utc).replace(
+                    tzinfo=None
+                )
+            )
+            for hour in local_hours
+        ]
+        self._hourly[tz.zone] = result = (starts, optimal, suboptimal, index)
+        return result
+
+    @property
+    def slots_per_hour(self) -> int:
+        return 3600 // self.resolution
+
+    def row(self, user_id: int) -> Optional[int]:
+        try:
+            return self.user_ids.index(user_id)
+        except ValueError:
+            return None
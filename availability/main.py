@@ -1,11 +1,10 @@
-import collections
 import functools
-import itertools
+import json
 import random
 import string
 from datetime import date, datetime, time, timedelta
 from operator import attrgetter
-from typing import Literal, Optional
+from typing import Optional
 
 import discord
 import pytimeparse2 as pytimeparse
@@ -16,9 +15,10 @@ from redbot.core.utils import chat_formatting as cf
 from redbot.core.utils import menus
 from tabulate import SEPARATING_LINE, tabulate
 
+from .engine import AvailabilityGrid
 from .paginator import PaginationView
+from .store import EventStore
 from .utils import (
-    Attendee,
     Event,
     Timeframe,
     cross_merge_lists,
@@ -73,10 +73,17 @@ class Availability(commands.Cog):
         self.config.init_custom("EVENTS", 2)
         self.config.register_custom("EVENTS", **self.default_event)
 
+        self.events = EventStore(self.config)
         self.cev = ConfirmEventView(self.bot, self.config)
+        # (guild ID, event key) -> (attendees fingerprint, grid)
+        self.grids: dict[tuple[int, str], tuple[int, AvailabilityGrid]] = {}
 
-    def cog_unload(self):
+    async def cog_load(self):
+        await self.events.load()
+
+    async def cog_unload(self):
         self.cev.stop()
+        await self.events.close()
 
     @commands.hybrid_group(
         name="availability",
@@ -100,9 +107,7 @@ class Availability(commands.Cog):
     async def avb_update(self, ctx: commands.Context):
         """Update your times of availability"""
 
-        if not (
-            events := await self.config.custom("EVENTS", ctx.guild.id).all()
-        ) or not (
+        if not (events := self.events.all(ctx.guild.id)) or not (
             events := dict(
                 filter(
                     lambda x: x[1]["signed_up"].get(str(x[1]["host"]))
@@ -115,7 +120,7 @@ class Availability(commands.Cog):
             return await ctx.send("No events have been started yet!")
 
         await EventSelector(
-            self.config, ctx.author, events
+            self.events, ctx.author, events
         ).send_initial_message(
             ctx,
             content="Select an event to update your availability for:",
@@ -124,81 +129,49 @@ class Availability(commands.Cog):
 
     async def generate_user_chart(
         self,
+        grid: AvailabilityGrid,
+        user_id: int,
         optimal: list[Timeframe],
         suboptimal: list[Timeframe],
         to_timezone: pytz.BaseTzInfo,
     ):
-        all_days = sorted(
-            {
-                datetime.fromisoformat(val).astimezone(to_timezone).date()
-                for i in itertools.chain(optimal, suboptimal)
-                for part, val in i.items()
-            }
-        )
-
-        availability = {
-            date: ["\u001b[0;30m■\u001b[0m" for time in all_timestamps]
-            for date in all_days
-        }
-        pairs: dict[str, list[tuple[datetime, datetime]]] = {}
-        for timeframe in optimal:
-            from_time = datetime.fromisoformat(timeframe["from"]).astimezone(
-                to_timezone
-            )
-            from_date = from_time.date()
+        hours, optimal_slots, suboptimal_slots = grid.hourly(to_timezone)
+        row = grid.row(user_id)
+        full = grid.slots_per_hour
 
-            to_time = datetime.fromisoformat(timeframe["to"]).astimezone(
-                to_timezone
+        availability: dict[date, list[str]] = {}
+        for hour, opt, subopt in zip(
+            hours, optimal_slots[row].tolist(), suboptimal_slots[row].tolist()
+        ):
+            boxes = availability.setdefault(
+                hour.date(), ["\u001b[0;30m■\u001b[0m"] * len(all_timestamps)
             )
-            to_date = to_time.date()
-
-            if from_date != to_date:
-                for i in range(from_time.hour, 24):
-                    availability[from_date][i] = "\u001b[1;32m■\u001b[0m"
-                for i in range(0, to_time.hour):
-                    availability[to_date][i] = "\u001b[1;32m■\u001b[0m"
-            else:
-                for i in range(from_time.hour, to_time.hour):
-                    availability[from_date][i] = "\u001b[1;32m■\u001b[0m"
-            if from_time.minute != 0:
-                availability[from_date][from_time.hour] = (
-                    "\u001b[1;47;32m■\u001b[0m"
+            if subopt:
+                boxes[hour.hour] = (
+                    "\u001b[1;33m■\u001b[0m"
+                    if subopt == full
+                    else "\u001b[1;47;33m■\u001b[0m"
                 )
-            if to_time.minute != 0:
-                availability[to_date][to_time.hour] = (
-                    "\u001b[1;47;32m■\u001b[0m"
+            elif opt:
+                boxes[hour.hour] = (
+                    "\u001b[1;32m■\u001b[0m"
+                    if opt == full
+                    else "\u001b[1;47;32m■\u001b[0m"
                 )
 
-            pairs.setdefault("optimal", []).append((from_time, to_time))
-        for timeframe in suboptimal:
-            from_time = datetime.fromisoformat(timeframe["from"]).astimezone(
-                to_timezone
-            )
-            from_date = from_time.date()
-
-            to_time = datetime.fromisoformat(timeframe["to"]).astimezone(
-                to_timezone
-            )
-            to_date = to_time.date()
-
-            if from_date != to_date:
-                for i in range(from_time.hour, 24):
-                    availability[from_date][i] = "\u001b[1;33m■\u001b[0m"
-                for i in range(0, to_time.hour):
-                    availability[to_date][i] = "\u001b[1;33m■\u001b[0m"
-            else:
-                for i in range(from_time.hour, to_time.hour):
-                    availability[from_date][i] = "\u001b[1;33m■\u001b[0m"
-            if from_time.minute != 0:
-                availability[from_date][from_time.hour] = (
-                    "\u001b[1;47;33m■\u001b[0m"
-                )
-            if to_time.minute != 0:
-                availability[to_date][to_time.hour] = (
-                    "\u001b[1;47;33m■\u001b[0m"
+        pairs: dict[str, list[tuple[datetime, datetime]]] = {}
+        for mode, timeframes in (("optimal", optimal), ("suboptimal", suboptimal)):
+            for timeframe in timeframes:
+                pairs.setdefault(mode, []).append(
+                    (
+                        datetime.fromisoformat(timeframe["from"]).astimezone(
+                            to_timezone
+                        ),
+                        datetime.fromisoformat(timeframe["to"]).astimezone(
+                            to_timezone
+                        ),
+                    )
                 )
-
-            pairs.setdefault("suboptimal", []).append((from_time, to_time))
         return (
             dict(
                 map(
@@ -209,23 +182,24 @@ class Availability(commands.Cog):
             pairs,
         )
 
-    async def key_ac(self, interaction: discord.Interaction, argument: str):
-        events: dict[str, Event] = await self.config.custom(
-            "EVENTS", interaction.guild.id
-        ).all()
-        if not argument:
-            return [
-                app_commands.Choice(name=events[key]["name"], value=key)
-                for key in events
-            ]
+    def get_grid(
+        self, guild_id: int, key: str, event: Event
+    ) -> AvailabilityGrid:
+        """Get the availability grid of an event, rebuilt only when its attendees change."""
+        fingerprint = hash(json.dumps(event["signed_up"], sort_keys=True))
+        cached = self.grids.get((guild_id, key))
+        if cached is None or cached[0] != fingerprint:
+            cached = self.grids[(guild_id, key)] = (
+                fingerprint,
+                AvailabilityGrid(event["signed_up"]),
+            )
+        return cached[1]
 
-        else:
-            return [
-                app_commands.Choice(name=events[key]["name"], value=key)
-                for key in events
-                if events[key]["name"].startswith(argument)
-                or key.startswith(argument)
-            ]
+    async def key_ac(self, interaction: discord.Interaction, argument: str):
+        return [
+            app_commands.Choice(name=event["name"], value=key)
+            for key, event in self.events.search(interaction.guild.id, argument)
+        ]
 
     @avb.command(name="chart", aliases=["show", "check"])
     @app_commands.autocomplete(eventkey=key_ac)
@@ -240,9 +214,7 @@ class Availability(commands.Cog):
         ),
     ):
         """Check someone's availability"""
-        event: Optional[Event] = await self.config.custom(
-            "EVENTS", ctx.guild.id
-        ).get_raw(eventkey, default=None)
+        event = self.events.get(ctx.guild.id, eventkey)
         if not event:
             return await ctx.send(
                 "No event with that key exists!", ephemeral=True
@@ -273,9 +245,12 @@ class Availability(commands.Cog):
             timezone = pytz.UTC
 
         days_boxes, times = await self.generate_user_chart(
-            optimal, suboptimal, timezone
+            self.get_grid(ctx.guild.id, eventkey, event),
+            user.id,
+            optimal,
+            suboptimal,
+            timezone,
         )
-        print(days_boxes)
 
         tabulated_days = tabulate(
             days_boxes,
@@ -325,17 +300,7 @@ class Availability(commands.Cog):
     async def find_event(
         self, guild: discord.Guild, key: Optional[str] = None
     ) -> Optional[tuple[str, Event]]:
-        event = await self.config.custom("EVENTS", guild.id).get_raw(
-            key, default=None
-        )
-        if event is None:
-            events = await self.config.custom("EVENTS", guild.id).all()
-            for k, event in events.items():
-                if event["name"] == key:
-                    return k, event
-
-        else:
-            return key, event
+        return self.events.find(guild.id, key)
 
     @avb_event.command(name="start")
     async def avb_event_start(
@@ -371,9 +336,7 @@ class Availability(commands.Cog):
             signed_up={},
             host=ctx.author.id,
         )
-        await self.config.custom("EVENTS", ctx.guild.id).set_raw(
-            key, value=event
-        )
+        self.events.set(ctx.guild.id, key, event)
 
         view.message = await ctx.send(
             f"Event {name} started! Users can now sign up for it by setting their availability for it with `{ctx.clean_prefix}availability update`\n"
@@ -383,7 +346,7 @@ class Availability(commands.Cog):
             view=(
                 view := ModeButtonView(
                     ctx.author,
-                    self.config.custom("EVENTS", ctx.guild.id, key),
+                    self.events.ref(ctx.guild.id, key),
                     event,
                 )
             ),
@@ -399,14 +362,15 @@ class Availability(commands.Cog):
         if not (event := await self.find_event(guild=ctx.guild, key=eventkey)):
             return await ctx.send("No event with that name exists!")
 
-        await self.config.custom("EVENTS", ctx.guild.id).clear_raw(event[0])
+        self.events.remove(ctx.guild.id, event[0])
+        self.grids.pop((ctx.guild.id, event[0]), None)
 
         await ctx.send(f"Event {event[1]['name']} ended!", ephemeral=True)
 
     @avb_event.command(name="list")
     async def avb_event_list(self, ctx: commands.Context):
         """List all events"""
-        events = await self.config.custom("EVENTS", ctx.guild.id).all()
+        events = self.events.all(ctx.guild.id)
         if not events:
             return await ctx.send(
                 "No events have been started yet!", ephemeral=True
@@ -427,37 +391,27 @@ class Availability(commands.Cog):
 
     def generate_common_chart(
         self,
-        attendees: dict[str, Attendee],
+        grid: AvailabilityGrid,
         as_timezone: pytz.BaseTzInfo,
     ) -> tuple[dict[str, list[str]], list[datetime]]:
-        parsed, common = self.find_common(attendees, as_timezone)
-        if not common:
+        hours, optimal, suboptimal = grid.hourly(as_timezone)
+        # hours in which at least two attendees are available at the same time
+        common = grid.common_hours(as_timezone)
+        if not len(common):
             return {}, []
-        dt_boxes: dict[datetime, list[str]] = {
-            datetime.combine(date, _time): cross_merge_lists(
-                ["\u001b[0;30m■\u001b[0m"] * len(attendees),
+
+        dt_boxes: dict[datetime, list[str]] = {}
+        for column in common.tolist():
+            boxes = cross_merge_lists(
+                ["\u001b[0;30m■\u001b[0m"] * len(grid.user_ids),
                 fillvalue=SEPARATING_LINE,
             )[:-1]
-            for date, data in common.items()
-            for _time in sorted(
-                set[time]().union(
-                    data.get("optimal", {}),
-                    data.get("suboptimal", {}),
-                )
-            )
-        }
-        keys = list(parsed.keys())
-        indices = {
-            int(user_id): keys.index(int(user_id)) * 2 for user_id in attendees
-        }
-
-        for dt, boxes in dt_boxes.items():
-            for user_id, data in parsed.items():
-                if dt.date() in data:
-                    if dt.timetz() in common[dt.date()]["optimal"]:
-                        boxes[indices[user_id]] = "\u001b[1;32m■\u001b[0m"
-                    elif dt.timetz() in common[dt.date()]["suboptimal"]:
-                        boxes[indices[user_id]] = "\u001b[1;33m■\u001b[0m"
+            for row in range(len(grid.user_ids)):
+                if optimal[row, column]:
+                    boxes[row * 2] = "\u001b[1;32m■\u001b[0m"
+                elif suboptimal[row, column]:
+                    boxes[row * 2] = "\u001b[1;33m■\u001b[0m"
+            dt_boxes[hours[column]] = boxes
 
         return dict(
             map(
@@ -499,7 +453,9 @@ class Availability(commands.Cog):
             error = f"Timezone cog not loaded. Using default timezone: UTC"
             timezone = pytz.UTC
 
-        boxes, times = self.generate_common_chart(signed_up, timezone)
+        boxes, times = self.generate_common_chart(
+            self.get_grid(ctx.guild.id, key, event), timezone
+        )
 
         if not boxes:
             return await ctx.send(
@@ -530,7 +486,7 @@ class Availability(commands.Cog):
         ):
             view = TimeframeSelectView(
                 ctx,
-                self.config.custom("EVENTS", ctx.guild.id, key),
+                self.events.ref(ctx.guild.id, key),
                 times,
                 event,
             )
@@ -546,98 +502,70 @@ class Availability(commands.Cog):
             ephemeral=True,
         )
 
-    def get_ranges(
-        self, attendees: dict[str, Attendee], as_timezone: pytz.BaseTzInfo
-    ):
-        temp: dict[
-            int, dict[date, dict[Literal["optimal", "suboptimal"], set[time]]]
-        ] = {}
-        all_dates = set[date]()
-        for user_id, at in attendees.items():
-            data = temp.setdefault(int(user_id), {})
-            for tf1, tf2 in itertools.zip_longest(
-                at.setdefault("optimal", []),
-                at.setdefault("suboptimal", []),
-                fillvalue=None,
-            ):
-                if tf1:
-                    from_time = datetime.fromisoformat(tf1["from"]).astimezone(
-                        as_timezone
-                    )
-                    to_time = datetime.fromisoformat(tf1["to"])
-                    org_tz = to_time.tzinfo
-                    to_time = to_time.astimezone(as_timezone)
-                    day_data = data.setdefault(
-                        from_time.date(),
-                        {"optimal": set(), "suboptimal": set()},
-                    )
-                    day_data["optimal"].update(
-                        [
-                            time(hour, tzinfo=as_timezone)
-                            for hour in range(
-                                from_time.hour
-                                if from_time.minute == 0
-                                else from_time.hour + 1,
-                                to_time.hour,
-                            )
-                        ]
-                    )
-                    all_dates.add(from_time.date())
-                if tf2:
-                    from_time = datetime.fromisoformat(tf2["from"])
-                    org_tz = from_time.tzinfo
-                    from_time = from_time.astimezone(as_timezone)
-                    to_time = datetime.fromisoformat(tf2["to"]).astimezone(
-                        as_timezone
-                    )
-                    day_data = data.setdefault(
-                        to_time.date(), {"optimal": set(), "suboptimal": set()}
-                    )
-                    day_data["suboptimal"].update(
-                        [
-                            time(hour, tzinfo=as_timezone)
-                            for hour in range(
-                                from_time.hour
-                                if from_time.minute == 0
-                                else from_time.hour + 1,
-                                to_time.hour,
-                            )
-                        ]
-                    )
-                    all_dates.add(to_time.date())
-        return temp, all_dates
 
-    def find_common(
-        self, attendees: dict[str, Attendee], as_timezone: pytz.BaseTzInfo
+    @avb_event.command(name="besttimes", aliases=["best"])
+    @app_commands.autocomplete(eventkey=key_ac)
+    async def avb_event_besttimes(
+        self,
+        ctx: commands.Context,
+        eventkey: str,
+        min_attendees: commands.Range[int, 1] = commands.param(
+            default=2,
+            description="The minimum number of attendees that must be available",
+        ),
+        *,
+        length: timedelta = commands.param(
+            converter=functools.partial(
+                pytimeparse.parse, raise_exception=True, as_timedelta=True
+            ),
+            default=timedelta(hours=1),
+            displayed_default="1 hour",
+            description="How long the attendees must be available for",
+        ),
     ):
-        temp, dates = self.get_ranges(attendees, as_timezone)
-        return temp, {
-            date: {
-                option: list[time](
-                    map(
-                        lambda x: x[0],
-                        filter(
-                            lambda x: x[1] >= 2,
-                            collections.Counter(
-                                itertools.chain.from_iterable(
-                                    v.get(
-                                        date,
-                                        {
-                                            "optimal": set[time](),
-                                            "suboptimal": set[time](),
-                                        },
-                                    ).get(option, set[time]())
-                                    for v in temp.values()
-                                )
-                            ).most_common(),
-                        ),
-                    )
-                )
-                for option in ("optimal", "suboptimal")
-            }
-            for date in dates
-        }
+        """Find the times most attendees of an event are available at"""
+        if not (event := await self.find_event(guild=ctx.guild, key=eventkey)):
+            return await ctx.send(
+                "No event with that key exists!", ephemeral=True
+            )
+        key, event = event
+        if not event["signed_up"]:
+            return await ctx.send(
+                "No one has signed up for this event yet!", ephemeral=True
+            )
+
+        windows = self.get_grid(ctx.guild.id, key, event).best_windows(
+            min_attendees, length
+        )
+        if not windows:
+            return await ctx.send(
+                f"There is no {cf.humanize_timedelta(timedelta=length)} window "
+                f"in which at least {min_attendees} attendees are available.",
+                ephemeral=True,
+            )
 
+        embed = discord.Embed(
+            title=f"Best times for {event['name']}",
+            color=await ctx.embed_color(),
+        )
+        for ind, (start, end, attendees) in enumerate(windows, 1):
+            embed.add_field(
+                name=f"{ind}. {len(attendees)} attendees",
+                value=f"{discord.utils.format_dt(start, style='F')} - "
+                f"{discord.utils.format_dt(end, style='t')}\n"
+                + cf.humanize_list(
+                    [
+                        getattr(
+                            ctx.guild.get_member(user_id),
+                            "mention",
+                            f"<@{user_id}>",
+                        )
+                        for user_id in attendees
+                    ]
+                ),
+                inline=False,
+            )
+        await ctx.send(embed=embed, ephemeral=True)
 
 # sample input
 users = {
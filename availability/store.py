@@ -0,0 +1,164 @@
+import asyncio
+import bisect
+import logging
+from typing import Awaitable, Callable, Optional
+
+from redbot.core import Config
+
+from .utils import Event, Timeframe
+
+log = logging.getLogger("red.craycogs.availability.store")
+
+
+class EventStore:
+    """
+    The events of every guild, kept in memory.
+
+    Events are loaded from config once, reads never touch config again, and every
+    change is applied in memory first and then written through to config in the
+    background, in the order the changes were made.
+
+    Names and keys of a guild's events are also kept in a sorted list, so prefix
+    lookups for autocomplete are a binary search.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.guilds: dict[int, dict[str, Event]] = {}
+        # guild ID -> sorted (casefolded name or key, key) pairs
+        self.terms: dict[int, list[tuple[str, str]]] = {}
+        self._writes: asyncio.Queue[Callable[[], Awaitable]] = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def load(self):
+        for guild_id, events in (await self.config.custom("EVENTS").all()).items():
+            self.guilds[int(guild_id)] = events
+            self.terms[int(guild_id)] = sorted(
+                term
+                for key, event in events.items()
+                for term in self._terms(key, event)
+            )
+        self._worker = asyncio.create_task(self._write_loop())
+
+    async def close(self):
+        """Write out everything that is still queued and stop the writer."""
+        if self._worker is None:
+            return
+        await self._writes.join()
+        self._worker.cancel()
+
+    async def _write_loop(self):
+        while True:
+            write = await self._writes.get()
+            try:
+                await write()
+            except Exception as e:
+                log.exception("Failed to write an event to config", exc_info=e)
+            finally:
+                self._writes.task_done()
+
+    @staticmethod
+    def _terms(key: str, event: Event) -> list[tuple[str, str]]:
+        terms = [(key.casefold(), key)]
+        if event.get("name"):
+            terms.append((event["name"].casefold(), key))
+        return terms
+
+    def all(self, guild_id: int) -> dict[str, Event]:
+        return self.guilds.get(guild_id, {})
+
+    def get(self, guild_id: int, key: str) -> Optional[Event]:
+        return self.all(guild_id).get(key)
+
+    def find(self, guild_id: int, key: str) -> Optional[tuple[str, Event]]:
+        """Find an event by its key, or by its name if no event has that key."""
+        events = self.all(guild_id)
+        if key in events:
+            return key, events[key]
+        for k, event in events.items():
+            if event["name"] == key:
+                return k, event
+
+    def search(
+        self, guild_id: int, prefix: str, limit: int = 25
+    ) -> list[tuple[str, Event]]:
+        """Events whose name or key starts with ``prefix``, ignoring case."""
+        terms = self.terms.get(guild_id, [])
+        prefix = prefix.casefold()
+        found: dict[str, Event] = {}
+        for term, key in terms[bisect.bisect_left(terms, (prefix,)) :]:
+            if not term.startswith(prefix) or len(found) == limit:
+                break
+            found.setdefault(key, self.guilds[guild_id][key])
+        return list(found.items())
+
+    def ref(self, guild_id: int, key: str) -> "EventRef":
+        return EventRef(self, guild_id, key)
+
+    def set(self, guild_id: int, key: str, event: Event):
+        self._unindex(guild_id, key)
+        self.guilds.setdefault(guild_id, {})[key] = event
+        terms = self.terms.setdefault(guild_id, [])
+        for term in self._terms(key, event):
+            bisect.insort(terms, term)
+
+        self._writes.put_nowait(
+            lambda: self.config.custom("EVENTS", guild_id).set_raw(key, value=event)
+        )
+
+    def set_timeframes(
+        self,
+        guild_id: int,
+        key: str,
+        user_id: int,
+        mode: str,
+        timeframes: list[Timeframe],
+    ):
+        if (event := self.get(guild_id, key)) is None:
+            return
+        attendee = event["signed_up"].setdefault(
+            str(user_id), {"optimal": [], "suboptimal": []}
+        )
+        attendee[mode] = timeframes = list(timeframes)
+
+        self._writes.put_nowait(
+            lambda: self.config.custom("EVENTS", guild_id, key).signed_up.set_raw(
+                str(user_id), mode, value=timeframes
+            )
+        )
+
+    def remove(self, guild_id: int, key: str):
+        self._unindex(guild_id, key)
+        self.guilds.get(guild_id, {}).pop(key, None)
+
+        self._writes.put_nowait(
+            lambda: self.config.custom("EVENTS", guild_id).clear_raw(key)
+        )
+
+    def _unindex(self, guild_id: int, key: str):
+        if (event := self.get(guild_id, key)) is None:
+            return
+        terms = self.terms[guild_id]
+        for term in self._terms(key, event):
+            index = bisect.bisect_left(terms, term)
+            if index < len(terms) and terms[index] == term:
+                del terms[index]
+
+
+class EventRef:
+    """A single event of an `EventStore`, handed to the views that edit it."""
+
+    def __init__(self, store: EventStore, guild_id: int, key: str):
+        self.store = store
+        self.guild_id = guild_id
+        self.key = key
+
+    @property
+    def event(self) -> Optional[Event]:
+        return self.store.get(self.guild_id, self.key)
+
+    def set_timeframes(self, user_id: int, mode: str, timeframes: list[Timeframe]):
+        self.store.set_timeframes(self.guild_id, self.key, user_id, mode, timeframes)
+
+    def remove(self):
+        self.store.remove(self.guild_id, self.key)
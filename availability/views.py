@@ -6,9 +6,9 @@ import dateparser
 import discord
 import pytz
 from redbot.core import Config, commands
-from redbot.core.config import Group
 from redbot.core.utils import chat_formatting as cf
 
+from .store import EventRef, EventStore
 from .utils import Event, Timeframe, chunks, get_next_occurrence
 
 days = [
@@ -133,7 +133,7 @@ class TimeframeModal(discord.ui.Modal):
         placeholder="(e.g. 2:00, 14:00, 2pm, 2 o clock, etc.)",
     )
 
-    def __init__(self, view: BaseView, user: discord.User, config: Group):
+    def __init__(self, view: BaseView, user: discord.User, config: EventRef):
         self.config = config
         self.user = user
         self.view = view
@@ -330,18 +330,16 @@ class TimeframeModal(discord.ui.Modal):
         view._author_id = interaction.user.id
         await view.wait()
         if view.value:
-            await self.config.signed_up.set_raw(
+            self.config.set_timeframes(
                 self.user.id,
                 self.view.mode.lower(),
-                value=(
-                    value := [
-                        *self.view.times.values(),
-                        {
-                            "from": ft.isoformat(),
-                            "to": tt.isoformat(),
-                        },
-                    ]
-                ),
+                value := [
+                    *self.view.times.values(),
+                    {
+                        "from": ft.isoformat(),
+                        "to": tt.isoformat(),
+                    },
+                ],
             )
             await interaction.followup.send("Timeframe added.", ephemeral=True)
             await self.view.update_select(
@@ -356,7 +354,7 @@ class UpdateTimeView(BaseView):
         self,
         mode: Literal["OPTIMAL", "SUBOPTIMAL"],
         user: discord.User,
-        config: Group,
+        config: EventRef,
         event: Event,
     ):
         self.event = event
@@ -396,9 +394,7 @@ class UpdateTimeView(BaseView):
         view._author_id = interaction.user.id
         await view.wait()
         if view.value:
-            await self.config.signed_up.set_raw(
-                self.user.id, self.mode.lower(), value=[]
-            )
+            self.config.set_timeframes(self.user.id, self.mode.lower(), [])
             await interaction.followup.send("Timeframes reset.", ephemeral=True)
             await self.update_select([], edit=True)
 
@@ -449,12 +445,10 @@ class UpdateTimeView(BaseView):
         await view.wait()
         if view.value:
             await self.update_select(times, edit=True)
-            await self.config.signed_up.set_raw(
+            self.config.set_timeframes(
                 self.user.id,
                 self.mode.lower(),
-                value=self.event["signed_up"][str(self.user.id)][
-                    self.mode.lower()
-                ],
+                self.event["signed_up"][str(self.user.id)][self.mode.lower()],
             )
             await interaction.followup.send(
                 "Timeframes removed.", ephemeral=True
@@ -507,7 +501,7 @@ class UpdateTimeView(BaseView):
 
 
 class ModeButtonView(BaseView):
-    def __init__(self, user: discord.User, config: Group, event: Event):
+    def __init__(self, user: discord.User, config: EventRef, event: Event):
         self.config = config
         self.user = user
         self.event = event
@@ -562,9 +556,9 @@ class ModeButtonView(BaseView):
 
 class EventSelector(BaseView):
     def __init__(
-        self, config: Config, user: discord.User, events: dict[str, Event]
+        self, store: EventStore, user: discord.User, events: dict[str, Event]
     ):
-        self.config = config
+        self.store = store
         self.user = user
         self.events = events
         super().__init__(timeout=180)
@@ -585,9 +579,7 @@ class EventSelector(BaseView):
         event = self.events[key]
         view = ModeButtonView(
             self.user,
-            self.config.custom(
-                "EVENTS", interaction.guild.id, select.values[0]
-            ),
+            self.store.ref(interaction.guild.id, select.values[0]),
             event,
         )
         await interaction.response.edit_message(
@@ -611,7 +603,7 @@ class TimeframeSelectView(BaseView):
     def __init__(
         self,
         ctx: commands.Context,
-        config: Group,
+        config: EventRef,
         times: list[datetime],
         event: Event,
     ):
@@ -676,7 +668,7 @@ class TimeframeSelectView(BaseView):
             if view.value:
                 dt = datetime.fromisoformat(select.values[0])
                 adchan = inter.guild.get_channel(
-                    await self.config._config.guild(inter.guild).admin_channel()
+                    await self.cog.config.guild(inter.guild).admin_channel()
                 )
                 if adchan:
                     ev = self.event.copy()
@@ -686,7 +678,7 @@ class TimeframeSelectView(BaseView):
                             "start_time": int(dt.timestamp()),
                         }
                     )
-                    async with self.config._config.guild(
+                    async with self.cog.config.guild(
                         inter.guild
                     ).to_approve({}) as to_approve:
                         to_approve[inter.message.id] = ev
@@ -717,7 +709,8 @@ class TimeframeSelectView(BaseView):
                         privacy_level=discord.PrivacyLevel.guild_only,
                     )
                     await inter.followup.send(f"Event started! {ev.url}")
-                await self.config.clear()
+                self.config.remove()
+                self.cog.grids.pop((self.config.guild_id, self.config.key), None)
 
             self.stop()
 
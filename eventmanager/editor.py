@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+import discord
+
+from .model import Event
+
+log = logging.getLogger("red.misan-cogs.eventmanager.editor")
+
+
+class EmbedEditor:
+    """
+    Coalesces edits of event messages.
+
+    Requesting an edit only schedules one for ``delay`` seconds later, and any more requests
+    for the same message until then are folded into it. The embed is rendered when the edit
+    is made, from whatever the event looks like at that point, so a burst of sign ups costs
+    one render and one API call.
+    """
+
+    def __init__(self, get_event: Callable[[int, int], Optional[Event]], delay: float = 2.0):
+        self.get_event = get_event
+        self.delay = delay
+        self._pending: Dict[int, asyncio.Task] = {}
+
+        self.requests = 0
+        self.edits = 0
+
+    def request(self, event: Event):
+        self.requests += 1
+        if event.message_id not in self._pending:
+            self._pending[event.message_id] = asyncio.create_task(
+                self._edit_later((event.guild_id, event.message_id))
+            )
+
+    def cancel(self, message_id: int):
+        """Drop a pending edit, e.g. because the message is about to be ended or deleted."""
+        if task := self._pending.pop(message_id, None):
+            task.cancel()
+
+    def close(self):
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+
+    async def _edit_later(self, key: Tuple[int, int]):
+        guild_id, message_id = key
+        await asyncio.sleep(self.delay)
+        # new requests from here on schedule a new edit
+        self._pending.pop(message_id, None)
+
+        if not (event := self.get_event(guild_id, message_id)):
+            return
+
+        try:
+            msg = await event.message()
+            if not msg:
+                return
+
+            await msg.edit(embed=event.embed)
+            self.edits += 1
+
+        except discord.NotFound:
+            event.forget_message()
+
+        except Exception as e:
+            log.debug(f"Failed to edit the message of event {event.name}", exc_info=e)
@@ -1,7 +1,8 @@
 import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Tuple, Union
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Set, Tuple, Union
 
 import discord
 from discord.ext import tasks
@@ -12,7 +13,9 @@ from redbot.core.utils.menus import start_adding_reactions
 from redbot.core.utils.predicates import MessagePredicate
 
 from .constants import Category, class_spec_dict, emoji_class_dict
+from .editor import EmbedEditor
 from .model import Event, Flags
+from .scheduler import DeadlineScheduler
 from .wrapper import SoftRes, SRFlags
 
 log = logging.getLogger("red.misan-cogs.eventmanager")
@@ -24,6 +27,8 @@ class EventManager(commands.Cog):
     HOUR = 60 * 60
     HALF_HOUR = HOUR / 2
     QUARTER_HOUR = HALF_HOUR / 2
+    # seconds until a deadline that failed is retried, doubled on every failure in a row
+    RETRY_DELAY = 30
 
     """A cog to create and manage events."""
 
@@ -38,7 +43,16 @@ class EventManager(commands.Cog):
         self.config.register_member(spec_class=())
         self.config.register_guild(history_channel=None, softres_log=None, log=None)
         self.cache: Dict[int, Dict[int, Event]] = {}
+        # (guild_id, message_id) of events changed since the last save
+        self.dirty: Set[Tuple[int, int]] = set()
+        self.scheduler: DeadlineScheduler[Tuple[int, int]] = DeadlineScheduler()
+        # failures in a row of the deadlines that are being retried
+        self.failures: Dict[Tuple[int, int], int] = {}
+        self.editor = EmbedEditor(
+            lambda guild_id, message_id: self.cache.get(guild_id, {}).get(message_id)
+        )
         self.task = self.check_events.start()
+        self.save_task = self.save_events.start()
         self.softres = SoftRes(self.bot)
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
@@ -115,15 +129,41 @@ class EventManager(commands.Cog):
                 except Exception as e:
                     log.exception("Error occurred when caching: ", exc_info=e)
 
+                else:
+                    self.schedule(g[event["message_id"]])
+
     async def to_config(self):
-        for guild_config in self.cache.values():
-            for event in guild_config.values():
-                json = event.json
-                await self.config.custom("events", event.guild_id, event.message_id).set(json)
+        dirty, self.dirty = self.dirty, set()
+        for guild_id, message_id in dirty:
+            if event := self.cache.get(guild_id, {}).get(message_id):
+                await self.config.custom("events", guild_id, message_id).set(event.json)
+
+    def mark_dirty(self, event: Event):
+        self.dirty.add((event.guild_id, event.message_id))
+
+    def schedule(self, event: Event):
+        """Schedule the next reminder of an event, or its end once all reminders are sent."""
+        thresholds = (self.HOUR, self.HALF_HOUR, self.QUARTER_HOUR)
+        deadline = event.end_time.timestamp()
+        if event.pings < len(thresholds):
+            deadline -= thresholds[event.pings]
+        self.scheduler.schedule((event.guild_id, event.message_id), deadline)
+
+    async def forget_event(self, event: Event):
+        """Remove an event from the cache, the schedule and the config."""
+        key = (event.guild_id, event.message_id)
+        self.cache.get(event.guild_id, {}).pop(event.message_id, None)
+        self.dirty.discard(key)
+        self.scheduler.cancel(key)
+        self.failures.pop(key, None)
+        self.editor.cancel(event.message_id)
+        await self.config.custom("events", *key).clear()
 
     def cog_unload(self):
         asyncio.create_task(self.to_config())
         self.task.cancel()
+        self.save_task.cancel()
+        self.editor.close()
         asyncio.create_task(self.softres._session.close())
 
     def validate_flags(self, flags: dict):
@@ -185,6 +225,8 @@ class EventManager(commands.Cog):
             msg, [i for i in emoji_class_dict.keys()] + ["❌", "🧻", "👑", "🚀", "👻"]
         )
         self.cache.setdefault(ctx.guild.id, {})[msg.id] = event
+        self.mark_dirty(event)
+        self.schedule(event)
 
     @event.command(name="edit")
     async def edit(
@@ -223,9 +265,15 @@ class EventManager(commands.Cog):
             await message.delete()
 
         else:
+            self.editor.cancel(message.id)
             await message.edit(embed=new.embed)
 
+        if new.message_id != event.message_id:
+            await self.forget_event(event)
+
         self.cache[ctx.guild.id][new.message_id] = new
+        self.mark_dirty(new)
+        self.schedule(new)
 
         await ctx.tick()
 
@@ -261,7 +309,8 @@ class EventManager(commands.Cog):
 
             event.remove_entrant(ent)
 
-        await message.edit(embed=event.embed)
+        self.mark_dirty(event)
+        self.editor.request(event)
 
         await ctx.send(
             f"Removed given users from the event."
@@ -430,11 +479,8 @@ class EventManager(commands.Cog):
         for event in self.cache[member.guild.id].values():
             if entrant := event.get_entrant(member.id):
                 event.remove_entrant(entrant)
-                msg = await event.message()
-                if not msg:
-                    continue
-
-                await msg.edit(embed=event.embed)
+                self.mark_dirty(event)
+                self.editor.request(event)
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(
@@ -523,6 +569,7 @@ class EventManager(commands.Cog):
             user_name = name
 
             event.add_entrant(user_name, user.id, class_name, category, spec)
+            self.mark_dirty(event)
 
             await user.send(
                 "You have been signed up to the event. "
@@ -549,9 +596,7 @@ class EventManager(commands.Cog):
                 else:
                     await user.send("Alright!")
 
-            embed = event.embed
-
-            await message.edit(embed=embed)
+            self.editor.request(event)
 
             await self.remove_reactions_safely(message, emoji, user)
 
@@ -577,6 +622,8 @@ class EventManager(commands.Cog):
                 await self.remove_reactions_safely(message, emoji, user)
                 return
 
+            self.editor.cancel(event.message_id)
+
             try:
                 await message.clear_reactions()
 
@@ -596,18 +643,18 @@ class EventManager(commands.Cog):
             else:
                 await message.edit(embed=embed)
 
-            await self.config.custom("events", event.guild_id, event.message_id).clear()
-            del self.cache[event.guild_id][event.message_id]
+            await self.forget_event(event)
 
         elif emoji == "🧻":
             await self.remove_reactions_safely(message, emoji, user)
 
             if entrant := event.get_entrant(user.id):
                 event.remove_entrant(entrant)
+                self.mark_dirty(event)
 
                 await user.send("You have been removed from the event.")
 
-                await message.edit(embed=event.embed)
+                self.editor.request(event)
 
                 chan = self.bot.get_channel(await self.config.guild(event.guild).log())
 
@@ -666,10 +713,11 @@ class EventManager(commands.Cog):
             category = Category[category]
 
             event.add_entrant(user_name, user.id, class_name, category, spec)
+            self.mark_dirty(event)
 
             await user.send("You have successfully been signed up to the event.")
 
-            await message.edit(embed=event.embed)
+            self.editor.request(event)
 
             chan = self.bot.get_channel(await self.config.guild(event.guild).log())
 
@@ -740,9 +788,10 @@ class EventManager(commands.Cog):
         if member.guild.id not in self.cache:
             return
 
-        for event in self.cache[member.guild.id].values():
+        for event in list(self.cache[member.guild.id].values()):
             if entrant := event.get_entrant(member.id):
                 event.remove_entrant(entrant)
+                self.mark_dirty(event)
                 try:
                     msg = await event.message()
 
@@ -750,110 +799,120 @@ class EventManager(commands.Cog):
                     log.debug(
                         f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
                     )
-                    del self.cache[event.guild_id][event.message_id]
-                    await self.config.custom("events", event.guild_id, event.message_id).clear()
+                    await self.forget_event(event)
                     continue
 
                 if not msg:
                     continue
 
-                await msg.edit(embed=event.embed)
+                self.editor.request(event)
 
-    @tasks.loop(minutes=5)
-    async def check_events(self):
-        await self.to_config()
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if event := self.cache.get(payload.guild_id, {}).get(payload.message_id):
+            event.forget_message()
 
-        self.cache.clear()
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        events = self.cache.get(payload.guild_id, {})
+        for message_id in payload.message_ids & events.keys():
+            events[message_id].forget_message()
 
-        await self.to_cache()
+    @tasks.loop()
+    async def check_events(self):
+        guild_id, message_id = await self.scheduler.next_due()
+        if not (event := self.cache.get(guild_id, {}).get(message_id)):
+            return
 
-        for guild_config in self.cache.copy().values():
-            cop = guild_config.copy()
-            for event in cop.values():
-                if event.end_time <= datetime.now(tz=event.end_time.tzinfo):
-                    embed = event.end()
-                    try:
-                        msg = await event.message()
-
-                    except Exception:
-                        log.debug(
-                            f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
-                        )
+        key = (guild_id, message_id)
+        try:
+            await self.handle_deadline(event)
+        except Exception as e:
+            # the key is off the schedule already, so put it back or the event never ends
+            failures = self.failures[key] = self.failures.get(key, 0) + 1
+            delay = min(self.RETRY_DELAY * 2 ** (failures - 1), self.HOUR)
+            log.exception(
+                f"Failed to handle the deadline of event {event.name}, retrying in {delay}s",
+                exc_info=e,
+            )
+            if self.cache.get(guild_id, {}).get(message_id) is event and key not in self.scheduler:
+                self.scheduler.schedule(key, time.time() + delay)
+        else:
+            self.failures.pop(key, None)
+
+    async def handle_deadline(self, event: Event):
+        if event.end_time <= datetime.now(tz=event.end_time.tzinfo):
+            self.editor.cancel(event.message_id)
+            embed = event.end()
+            try:
+                msg = await event.message()
 
-                        del self.cache[event.guild_id][event.message_id]
-                        await self.config.custom(
-                            "events", event.guild_id, event.message_id
-                        ).clear()
-                        continue
+            except Exception:
+                log.debug(
+                    f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
+                )
+                await self.forget_event(event)
+                return
 
-                    if not msg:
-                        log.debug(
-                            f"The message for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
-                        )
+            if not msg:
+                log.debug(
+                    f"The message for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
+                )
+                await self.forget_event(event)
+                return
 
-                        await self.config.custom(
-                            "events", event.guild_id, event.message_id
-                        ).clear()
-                        del self.cache[event.guild_id][event.message_id]
-                        continue
-
-                    if (
-                        chan_id := await self.config.guild_from_id(
-                            event.guild_id
-                        ).history_channel()
-                    ) and (chan := event.guild.get_channel(int(chan_id))):
-                        await chan.send(embed=embed)
-                        try:
-                            await msg.delete()
-                        except Exception:
-                            pass
-
-                    else:
-                        await msg.edit(embed=embed)
-                        await msg.clear_reactions()
-
-                    await self.config.custom("events", event.guild_id, event.message_id).clear()
-                    del self.cache[event.guild_id][event.message_id]
-                    continue
+            if (
+                chan_id := await self.config.guild_from_id(event.guild_id).history_channel()
+            ) and (chan := event.guild.get_channel(int(chan_id))):
+                await chan.send(embed=embed)
+                try:
+                    await msg.delete()
+                except Exception:
+                    pass
 
-                if not event.entrants:
-                    continue
+            else:
+                try:
+                    await msg.edit(embed=embed)
+                    await msg.clear_reactions()
+                except discord.NotFound:
+                    log.debug(
+                        f"The message for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
+                    )
 
-                if event.pings >= 3:
-                    continue
+            await self.forget_event(event)
+            return
 
-                td = event.end_time - datetime.now(tz=event.end_time.tzinfo)
+        td = event.end_time - datetime.now(tz=event.end_time.tzinfo)
+        # number of reminders (1 hour, 30 minutes and 15 minutes before) that are due by now
+        due = sum(
+            td.total_seconds() <= threshold
+            for threshold in (self.HOUR, self.HALF_HOUR, self.QUARTER_HOUR)
+        )
 
-                if td.total_seconds() < self.HOUR:
-                    if td.total_seconds() <= self.HALF_HOUR:
-                        if td.total_seconds() <= self.QUARTER_HOUR:
-                            if event.pings >= 3:
-                                continue
+        if due > event.pings:
+            if event.entrants:
+                channel = event.channel
 
-                        if event.pings >= 2:
-                            continue
+                if not channel:
+                    log.debug(
+                        f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
+                    )
+                    await self.forget_event(event)
+                    return
 
-                    if event.pings >= 1:
-                        continue
+                await channel.send(
+                    f"{humanize_list([f'<@{ent.user_id}>' for ent in event.entrants])}\n\nThe event `{event.name}` is about to start <t:{int(event.end_time.timestamp())}:R>",
+                    allowed_mentions=discord.AllowedMentions(users=True),
+                )
 
-                    channel = event.channel
+            event.pings = due
+            self.mark_dirty(event)
 
-                    if not channel:
-                        log.debug(
-                            f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
-                        )
-                        del self.cache[event.guild_id][event.message_id]
-                        await self.config.custom(
-                            "events", event.guild_id, event.message_id
-                        ).clear()
-                        continue
-
-                    await channel.send(
-                        f"{humanize_list([f'<@{ent.user_id}>' for ent in event.entrants])}\n\nThe event `{event.name}` is about to start <t:{int(event.end_time.timestamp())}:R>",
-                        allowed_mentions=discord.AllowedMentions(users=True),
-                    )
+        self.schedule(event)
 
-                    event.pings += 1
+    @tasks.loop(minutes=1)
+    async def save_events(self):
+        await self.to_config()
 
     @check_events.before_loop
     async def before(self):
@@ -45,6 +45,8 @@ class Event:
         self.pings = pings or 0
 
         self.entrants: typing.List[Entrant] = []
+        self._entrants_by_id: typing.Dict[int, Entrant] = {}
+        self._message: typing.Optional[discord.Message] = None
 
     @property
     def cog(self):
@@ -199,10 +201,18 @@ class Event:
 
         return new
 
+    def forget_message(self):
+        """Drop the cached message, so the next lookup fetches it again."""
+        self._message = None
+
     async def _get_message(self) -> typing.Optional[discord.Message]:
+        if self._message is not None and self._message.id == self.message_id:
+            return self._message
+
         msg = list(filter(lambda x: x.id == self.message_id, self.bot.cached_messages))
 
         if msg:
+            self._message = msg[0]
             return msg[0]
 
         channel = self.channel
@@ -214,12 +224,11 @@ class Event:
             msg = await channel.fetch_message(self.message_id)
         except Exception:
             msg = None
+        self._message = msg
         return msg
 
     def get_entrant(self, user_id: int) -> typing.Optional["Entrant"]:
-        for entrant in self.entrants:
-            if entrant.user_id == user_id:
-                return entrant
+        return self._entrants_by_id.get(user_id)
 
     def add_entrant(
         self,
@@ -238,9 +247,11 @@ class Event:
             return entrant
         entrant = Entrant(user_name, user_id, self, category, category_class, spec, datetime.now())
         self.entrants.append(entrant)
+        self._entrants_by_id[user_id] = entrant
 
     def remove_entrant(self, entrant: "Entrant"):
         self.entrants.remove(entrant)
+        self._entrants_by_id.pop(entrant.user_id, None)
 
     @classmethod
     def from_json(cls, bot: Red, json: dict) -> "Event":
@@ -250,6 +261,7 @@ class Event:
         del json["entrants"]
         self = cls(bot, **json)
         self.entrants = [Entrant.from_json(self, i) for i in entrants]
+        self._entrants_by_id = {i.user_id: i for i in self.entrants}
         return self
 
 
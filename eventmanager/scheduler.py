@@ -0,0 +1,61 @@
+import asyncio
+import heapq
+import time
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+# cap on a single sleep so a wall clock jump can't delay deadlines for too long
+MAX_SLEEP = 5 * 60
+
+
+class DeadlineScheduler(Generic[K]):
+    """
+    Keeps one deadline (a unix timestamp) per key and hands keys out as their deadlines pass.
+
+    Deadlines live in a min-heap. Rescheduling or cancelling a key doesn't touch the heap,
+    the outdated entries are just skipped once they reach the top.
+    """
+
+    def __init__(self):
+        self.deadlines: Dict[K, float] = {}
+        self._heap: List[Tuple[float, K]] = []
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def __contains__(self, key: K):
+        return key in self.deadlines
+
+    def schedule(self, key: K, deadline: float):
+        self.deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+        if len(self._heap) > 2 * len(self.deadlines) + 64:
+            self._heap = [(d, k) for k, d in self.deadlines.items()]
+            heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    def cancel(self, key: K):
+        self.deadlines.pop(key, None)
+
+    def next_deadline(self) -> Optional[float]:
+        while self._heap and self.deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    async def next_due(self) -> K:
+        """Wait until the earliest deadline passes and return its key."""
+        while True:
+            self._wakeup.clear()
+            deadline = self.next_deadline()
+            if deadline is not None and deadline <= time.time():
+                _, key = heapq.heappop(self._heap)
+                del self.deadlines[key]
+                return key
+
+            timeout = MAX_SLEEP if deadline is None else min(deadline - time.time(), MAX_SLEEP)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
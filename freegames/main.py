@@ -10,6 +10,7 @@ import discord
 from discord.ext import tasks
 from redbot.core import Config, commands
 from redbot.core.bot import Red
+from redbot.core.utils import bounded_gather
 from redbot.core.utils import chat_formatting as cf
 
 from .abc import CompositeMetaClass
@@ -20,10 +21,13 @@ from .common.models import (
     FreeStuffResponse,
     GamerPowerGiveaway,
     GamerPowerResponse,
+    GuildSettings,
     StoreLogos,
 )
 
 log = logging.getLogger("red.craycogs.freegames")
+FREESTUFF_BASE_URL = "https://api.freestuffbot.xyz/v1"
+FREESTUFF_MAX_CONCURRENCY = 5
 RequestType = t.Literal["discord_deleted_user", "owner", "user", "user_strict"]
 
 T = t.TypeVar("T")
@@ -94,13 +98,10 @@ class FreeGames(Commands, commands.Cog, metaclass=CompositeMetaClass):
         self.post_task.cancel()
         await self.session.close()
 
-    async def fetch_gamerpower_games(self, platforms=[], exclude_ids=[]):
-        if platforms:
-            url = "https://www.gamerpower.com/api/filter"
-            params = {"platform": ".".join(platforms), "type": "game.beta"}
-        else:
-            url = "https://www.gamerpower.com/api/filter"
-            params = {"type": "game.beta"}
+    async def fetch_gamerpower_games(self) -> t.Optional[GamerPowerResponse]:
+        """All current giveaways, for every platform."""
+        url = "https://www.gamerpower.com/api/filter"
+        params = {"type": "game.beta"}
 
         async with self.session.get(url, params=params) as resp:
             if resp.status not in [200, 201]:
@@ -109,18 +110,59 @@ class FreeGames(Commands, commands.Cog, metaclass=CompositeMetaClass):
                 )
                 return
             data = await resp.json()
-            return GamerPowerResponse(
-                giveaways=filter(lambda x: x["id"] not in exclude_ids, data)
-            )
+            return GamerPowerResponse(giveaways=data)
+
+    async def fetch_freestuff_games(
+        self, exclude_ids: t.Container[int] = ()
+    ) -> t.Optional[FreeStuffResponse]:
+        """
+        The info of the currently free games, for every store.
 
-    async def fetch_freestuff_games(self, platforms=[], exclude_ids=[]):
-        baseurl = "https://api.freestuffbot.xyz/v1"
+        The games are looked up in chunks of 5, fetched concurrently as far
+        as the rate limit allows, skipping the ones in ``exclude_ids``."""
         headers = {
             "Authorization": f"Basic {(await self.bot.get_shared_api_tokens('freestuff')).get('api_key')}"
         }
+        resp = await self._freestuff_request("/games/free", headers)
+        if resp is None:
+            return
+        data, ratelimit = resp
+
+        remaining = int(
+            ratelimit["x-ratelimit-remaining"] or FREESTUFF_MAX_CONCURRENCY
+        )
+        responses = await bounded_gather(
+            *(
+                self._freestuff_request(
+                    f"/game/{'+'.join(map(str, chunk))}/info", headers
+                )
+                for chunk in chunks(
+                    filter(lambda x: x not in exclude_ids, data["data"]), 5
+                )
+            ),
+            limit=max(1, min(remaining, FREESTUFF_MAX_CONCURRENCY)),
+        )
+        results = [
+            game
+            for resp in responses
+            if resp is not None
+            for game in resp[0]["data"].values()
+        ]
+        try:
+            return FreeStuffResponse(games=filter(None, results))
+        except Exception as e:
+            log.exception(
+                "Malformed data recieved from the FreeStuffBot API", exc_info=e
+            )
+            log.exception("%s", json.dumps(results, indent=4))
+            return None
+
+    async def _freestuff_request(
+        self, endpoint: str, headers: dict[str, str]
+    ) -> t.Optional[tuple[dict, dict[str, int]]]:
         while True:
             async with self.session.get(
-                baseurl + "/games/free", headers=headers
+                FREESTUFF_BASE_URL + endpoint, headers=headers
             ) as resp:
                 rl_keys = [
                     "x-ratelimit-remaining",
@@ -137,40 +179,12 @@ class FreeGames(Commands, commands.Cog, metaclass=CompositeMetaClass):
                     continue
                 elif resp.status not in [200, 201]:
                     log.error(
-                        "Failed to fetch freestuff games: %s", await resp.json()
+                        "Failed to fetch %s from freestuff: %s",
+                        endpoint,
+                        await resp.json(),
                     )
                     return
-                data: dict[str, list[int]] = await resp.json()
-
-                results = []
-                for chunk in chunks(
-                    filter(lambda x: x not in exclude_ids, data["data"]), 5
-                ):
-                    ids = "+".join(map(str, chunk))
-                    async with self.session.get(
-                        baseurl + f"/game/{ids}/info", headers=headers
-                    ) as resp2:
-                        if resp2.status not in [200, 201]:
-                            log.error(
-                                "Failed to fetch freestuff game: %s",
-                                await resp2.json(),
-                            )
-                            continue
-
-                        json_data = await resp2.json()
-                        results.extend(json_data["data"].values())
-                try:
-                    return FreeStuffResponse(
-                    games=filter(
-                        lambda x: x
-                        and (x["store"] in platforms if platforms else True),
-                        results,
-                    )
-                )
-                except Exception as e:
-                    log.exception("Malformed data recieved from the FreeStuffBot API", exc_info=e)
-                    log.exception("%s", json.dumps(results, indent=4))
-                    return None
+                return await resp.json(), ratelimit
 
     @tasks.loop(
         time=[
@@ -181,72 +195,106 @@ class FreeGames(Commands, commands.Cog, metaclass=CompositeMetaClass):
         ]
     )
     async def check_for_freegames(self, save_after=True):
+        guilds: list[tuple[discord.Guild, GuildSettings]] = []
         for guildid, conf in self.db.configs.items():
             guild = self.bot.get_guild(guildid)
-            fs = conf.freestuff
-            gp = conf.gamerpower
-            pings = " ".join(
-                itertools.chain(
-                    (f"<@&{x}>" for x in conf.pingroles),
-                    (f"<@{x}>" for x in conf.pingusers),
-                )
-            )
-            if fs.toggle:
-                channel = guild.get_channel(fs.channel)
-                if not channel:
-                    fs.toggle = False
+            if not guild:
+                continue
+            for service, name in (
+                (conf.freestuff, "freestuff"),
+                (conf.gamerpower, "gamerpower"),
+            ):
+                if service.toggle and not guild.get_channel(service.channel):
+                    service.toggle = False
                     log.info(
-                        "Channel not found, disabling freestuff for guild %s",
+                        "Channel not found, disabling %s for guild %s",
+                        name,
                         guild,
                     )
-                    continue
-
-                exclude_ids = fs.posted_ids
-                platforms = fs.stores_to_check
-                data = await self.fetch_freestuff_games(platforms, exclude_ids)
-                if not data:
-                    continue
-
-                for game in data.games:
-                    embed, view = self.generate_freestuff_embed_view(game)
-                    await channel.send(
-                        pings,
-                        embed=embed,
-                        view=view,
-                        allowed_mentions=discord.AllowedMentions.all(),
-                    )
+            guilds.append((guild, conf))
+
+        # each provider is fetched once and filtered for every guild
+        fetches = {}
+        if fs_posted := [
+            conf.freestuff.posted_ids
+            for _, conf in guilds
+            if conf.freestuff.toggle
+        ]:
+            # only games some guild hasn't posted yet need to be looked up
+            fetches["freestuff"] = self.fetch_freestuff_games(
+                set.intersection(*fs_posted)
+            )
+        if any(conf.gamerpower.toggle for _, conf in guilds):
+            fetches["gamerpower"] = self.fetch_gamerpower_games()
+        providers = dict(zip(fetches, await asyncio.gather(*fetches.values())))
+        freestuff = providers.get("freestuff")
+        gamerpower = providers.get("gamerpower")
+
+        results = await bounded_gather(
+            *(
+                self.post_games(guild, conf, freestuff, gamerpower)
+                for guild, conf in guilds
+            ),
+            return_exceptions=True,
+        )
+        for (guild, _), result in zip(guilds, results):
+            if isinstance(result, Exception):
+                log.error(
+                    "Failed to post free games in guild %s",
+                    guild,
+                    exc_info=result,
+                )
 
-                fs.posted_ids.update((x.id for x in data.games))
+        if save_after:
+            await self.save()
 
-            if gp.toggle:
-                channel = guild.get_channel(gp.channel)
-                if not channel:
-                    gp.toggle = False
-                    log.info(
-                        "Channel not found, disabling gamerpower for guild %s",
-                        guild,
-                    )
+    async def post_games(
+        self,
+        guild: discord.Guild,
+        conf: GuildSettings,
+        freestuff: t.Optional[FreeStuffResponse],
+        gamerpower: t.Optional[GamerPowerResponse],
+    ):
+        pings = " ".join(
+            itertools.chain(
+                (f"<@&{x}>" for x in conf.pingroles),
+                (f"<@{x}>" for x in conf.pingusers),
+            )
+        )
+        fs = conf.freestuff
+        gp = conf.gamerpower
+        if fs.toggle and freestuff:
+            channel = guild.get_channel(fs.channel)
+            for game in freestuff.games:
+                if game.id in fs.posted_ids or (
+                    fs.stores_to_check and game.store not in fs.stores_to_check
+                ):
                     continue
-
-                exclude_ids = gp.posted_ids
-                platforms = gp.stores_to_check
-                data = await self.fetch_gamerpower_games(platforms, exclude_ids)
-                if not data:
+                embed, view = self.generate_freestuff_embed_view(game)
+                await channel.send(
+                    pings,
+                    embed=embed,
+                    view=view,
+                    allowed_mentions=discord.AllowedMentions.all(),
+                )
+                fs.posted_ids.add(game.id)
+
+        if gp.toggle and gamerpower:
+            channel = guild.get_channel(gp.channel)
+            for game in gamerpower.giveaways:
+                if game.id in gp.posted_ids or (
+                    gp.stores_to_check
+                    and gp.stores_to_check.isdisjoint(game.platforms)
+                ):
                     continue
-
-                for game in data.giveaways:
-                    embed, view = self.generate_gamerpower_embed_view(game)
-                    await channel.send(
-                        pings,
-                        embed=embed,
-                        view=view,
-                        allowed_mentions=discord.AllowedMentions.all(),
-                    )
-
-                gp.posted_ids.update((x.id for x in data.giveaways))
-
-        if save_after:
-            await self.save()
+                embed, view = self.generate_gamerpower_embed_view(game)
+                await channel.send(
+                    pings,
+                    embed=embed,
+                    view=view,
+                    allowed_mentions=discord.AllowedMentions.all(),
+                )
+                gp.posted_ids.add(game.id)
 
     @check_for_freegames.before_loop
     async def before_check_for_freegames(self):
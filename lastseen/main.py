@@ -7,8 +7,11 @@ import discord
 from discord.ext import tasks
 from redbot.core import Config, commands
 from redbot.core.bot import Red
+from redbot.core.data_manager import cog_data_path
 from redbot.core.utils.chat_formatting import humanize_list, pagify
 
+from .store import SeenStore, read_seen, write_seen
+
 
 class LastSeen(commands.Cog):
     """
@@ -24,7 +27,11 @@ class LastSeen(commands.Cog):
 
     def __init__(self, bot: Red):
         self.bot = bot
-        self.cache: typing.Dict[int, typing.Optional[float]] = {}
+        self.cache = SeenStore()
+        # every last seen time, written in one go instead of one config write per user
+        self.path = cog_data_path(self) / "seen.json"
+        # nothing is saved before the file was read, it would be overwritten otherwise
+        self._loaded = False
 
         self._task = self.save_to_config_every_5.start()
 
@@ -35,19 +42,48 @@ class LastSeen(commands.Cog):
 
     async def build_cache(self):
         await self.bot.wait_until_red_ready()
-        user_data = await self.config.all_users()
-        for user_id, data in user_data.items():
-            self.cache[user_id] = data["seen"]
+        seen = await asyncio.to_thread(read_seen, self.path)
+
+        # schema 1 kept the times in user config, they're moved to the file
+        migrate = await self.config.schema_version() < 2
+        if migrate:
+            for user_id, data in (await self.config.all_users()).items():
+                if data["seen"] is not None:
+                    seen.setdefault(user_id, data["seen"])
+
+        for user_id, timestamp in seen.items():
+            # the listeners run while this loads, what they saw is newer than the file
+            if user_id not in self.cache:
+                self.cache.set(user_id, timestamp, dirty=False)
+        self._loaded = True
+
+        if migrate:
+            await self.to_config(force=True)
+            await self.config.clear_all_users()
+            await self.config.schema_version.set(2)
 
         for guild in self.bot.guilds:
-            for member in guild.members:
-                if member.status is self.offline_status:
-                    if member.id not in self.cache:
-                        self.cache.update({member.id: time.time()})
+            self.track_offline_members(guild)
+
+    def track_offline_members(self, guild: discord.Guild):
+        now = time.time()
+        for member in guild.members:
+            if member.status is self.offline_status and member.id not in self.cache:
+                self.cache.set(member.id, now)
+
+    async def to_config(self, *, force: bool = False):
+        """Save the last seen times if any changed since the last save."""
+        if not self._loaded or not (self.cache.dirty or force):
+            return
+
+        dirty = self.cache.pop_dirty()
+        try:
+            # copied here so the listeners can keep updating the cache while it's written
+            await asyncio.to_thread(write_seen, self.path, dict(self.cache.seen))
 
-    async def to_config(self):
-        for user_id, seen in self.cache.copy().items():
-            await self.config.user_from_id(user_id).seen.set(seen)
+        except Exception:
+            self.cache.dirty.update(dirty)
+            raise
 
     def cog_unload(self):
         self._task.cancel()
@@ -66,9 +102,20 @@ class LastSeen(commands.Cog):
     @tasks.loop(minutes=5)
     async def save_to_config_every_5(self):
         await self.to_config()
-        self.cache.clear()
+
+    @save_to_config_every_5.before_loop
+    async def before_save(self):
         await self.build_cache()
 
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.track_offline_members(guild)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if not member.bot and member.status is self.offline_status and member.id not in self.cache:
+            self.cache.set(member.id, time.time())
+
     @commands.Cog.listener()
     async def on_typing(
         self,
@@ -87,7 +134,7 @@ class LastSeen(commands.Cog):
                 # it will be updated in on_member_update
                 return
 
-            self.cache.update({user.id: time.time()})
+            self.cache.set(user.id, time.time())
 
     @commands.Cog.listener()
     async def on_reaction_add(
@@ -104,7 +151,7 @@ class LastSeen(commands.Cog):
                 # it will be updated in on_member_update
                 return
 
-            self.cache.update({user.id: time.time()})
+            self.cache.set(user.id, time.time())
 
     @commands.Cog.listener()
     async def on_reaction_remove(
@@ -121,7 +168,7 @@ class LastSeen(commands.Cog):
                 # it will be updated in on_member_update
                 return
 
-            self.cache.update({user.id: time.time()})
+            self.cache.set(user.id, time.time())
 
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
@@ -134,7 +181,7 @@ class LastSeen(commands.Cog):
                 # it will be updated in on_member_update
                 return
 
-            self.cache.update({message.author.id: time.time()})
+            self.cache.set(message.author.id, time.time())
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
@@ -143,7 +190,7 @@ class LastSeen(commands.Cog):
 
         if before.status != after.status:
             if after.status is self.offline_status or before.status is self.offline_status:
-                self.cache.update({after.id: time.time()})
+                self.cache.set(after.id, time.time())
 
     @staticmethod
     def get_formatted_timestamps(t: float):
@@ -184,21 +231,14 @@ class LastSeen(commands.Cog):
         if not self.cache:
             return await ctx.maybe_send_embed("I haven't tracked any offline users yet.")
 
-        offline_users = dict(
-            sorted(
-                filter(
-                    lambda x: x
-                    and (user := ctx.guild.get_member(x[0]))
-                    and user.status is self.offline_status,
-                    self.cache.copy().items(),
-                ),
-                key=lambda x: x[1],
-            )
+        offline_users = filter(
+            lambda x: (user := ctx.guild.get_member(x[0])) and user.status is self.offline_status,
+            self.cache.oldest(),
         )
 
         final = ""
 
-        for ind, (user_id, lastseen) in enumerate(offline_users.items(), 1):
+        for ind, (user_id, lastseen) in enumerate(offline_users, 1):
             final += f"{ind}. <@{user_id}> - {self.get_formatted_timestamps(lastseen)}\n"
 
             if ind == x:
@@ -222,19 +262,12 @@ class LastSeen(commands.Cog):
 
         final = ""
 
-        sorted_dict = dict(
-            sorted(
-                filter(
-                    lambda x: x
-                    and (user := ctx.guild.get_member(x[0]))
-                    and user.status is self.offline_status,
-                    self.cache.copy().items(),
-                ),
-                key=lambda x: x[1],
-            )
+        offline_users = filter(
+            lambda x: (user := ctx.guild.get_member(x[0])) and user.status is self.offline_status,
+            self.cache.oldest(),
         )
 
-        for ind, (user_id, last_seen) in enumerate(sorted_dict.items(), 1):
+        for ind, (user_id, last_seen) in enumerate(offline_users, 1):
             final += (
                 f"{ind}. <@{user_id}> ({user_id}) - {self.get_formatted_timestamps(last_seen)}\n"
             )
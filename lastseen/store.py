@@ -0,0 +1,63 @@
+import bisect
+import json
+import os
+import pathlib
+import typing
+
+
+class SeenStore:
+    """
+    Last seen timestamps of users.
+
+    Besides the user id -> timestamp mapping this keeps a list of (timestamp, user id) pairs
+    sorted by timestamp, so the longest offline users can be read off in order, and a set of
+    the users whose timestamp changed since it was last saved."""
+
+    def __init__(self):
+        self.seen: typing.Dict[int, float] = {}
+        self.index: typing.List[typing.Tuple[float, int]] = []
+        self.dirty: typing.Set[int] = set()
+
+    def __len__(self):
+        return len(self.seen)
+
+    def __contains__(self, user_id: int):
+        return user_id in self.seen
+
+    def get(self, user_id: int, default: typing.Optional[float] = None):
+        return self.seen.get(user_id, default)
+
+    def set(self, user_id: int, seen: float, *, dirty: bool = True):
+        if (old := self.seen.get(user_id)) is not None:
+            index = bisect.bisect_left(self.index, (old, user_id))
+            if index < len(self.index) and self.index[index] == (old, user_id):
+                del self.index[index]
+
+        self.seen[user_id] = seen
+        bisect.insort(self.index, (seen, user_id))
+        if dirty:
+            self.dirty.add(user_id)
+
+    def oldest(self) -> typing.Iterator[typing.Tuple[int, float]]:
+        """All (user id, timestamp) pairs, the longest unseen first."""
+        for seen, user_id in self.index:
+            yield user_id, seen
+
+    def pop_dirty(self) -> typing.Dict[int, float]:
+        dirty, self.dirty = self.dirty, set()
+        return {user_id: self.seen[user_id] for user_id in dirty if user_id in self.seen}
+
+
+def read_seen(path: pathlib.Path) -> typing.Dict[int, float]:
+    if not path.exists():
+        return {}
+    with path.open() as f:
+        return {int(user_id): seen for user_id, seen in json.load(f).items()}
+
+
+def write_seen(path: pathlib.Path, seen: typing.Dict[int, float]):
+    """Write all timestamps to ``path`` at once, replacing the file only once it's written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(seen, separators=(",", ":")))
+    os.replace(tmp, path)
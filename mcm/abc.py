@@ -6,7 +6,11 @@ from discord.ext.commands.cog import CogMeta
 if TYPE_CHECKING:
     from redbot.core.bot import Red
 
+    from .common import Base
+    from .common.aggregates import StatsAggregates
+    from .common.history import StatsHistory
     from .common.models import DB
+    from .common.postcodes import AusPostClient, PostcodeIndex
 
 
 class CompositeMetaClass(CogMeta, ABCMeta):
@@ -19,7 +23,11 @@ class MixinMeta(ABC):
     def __init__(self, *_args):
         self.bot: Red
         self.db: DB
+        self.history: StatsHistory
+        self.aggregates: StatsAggregates
+        self.postcodes: PostcodeIndex
+        self.auspost: AusPostClient
 
     @abstractmethod
-    async def save(self) -> None:
+    async def save(self, model: "Base | None" = None) -> None:
         raise NotImplementedError
@@ -1,7 +1,10 @@
+import datetime
 import typing
 
+import discord
 from redbot.core import commands
 from redbot.core.utils import chat_formatting as cf
+from tabulate import tabulate
 
 from ..abc import MixinMeta
 from ..common.models import GuildSettings
@@ -16,17 +19,13 @@ class MCMTopLevel(MixinMeta):
     async def mcm_totalstats(self, ctx: commands.Context):
         """Show the total stats of all users"""
         conf = self.db.get_conf(ctx.guild)
-        data = conf.members
         vehicles = conf.vehicles
         categories = conf.vehicle_categories
         if not vehicles:
             return await ctx.send("No vehicles have been added yet.")
-        total_stats = dict.fromkeys(vehicles, 0)
-        for member_data in data.values():
-            for vehicle, amount in member_data.stats.items():
-                if vehicle not in total_stats:
-                    continue
-                total_stats[vehicle] += amount
+        aggregates = self.aggregates.get(conf)
+        totals = aggregates.to_dict(aggregates.total)
+        total_stats = {vehicle: totals.get(vehicle, 0) for vehicle in vehicles}
         total_stats = dict(
             sorted(
                 total_stats.items(),
@@ -45,27 +44,106 @@ class MCMTopLevel(MixinMeta):
         source = TotalStatsSource(items, vehicles)
         await Paginator(source, 0, use_select=True).start(ctx)
 
+    @mcm.command(name="growth", aliases=["leaderboard", "lb"])
+    async def mcm_growth(
+        self, ctx: commands.Context, days: commands.Range[int, 1, 3650] = 30
+    ):
+        """Show who added the most vehicles in the last few days"""
+        end = discord.utils.utcnow()
+        start = end - datetime.timedelta(days=days)
+        growth = await self.history.growth(
+            ctx.guild.id, start.timestamp(), end.timestamp()
+        )
+        if not growth:
+            return await ctx.send("No stats have been submitted in that time.")
+
+        rows = [
+            (
+                index,
+                getattr(ctx.guild.get_member(member_id), "display_name", member_id),
+                f"{amount:+}",
+            )
+            for index, (member_id, amount) in enumerate(growth[:20], 1)
+        ]
+        embed = discord.Embed(
+            title=f"Most vehicles added in the last {days} days",
+            description=cf.box(
+                tabulate(
+                    rows,
+                    headers=["#", "Member", "Added"],
+                    colalign=("right", "left", "right"),
+                )
+            ),
+        )
+        await ctx.send(embed=embed)
+
+    @mcm.command(name="vehiclehistory", aliases=["vh"])
+    async def mcm_vehiclehistory(
+        self,
+        ctx: commands.Context,
+        vehicle: str,
+        days: commands.Range[int, 1, 3650] = 30,
+    ):
+        """Show the total amount of a vehicle over the last few days"""
+        vehicle = vehicle.lower()
+        if vehicle not in self.db.get_conf(ctx.guild).vehicles:
+            return await ctx.send("That vehicle does not exist.")
+
+        end = discord.utils.utcnow()
+        points = [
+            end - datetime.timedelta(days=days * (6 - i) / 6) for i in range(7)
+        ]
+        totals = await self.history.vehicle_totals(
+            ctx.guild.id, vehicle, [point.timestamp() for point in points]
+        )
+        rows = [
+            (point.strftime("%Y-%m-%d"), total)
+            for point, total in zip(points, totals)
+        ]
+        embed = discord.Embed(
+            title=f"Total {vehicle} over the last {days} days",
+            description=cf.box(
+                tabulate(
+                    rows,
+                    headers=["Date", "Amount"],
+                    colalign=("left", "right"),
+                )
+            ),
+        )
+        await ctx.send(embed=embed)
+
     @mcm.command(name="export")
     @commands.is_owner()
     async def mcm_export(self, ctx: commands.Context):
         """Export all stats to a csv file"""
         conf = self.db.get_conf(ctx.guild)
-        data = conf.members
         vehicles = conf.vehicles
         if not vehicles:
             return await ctx.send("No vehicles have been added yet.")
-        total_stats = dict.fromkeys(vehicles, 0)
-        for member_data in data.values():
-            for vehicle, amount in member_data.stats.items():
-                if vehicle not in total_stats:
-                    continue
-                total_stats[vehicle] += amount
+        aggregates = self.aggregates.get(conf)
+        totals = aggregates.to_dict(aggregates.total)
+        total_stats = {vehicle: totals.get(vehicle, 0) for vehicle in vehicles}
 
         csv = "\n".join(
             [f"{vehicle},{amount}" for vehicle, amount in total_stats.items()]
         )
         await ctx.send(file=cf.text_to_file(csv, filename="stats.csv"))
 
+    @mcm.command(name="savestats", hidden=True)
+    @commands.is_owner()
+    async def mcm_savestats(self, ctx: commands.Context):
+        """Show statistics of the write-behind saves."""
+        saver = self.saver
+        await ctx.send(
+            f"Saves: {saver.saves} | Failed: {saver.failures} | "
+            f"Save requests: {saver.marks}\n"
+            f"Saves/sec (last minute): {saver.saves_per_second():.2f}\n"
+            f"Queue depth: {saver.queue_depth} guild(s)\n"
+            f"Bytes written: {saver.bytes_written}\n"
+            f"Last save latency: {saver.last_latency * 1000:.2f}ms | "
+            f"Average: {saver.average_latency * 1000:.2f}ms"
+        )
+
     @mcm.command(name="purge", aliases=["clearall"], usage="")
     @commands.is_owner()
     async def mcm_purge(
@@ -80,8 +158,9 @@ class MCMTopLevel(MixinMeta):
                 "Are you sure you want to purge all stats? If so, run the command again with `True` as the first argument."
             )
         self.db.configs[ctx.guild.id] = GuildSettings()
+        self.aggregates.forget(ctx.guild.id)
         await ctx.tick()
-        await self.save()
+        await self.save(self.db.get_conf(ctx.guild))
 
     @mcm.command(name="showsettings", aliases=["ss"])
     @commands.mod()
@@ -46,7 +46,15 @@ class MCMUserStats(MixinMeta):
             (user, conf.get_member(user).stats) for user in users
         ]
 
-        if len(users) > 1:
+        if isinstance(user_or_role, discord.Role) and len(users) > 1:
+            # combined stats of the role, kept up to date as stats change
+            aggregates = self.aggregates.get(conf)
+            all_users.insert(
+                0,
+                (None, aggregates.to_dict(aggregates.role_total(user_or_role))),
+            )
+
+        elif len(users) > 1:
             # combined stats of all users:
             all_users.insert(
                 0,
@@ -88,6 +96,7 @@ class MCMUserStats(MixinMeta):
         async with self.db.get_conf(ctx.guild) as conf:
             userid = user.id if isinstance(user, discord.User) else user
             conf.members.pop(userid, None)
+            self.aggregates.remove_member(ctx.guild, userid)
             await ctx.tick()
 
     @mcm_userstats.command(name="update")
@@ -114,7 +123,7 @@ class MCMUserStats(MixinMeta):
 
         conf = self.db.get_conf(ctx.guild)
 
-        async with conf.get_member(user) as member:
-            await self.log_new_stats(user, member.stats, vehicle_amount)
-            member.stats = vehicle_amount
-            await ctx.tick()
+        member = conf.get_member(user)
+        await self.log_new_stats(user, member.stats, vehicle_amount)
+        await self.update_stats(user.id, member, vehicle_amount)
+        await ctx.tick()
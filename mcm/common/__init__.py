@@ -39,7 +39,7 @@ class Base(BaseModel):
 
     async def __aexit__(self, exc_type, exc_value, traceback):
         if exc_type is None:
-            await self.cog.save()
+            await self.cog.save(self)
         else:
             from ..main import log
 
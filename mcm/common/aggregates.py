@@ -0,0 +1,148 @@
+import typing
+
+import discord
+import numpy as np
+
+if typing.TYPE_CHECKING:
+    from .models import GuildSettings
+
+__all__ = ["GuildAggregates", "StatsAggregates"]
+
+
+class GuildAggregates:
+    """Running vehicle totals of a guild, its members and its roles.
+
+    Stats are kept as vectors indexed by vehicle, and every change to a member's stats
+    or roles is applied to the guild and role totals as a delta. Role totals are only
+    built the first time a role is asked for, and kept up to date from then on."""
+
+    def __init__(self, conf: "GuildSettings"):
+        self.vehicle_index: dict[str, int] = {}
+        self.vehicles: list[str] = []
+        self.members: dict[int, np.ndarray] = {}
+        self.total = np.zeros(0, np.int64)
+        self.roles: dict[int, np.ndarray] = {}
+
+        for member_id, memdata in conf.members.items():
+            self.members[member_id] = vector = self.vector(memdata.stats)
+            self.total = self._add(self.total, vector)
+
+    def vector(self, stats: dict[str, int]) -> np.ndarray:
+        for name in stats:
+            if name not in self.vehicle_index:
+                self.vehicle_index[name] = len(self.vehicles)
+                self.vehicles.append(name)
+        vector = np.zeros(len(self.vehicles), np.int64)
+        for name, amount in stats.items():
+            vector[self.vehicle_index[name]] = amount
+        return vector
+
+    @staticmethod
+    def _add(a: np.ndarray, b: np.ndarray, sign: int = 1) -> np.ndarray:
+        if len(a) < len(b):
+            a = np.pad(a, (0, len(b) - len(a)))
+        a[: len(b)] += sign * b
+        return a
+
+    def to_dict(self, vector: np.ndarray) -> dict[str, int]:
+        return {
+            name: int(amount) for name, amount in zip(self.vehicles, vector) if amount
+        }
+
+    def set_member(
+        self,
+        member_id: int,
+        stats: dict[str, int],
+        role_ids: typing.Iterable[int] = (),
+    ):
+        vector = self.vector(stats)
+        old = self.members.get(member_id)
+        delta = vector if old is None else self._add(vector.copy(), old, -1)
+        self.members[member_id] = vector
+        self.total = self._add(self.total, delta)
+        for role_id in role_ids:
+            if role_id in self.roles:
+                self.roles[role_id] = self._add(self.roles[role_id], delta)
+
+    def remove_member(self, member_id: int, role_ids: typing.Iterable[int] = ()):
+        """Forget a member's stats, e.g. after they were cleared."""
+        if (old := self.members.pop(member_id, None)) is None:
+            return
+        self.total = self._add(self.total, old, -1)
+        self.update_roles(member_id, removed=role_ids, vector=old)
+
+    def update_roles(
+        self,
+        member_id: int,
+        added: typing.Iterable[int] = (),
+        removed: typing.Iterable[int] = (),
+        *,
+        vector: typing.Optional[np.ndarray] = None,
+    ):
+        """Move a member's stats in or out of the cached role totals."""
+        if vector is None and (vector := self.members.get(member_id)) is None:
+            return
+        for sign, role_ids in ((1, added), (-1, removed)):
+            for role_id in role_ids:
+                if role_id in self.roles:
+                    self.roles[role_id] = self._add(self.roles[role_id], vector, sign)
+
+    def role_total(self, role: discord.Role) -> np.ndarray:
+        try:
+            return self.roles[role.id]
+        except KeyError:
+            total = np.zeros(len(self.vehicles), np.int64)
+            for member in role.members:
+                if (vector := self.members.get(member.id)) is not None:
+                    total = self._add(total, vector)
+            self.roles[role.id] = total
+            return total
+
+
+class StatsAggregates:
+    """The `GuildAggregates` of every guild, built lazily from the guild's config."""
+
+    def __init__(self):
+        self.guilds: dict[int, GuildAggregates] = {}
+
+    def get(self, conf: "GuildSettings") -> GuildAggregates:
+        assert conf.guild_id is not None
+        try:
+            return self.guilds[conf.guild_id]
+        except KeyError:
+            aggregates = self.guilds[conf.guild_id] = GuildAggregates(conf)
+            return aggregates
+
+    def forget(self, guild_id: int):
+        """Drop a guild's totals, they are rebuilt from its config on next use."""
+        self.guilds.pop(guild_id, None)
+
+    def set_member(
+        self,
+        guild_id: int,
+        member_id: int,
+        stats: dict[str, int],
+        member: discord.Member | None = None,
+    ):
+        if (aggregates := self.guilds.get(guild_id)) is not None:
+            aggregates.set_member(
+                member_id, stats, [role.id for role in member.roles] if member else ()
+            )
+
+    def remove_member(self, guild: discord.Guild, member_id: int):
+        if (aggregates := self.guilds.get(guild.id)) is None:
+            return
+        member = guild.get_member(member_id)
+        aggregates.remove_member(
+            member_id, [role.id for role in member.roles] if member else ()
+        )
+
+    def update_roles(
+        self,
+        guild_id: int,
+        member_id: int,
+        added: typing.Iterable[int] = (),
+        removed: typing.Iterable[int] = (),
+    ):
+        if (aggregates := self.guilds.get(guild_id)) is not None:
+            aggregates.update_roles(member_id, added, removed)
@@ -0,0 +1,255 @@
+import asyncio
+import json
+import logging
+import os
+import pathlib
+import time
+import typing
+
+import numpy as np
+
+log = logging.getLogger("red.craycogs.mcm.history")
+
+__all__ = ["GuildHistory", "StatsHistory"]
+
+# one row per accepted submission
+SUBMISSION_COLUMNS = {
+    "timestamp": np.dtype("<i8"),
+    "member": np.dtype("<u8"),
+    "total": np.dtype("<i8"),
+    "offset": np.dtype("<u8"),
+    "count": np.dtype("<u4"),
+}
+# one row per vehicle of a submission, referenced by a submission's offset and count
+ROW_COLUMNS = {
+    "vehicle": np.dtype("<u4"),
+    "amount": np.dtype("<i8"),
+}
+
+
+class GuildHistory:
+    """Append-only columnar history of one guild's stats submissions.
+
+    Every column is a flat little-endian binary file in ``path`` that only ever grows,
+    and vehicle names are interned in ``vehicles.json``. Submissions are appended in
+    time order, so range queries are a binary search on the timestamp column.
+
+    This class does blocking file IO; `StatsHistory` runs it in a thread."""
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        vehicles_file = self.path / "vehicles.json"
+        self.vehicles: list[str] = (
+            json.loads(vehicles_file.read_text()) if vehicles_file.exists() else []
+        )
+        self.vehicle_index = {name: i for i, name in enumerate(self.vehicles)}
+        self._repair()
+        timestamps = self.read("timestamp")
+        self.last_timestamp = int(timestamps[-1]) if len(timestamps) else 0
+
+    def _file(self, column: str) -> pathlib.Path:
+        return self.path / f"{column}.bin"
+
+    def _length(self, column: str, dtype: np.dtype) -> int:
+        file = self._file(column)
+        return file.stat().st_size // dtype.itemsize if file.exists() else 0
+
+    def _truncate(self, column: str, length: int):
+        dtype = SUBMISSION_COLUMNS.get(column) or ROW_COLUMNS[column]
+        file = self._file(column)
+        if file.exists() and file.stat().st_size != length * dtype.itemsize:
+            log.warning("Truncating %s to %d rows", file, length)
+            with file.open("r+b") as f:
+                f.truncate(length * dtype.itemsize)
+
+    def _repair(self):
+        """Bring the columns back in line after an interrupted append.
+
+        The submission columns are cut back to the last complete submission, and
+        submissions referencing rows that aren't fully on disk are dropped. Rows past
+        the end of the last submission were never referenced, so they're dropped too.
+        """
+        length = min(
+            self._length(column, dtype) for column, dtype in SUBMISSION_COLUMNS.items()
+        )
+        rows = min(self._length(column, dtype) for column, dtype in ROW_COLUMNS.items())
+        ends = (
+            self.read("offset")[:length].astype(np.int64) + self.read("count")[:length]
+        )
+        # offsets only grow, so the submissions past the rows are all at the end
+        length = int(np.searchsorted(ends, rows, side="right"))
+        for column in SUBMISSION_COLUMNS:
+            self._truncate(column, length)
+
+        self.rows = int(ends[length - 1]) if length else 0
+        for column in ROW_COLUMNS:
+            self._truncate(column, self.rows)
+
+    def __len__(self) -> int:
+        return self._length("timestamp", SUBMISSION_COLUMNS["timestamp"])
+
+    def read(self, column: str) -> np.ndarray:
+        dtype = SUBMISSION_COLUMNS.get(column) or ROW_COLUMNS[column]
+        file = self._file(column)
+        if not file.exists():
+            return np.empty(0, dtype)
+        return np.fromfile(file, dtype)
+
+    def _append(self, column: str, values) -> None:
+        dtype = SUBMISSION_COLUMNS.get(column) or ROW_COLUMNS[column]
+        with self._file(column).open("ab") as f:
+            f.write(np.asarray(values, dtype).tobytes())
+
+    def _intern(self, names: typing.Iterable[str]) -> list[int]:
+        new = [name for name in dict.fromkeys(names) if name not in self.vehicle_index]
+        if new:
+            for name in new:
+                self.vehicle_index[name] = len(self.vehicles)
+                self.vehicles.append(name)
+            tmp = self.path / "vehicles.json.tmp"
+            tmp.write_text(json.dumps(self.vehicles))
+            os.replace(tmp, self.path / "vehicles.json")
+        return [self.vehicle_index[name] for name in names]
+
+    def append(self, timestamp: int, member_id: int, stats: dict[str, int]) -> None:
+        """Record a submission. The vehicle rows are written before the submission
+        that references them, so a crash can only leave unreferenced rows behind."""
+        # keep the timestamp column sorted even if the clock goes backwards
+        timestamp = max(timestamp, self.last_timestamp)
+        names = list(stats)
+        offset = self.rows
+        try:
+            self._append("vehicle", self._intern(names))
+            self._append("amount", [stats[name] for name in names])
+            self._append("timestamp", [timestamp])
+            self._append("member", [member_id])
+            self._append("total", [sum(stats.values())])
+            self._append("offset", [offset])
+            self._append("count", [len(names)])
+        except BaseException:
+            # don't let the next append build on a half written one
+            self._repair()
+            raise
+        self.rows += len(names)
+        self.last_timestamp = timestamp
+
+    @staticmethod
+    def _latest(members: np.ndarray, indices: np.ndarray):
+        """The members in ``indices`` and the index of each one's last submission."""
+        reverse = indices[::-1]
+        uniq, first = np.unique(members[reverse], return_index=True)
+        return uniq, reverse[first]
+
+    def growth(self, start: int, end: int) -> list[tuple[int, int]]:
+        """Vehicles added per member between two timestamps, highest first.
+
+        A member's growth is their last total before ``end`` minus their last total
+        before ``start``, or their first total in the range if they had none before."""
+        timestamps = self.read("timestamp")
+        members = self.read("member")[: len(timestamps)]
+        totals = self.read("total")[: len(timestamps)]
+        lo = np.searchsorted(timestamps, start, side="left")
+        hi = np.searchsorted(timestamps, end, side="right")
+        if lo == hi:
+            return []
+
+        window = np.arange(lo, hi)
+        active, last = self._latest(members, window)
+        # the first submission of every member in the window
+        _, first = np.unique(members[window], return_index=True)
+        baseline = totals[window[first]]
+
+        before, before_last = self._latest(members, np.arange(lo))
+        known = np.isin(active, before)
+        baseline[known] = totals[before_last[np.searchsorted(before, active[known])]]
+
+        growth = totals[last] - baseline
+        order = np.argsort(-growth, kind="stable")
+        return [(int(active[i]), int(growth[i])) for i in order]
+
+    def vehicle_totals(self, vehicle: str, points: typing.Sequence[int]) -> list[int]:
+        """The guild-wide amount of a vehicle at each of the given timestamps."""
+        if vehicle not in self.vehicle_index:
+            return [0] * len(points)
+        vehicle_id = self.vehicle_index[vehicle]
+
+        timestamps = self.read("timestamp")
+        members = self.read("member")[: len(timestamps)]
+        offsets = self.read("offset")[: len(timestamps)]
+        counts = self.read("count")[: len(timestamps)]
+        vehicles = self.read("vehicle")
+        amounts = self.read("amount")[: len(vehicles)]
+
+        # amount of the vehicle in every submission
+        per_submission = np.zeros(len(timestamps), np.int64)
+        counts = counts.astype(np.int64)
+        owner = np.repeat(np.arange(len(timestamps)), counts)
+        starts = np.cumsum(counts) - counts
+        rows = np.repeat(offsets.astype(np.int64) - starts, counts) + np.arange(
+            counts.sum()
+        )
+        matches = vehicles[rows] == vehicle_id
+        np.add.at(per_submission, owner[matches], amounts[rows[matches]])
+
+        result = []
+        for point in points:
+            hi = np.searchsorted(timestamps, point, side="right")
+            _, last = self._latest(members, np.arange(hi))
+            result.append(int(per_submission[last].sum()))
+        return result
+
+
+class StatsHistory:
+    """The stats histories of all guilds, stored under ``path/<guild id>``."""
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.guilds: dict[int, GuildHistory] = {}
+        self._lock = asyncio.Lock()
+
+    def get(self, guild_id: int) -> GuildHistory:
+        try:
+            return self.guilds[guild_id]
+        except KeyError:
+            history = self.guilds[guild_id] = GuildHistory(self.path / str(guild_id))
+            return history
+
+    async def append(
+        self,
+        guild_id: int,
+        member_id: int,
+        stats: dict[str, int],
+        timestamp: typing.Optional[float] = None,
+    ):
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        async with self._lock:
+            try:
+                await asyncio.to_thread(
+                    lambda: self.get(guild_id).append(timestamp, member_id, stats)
+                )
+            except Exception as e:
+                log.exception(
+                    "Failed to record stats history for %s in guild %s",
+                    member_id,
+                    guild_id,
+                    exc_info=e,
+                )
+
+    async def growth(
+        self, guild_id: int, start: float, end: float
+    ) -> list[tuple[int, int]]:
+        async with self._lock:
+            return await asyncio.to_thread(
+                lambda: self.get(guild_id).growth(int(start), int(end))
+            )
+
+    async def vehicle_totals(
+        self, guild_id: int, vehicle: str, points: typing.Sequence[float]
+    ) -> list[int]:
+        async with self._lock:
+            return await asyncio.to_thread(
+                lambda: self.get(guild_id).vehicle_totals(
+                    vehicle, [int(p) for p in points]
+                )
+            )
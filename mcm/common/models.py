@@ -53,6 +53,12 @@ class MemberData(Base):
     registered_by: typing.Optional[int] = None
     leave_date: typing.Optional[datetime.datetime] = None
 
+    _guild_id: typing.Optional[int] = pydantic.PrivateAttr(default=None)
+
+    @property
+    def guild_id(self) -> typing.Optional[int]:
+        return self._guild_id
+
 
 class GuildSettings(Base):
     logchannel: typing.Optional[int] = None
@@ -74,9 +80,23 @@ class GuildSettings(Base):
         default_factory=RegistrationConfig
     )
 
+    _guild_id: typing.Optional[int] = pydantic.PrivateAttr(default=None)
+
+    @property
+    def guild_id(self) -> typing.Optional[int]:
+        return self._guild_id
+
+    def bind(self, guild_id: int):
+        """Record which guild's shard this config and its members are saved to."""
+        self._guild_id = guild_id
+        for member in self.members.values():
+            member._guild_id = guild_id
+
     def get_member(self, member: discord.Member | int):
         mid = member if isinstance(member, int) else member.id
-        return self.members.setdefault(mid, MemberData())
+        data = self.members.setdefault(mid, MemberData())
+        data._guild_id = self._guild_id
+        return data
 
 
 class DB(Base):
@@ -85,4 +105,6 @@ class DB(Base):
     def get_conf(self, guild: discord.Guild | int) -> GuildSettings:
         gid = guild if isinstance(guild, int) else guild.id
         conf = self.configs.setdefault(gid, GuildSettings())
+        if conf.guild_id != gid:
+            conf.bind(gid)
         return conf
@@ -0,0 +1,112 @@
+import asyncio
+import collections
+import json
+import logging
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+    from ..main import MissionChiefMetrics
+
+log = logging.getLogger("red.craycogs.mcm.persistence")
+
+
+class SaveScheduler:
+    """Write-behind persistence for the mcm DB.
+
+    Every guild is stored as its own shard in the guild scope of the config. Saving a
+    `GuildSettings` or one of its `MemberData` only marks that guild dirty, and dirty
+    guilds are written after ``delay`` seconds, so a burst of stats submissions is
+    coalesced into one write per guild. Changes made while a flush is running are
+    picked up by that same flush, so the last mutation is always persisted."""
+
+    def __init__(self, cog: "MissionChiefMetrics", delay: float = 5.0):
+        self.cog = cog
+        self.delay = delay
+        self.dirty: set[int] = set()
+        self._task: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+        self._save_times: collections.deque[float] = collections.deque()
+
+        self.marks = 0
+        self.saves = 0
+        self.failures = 0
+        self.bytes_written = 0
+        self.total_latency = 0.0
+        self.last_latency = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.dirty)
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.saves if self.saves else 0.0
+
+    def saves_per_second(self, window: float = 60.0) -> float:
+        """Average number of shard writes per second over the last ``window`` seconds."""
+        cutoff = time.monotonic() - window
+        while self._save_times and self._save_times[0] < cutoff:
+            self._save_times.popleft()
+        return len(self._save_times) / window
+
+    def mark(self, guild_id: typing.Optional[int] = None):
+        """Mark a guild's shard (or every shard if None) as needing a save."""
+        self.marks += 1
+        if guild_id is None:
+            self.dirty.update(self.cog.db.configs)
+        else:
+            self.dirty.add(guild_id)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.delay)
+        await self.flush()
+
+    async def close(self):
+        """Cancel the pending delayed flush and write everything that is still dirty."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            while self.dirty:
+                failed = False
+                guild_ids, self.dirty = self.dirty, set()
+                for guild_id in guild_ids:
+                    group = self.cog.config.guild_from_id(guild_id)
+                    conf = self.cog.db.configs.get(guild_id)
+                    if conf is None:
+                        await group.clear()
+
+                    elif not await self._write(group.settings, conf):
+                        self.dirty.add(guild_id)
+                        failed = True
+
+                if failed:
+                    # whatever failed stays dirty and is retried on the next flush
+                    break
+
+    async def _write(self, value, model) -> bool:
+        def dump():
+            data = model.model_dump(mode="json")
+            return data, len(json.dumps(data, separators=(",", ":")))
+
+        start = time.perf_counter()
+        try:
+            data, size = await asyncio.to_thread(dump)
+            await value.set(data)
+        except Exception as e:
+            self.failures += 1
+            log.exception("Failed to save config", exc_info=e)
+            return False
+
+        self.last_latency = time.perf_counter() - start
+        self.total_latency += self.last_latency
+        self.saves += 1
+        self.bytes_written += size
+        self._save_times.append(time.monotonic())
+        return True
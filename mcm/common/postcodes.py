@@ -0,0 +1,149 @@
+import asyncio
+import bisect
+import collections
+import csv
+import logging
+import pathlib
+import re
+import time
+import typing
+
+import aiohttp
+
+log = logging.getLogger("red.craycogs.mcm.postcodes")
+
+__all__ = ["PostcodeIndex", "AusPostClient"]
+
+_END = "\0"
+_word_regex = re.compile(r"[a-z0-9']+")
+
+
+class PostcodeIndex:
+    """Offline lookup of Australian states by postcode or locality name.
+
+    Postcodes are resolved with a bisect over a sorted table of non-overlapping
+    ``[start, stop)`` intervals. Locality names are stored in a word trie so a
+    message can be scanned for the longest matching names in a single pass."""
+
+    def __init__(
+        self,
+        intervals: typing.Iterable[tuple[int, int, str]],
+        localities: typing.Iterable[tuple[str, str]],
+    ):
+        intervals = sorted(intervals)
+        self.starts = [start for start, _, _ in intervals]
+        self.stops = [stop for _, stop, _ in intervals]
+        self.states = [state for _, _, state in intervals]
+
+        self.trie: dict[str, typing.Any] = {}
+        for name, state in localities:
+            node = self.trie
+            for word in _word_regex.findall(name.lower()):
+                node = node.setdefault(word, {})
+            node.setdefault(_END, set()).add(state)
+
+    @classmethod
+    def from_path(cls, path: pathlib.Path) -> "PostcodeIndex":
+        """Load ``postcodes.csv`` and ``localities.csv`` from a data directory."""
+        with (path / "postcodes.csv").open(newline="") as f:
+            intervals = [
+                (int(row["start"]), int(row["stop"]), row["state"])
+                for row in csv.DictReader(f)
+            ]
+        with (path / "localities.csv").open(newline="") as f:
+            localities = [(row["locality"], row["state"]) for row in csv.DictReader(f)]
+        return cls(intervals, localities)
+
+    def state_for_postcode(self, postcode: int) -> typing.Optional[str]:
+        index = bisect.bisect_right(self.starts, postcode) - 1
+        if index >= 0 and postcode < self.stops[index]:
+            return self.states[index]
+        return None
+
+    def states_in_text(self, text: str) -> list[str]:
+        """The states of every locality named in the text, longest match first."""
+        words = _word_regex.findall(text.lower())
+        states: list[str] = []
+        i = 0
+        while i < len(words):
+            node, match, end = self.trie, None, i
+            for j in range(i, len(words)):
+                if (node := node.get(words[j])) is None:
+                    break
+                if _END in node:
+                    match, end = node[_END], j
+            if match:
+                states.extend(match)
+                i = end + 1
+            else:
+                i += 1
+        return states
+
+    def state_for_text(self, text: str) -> typing.Optional[str]:
+        if states := self.states_in_text(text):
+            return collections.Counter(states).most_common(1)[0][0]
+        return None
+
+
+class AusPostClient:
+    """The AusPost postcode search API with a shared session and a TTL cache of
+    past answers. Only used when the offline index can't place a message."""
+
+    URL = "https://digitalapi.auspost.com.au/postcode/search.json"
+
+    def __init__(self, ttl: float = 24 * 60 * 60, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.cache: collections.OrderedDict[str, tuple[float, list[str]]] = (
+            collections.OrderedDict()
+        )
+        self._session: typing.Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def search(self, api_key: str, queries: typing.Iterable[str]) -> list[str]:
+        """The states of the localities matching each query, fetched concurrently."""
+        queries = [*dict.fromkeys(q.strip().lower() for q in queries if q.strip())]
+        results = await asyncio.gather(
+            *(self._search(api_key, query) for query in queries)
+        )
+        return [state for states in results for state in states]
+
+    async def _search(self, api_key: str, query: str) -> list[str]:
+        now = time.monotonic()
+        if (cached := self.cache.get(query)) is not None and cached[0] > now:
+            self.cache.move_to_end(query)
+            return cached[1]
+
+        try:
+            async with self.session.get(
+                self.URL, params={"q": query}, headers={"AUTH-KEY": api_key}
+            ) as resp:
+                if resp.status != 200:
+                    return []
+                json: dict[str, typing.Any] = await resp.json()
+        except aiohttp.ClientError as e:
+            log.warning("AusPost lookup for %r failed: %s", query, e)
+            return []
+
+        states = []
+        if isinstance(json.get("localities"), dict):
+            locality = json["localities"]["locality"]
+            states = [
+                d["state"]
+                for d in (locality if isinstance(locality, list) else [locality])
+            ]
+
+        self.cache[query] = (now + self.ttl, states)
+        self.cache.move_to_end(query)
+        while len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return states
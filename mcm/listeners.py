@@ -1,9 +1,7 @@
 import collections
 import contextlib
 import re
-import typing
 
-import aiohttp
 import discord
 from redbot.core import commands
 from redbot.core.utils import chat_formatting as cf
@@ -11,7 +9,7 @@ from redbot.core.utils.views import ConfirmView
 from tabulate import tabulate
 
 from .abc import CompositeMetaClass, MixinMeta
-from .common.models import StatePostCodeRanges, StateShorthands
+from .common.models import StateShorthands
 from .common.utils import parse_vehicles
 from .views import ClearOrNot, InvalidStats, ReminderDuration
 
@@ -20,6 +18,9 @@ class Listeners(MixinMeta, metaclass=CompositeMetaClass):
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         conf = self.db.get_conf(member.guild)
+        self.aggregates.update_roles(
+            member.guild.id, member.id, added=[role.id for role in member.roles]
+        )
         memdata = conf.get_member(member.id)
 
         if memdata.leave_date:
@@ -33,6 +34,9 @@ class Listeners(MixinMeta, metaclass=CompositeMetaClass):
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         conf = self.db.get_conf(member.guild)
+        self.aggregates.update_roles(
+            member.guild.id, member.id, removed=[role.id for role in member.roles]
+        )
         if not all(
             [
                 *conf.vehicles,
@@ -64,6 +68,16 @@ class Listeners(MixinMeta, metaclass=CompositeMetaClass):
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles:
+            before_roles = {role.id for role in before.roles}
+            after_roles = {role.id for role in after.roles}
+            self.aggregates.update_roles(
+                after.guild.id,
+                after.id,
+                added=after_roles - before_roles,
+                removed=before_roles - after_roles,
+            )
+
         conf = self.db.get_conf(after.guild)
         memdata = conf.get_member(before.id)
         if before.nick != after.nick and memdata.username:
@@ -117,15 +131,8 @@ class Listeners(MixinMeta, metaclass=CompositeMetaClass):
         if postcodematch:
             postcode = int(postcodematch.group())
 
-            # find the state that the postcode belongs to with the help of the australian_state_to_postcodes dict
-            state = next(
-                (
-                    state
-                    for state, data in StatePostCodeRanges.__members__.items()
-                    if postcode in data.value
-                ),
-                None,
-            )
+            # find the state that the postcode belongs to in the bundled postcode table
+            state = self.postcodes.state_for_postcode(postcode)
 
         else:
             # if no postcode is found, search for the state name in the content
@@ -140,32 +147,14 @@ class Listeners(MixinMeta, metaclass=CompositeMetaClass):
             )
 
         if state is None:
-            # if no state is found, query the https://digitalapi.auspost.com.au/postcode/search.json API with the content, split by a ','
+            # if no state is found, look for a known locality name in the content
+            state = self.postcodes.state_for_text(content)
+
+        if state is None:
+            # as a last resort, query the AusPost API with the content, split by a ','
             api_key = (await self.bot.get_shared_api_tokens("auspost")).get("key")
             if api_key:
-                queries = content.strip().split(",")
-                results = list[str]()
-                async with aiohttp.ClientSession() as session:
-                    for query in queries:
-                        async with session.get(
-                            "https://digitalapi.auspost.com.au/postcode/search.json",
-                            params={"q": query.strip()},
-                            headers={"AUTH-KEY": api_key},
-                        ) as resp:
-                            if resp.status == 200:
-                                json: dict[str, typing.Any] = await resp.json()
-                                if isinstance(json.get("localities"), dict):
-                                    results.extend(
-                                        d["state"]
-                                        for d in (
-                                            json["localities"]["locality"]
-                                            if isinstance(
-                                                json["localities"]["locality"],
-                                                list,
-                                            )
-                                            else [json["localities"]["locality"]]
-                                        )
-                                    )
+                results = await self.auspost.search(api_key, content.split(","))
                 if results:
                     state = collections.Counter(results).most_common(1)[0][0]
 
@@ -249,8 +238,7 @@ class Listeners(MixinMeta, metaclass=CompositeMetaClass):
 
         old_stats = memdata.stats
 
-        async with memdata:
-            memdata.stats = vehicle_amount
+        await self.update_stats(message.author.id, memdata, vehicle_amount)
 
         await self.log_new_stats(message.author, old_stats, vehicle_amount)
 
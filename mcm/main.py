@@ -5,12 +5,18 @@ import typing as t
 import discord
 from redbot.core import Config, commands
 from redbot.core.bot import Red
+from redbot.core.data_manager import bundled_data_path, cog_data_path
 from redbot.core.utils import chat_formatting as cf
 from tabulate import tabulate
 
 from .abc import CompositeMetaClass
 from .commands import Commands
-from .common.models import DB
+from .common import Base
+from .common.aggregates import StatsAggregates
+from .common.history import StatsHistory
+from .common.models import DB, GuildSettings, MemberData
+from .common.persistence import SaveScheduler
+from .common.postcodes import AusPostClient, PostcodeIndex
 from .common.utils import union_dicts
 from .listeners import Listeners
 from .views import (
@@ -45,9 +51,14 @@ class MissionChiefMetrics(
         self.bot: Red = bot
         self.config = Config.get_conf(self, 117, force_registration=True)
         self.config.register_global(db={}, version=1)
+        self.config.register_guild(settings={})
 
         self.db: DB = DB()
-        self.saving: asyncio.Future[t.Literal[True]] | t.Literal[False] = False
+        self.saver = SaveScheduler(self)
+        self.history = StatsHistory(cog_data_path(self) / "history")
+        self.aggregates = StatsAggregates()
+        self.postcodes = PostcodeIndex.from_path(bundled_data_path(self))
+        self.auspost = AusPostClient()
 
         self.bot.add_dynamic_items(
             AcceptRegistration,
@@ -80,50 +91,53 @@ class MissionChiefMetrics(
             RejectWithBanRegistration,
             ViewStats,
         )
-        await self.save()
+        await self.saver.close()
+        await self.auspost.close()
 
     async def cog_load(self) -> None:
         asyncio.create_task(self.initialize())
 
     async def initialize(self) -> None:
         await self.bot.wait_until_red_ready()
-        if (await self.config.version()) == 1:
+        version = await self.config.version()
+        if version == 1:
             await self.migrate_to_v2()
-
-        data = await self.config.db()
+        if version <= 2:
+            await self.migrate_to_v3()
+
+        data = {
+            "configs": {
+                guild_id: guild_data["settings"]
+                for guild_id, guild_data in (await self.config.all_guilds()).items()
+                if guild_data["settings"]
+            }
+        }
         DB.cog = self
         self.db = await asyncio.to_thread(DB.model_validate, data)
         log.info("Config loaded")
 
-    async def save(self) -> None:
-        if self.saving:
-            log.debug("%s", self.saving)
-            if self.saving.done() and (exc := self.saving.exception()):
-                log.exception(
-                    "Failed to save config before so not saving again to avoid data corruption",
-                    exc_info=exc,
-                )
-                return
-
-            elif not self.saving.done():
-                try:
-                    log.debug("Awaiting saving previous instance")
-                    await self.saving
-
-                except Exception as e:
-                    log.exception("Failed to save config", exc_info=e)
-        try:
-            log.debug("Creating new future")
-            self.saving = self.bot.loop.create_future()
-            log.debug("Future: %s", self.saving)
-            dump = await asyncio.to_thread(self.db.model_dump, mode="json")
-            await self.config.db.set(dump)
-            log.debug("Saved config")
-            self.saving.set_result(True)
-            log.debug("Set result to True")
-        except Exception as e:
-            log.exception("Failed to save config", exc_info=e)
-            self.saving.set_exception(e)
+    async def save(self, model: Base | None = None) -> None:
+        """Schedule a write of the guild shard the given model belongs to.
+
+        Anything that isn't a guild config or member (or is not bound to a guild yet)
+        schedules a write of every guild."""
+        guild_id = (
+            model.guild_id if isinstance(model, (GuildSettings, MemberData)) else None
+        )
+        self.saver.mark(guild_id)
+
+    async def update_stats(
+        self, member_id: int, memdata: MemberData, stats: dict[str, int]
+    ) -> None:
+        """Replace a member's stats and record the submission in the stats history."""
+        async with memdata:
+            memdata.stats = stats
+        if (guild_id := memdata.guild_id) is not None:
+            guild = self.bot.get_guild(guild_id)
+            self.aggregates.set_member(
+                guild_id, member_id, stats, guild and guild.get_member(member_id)
+            )
+            await self.history.append(guild_id, member_id, stats)
 
     async def migrate_to_v2(self):
         config = Config.get_conf(self, identifier=1234567890)
@@ -134,6 +148,14 @@ class MissionChiefMetrics(
         await self.config.db.set({"configs": guilds})
         await self.config.version.set(2)
 
+    async def migrate_to_v3(self):
+        data = await self.config.db()
+        for guild_id, settings in data.pop("configs", {}).items():
+            await self.config.guild_from_id(int(guild_id)).settings.set(settings)
+
+        await self.config.db.set(data)
+        await self.config.version.set(3)
+
     async def log_new_stats(
         self,
         user: discord.Member,
@@ -73,6 +73,7 @@ class Clear(
 
         async with conf:
             conf.members.pop(self.userid, None)
+        cog.aggregates.remove_member(interaction.guild, self.userid)
 
         await interaction.edit_original_response(content="Cleared.")
 
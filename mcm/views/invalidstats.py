@@ -315,8 +315,9 @@ class AddVehicles(
                 conf.get_member(user.id).stats,
                 self.stats,
             )
-            async with conf.get_member(user.id) as member:
-                member.stats = self.stats
+            await cog.update_stats(
+                user.id, conf.get_member(user.id), self.stats
+            )
 
         else:
             new_embed = InvalidStats.generate_embed(
@@ -403,8 +404,7 @@ class IgnoreStats(
             memdata.stats,
             self.stats,
         )
-        async with memdata:
-            memdata.stats = self.stats
+        await cog.update_stats(user.id, memdata, self.stats)
         disable_items(self.view)
         self.item.disabled = True
         await interaction.response.edit_message(view=self.view)
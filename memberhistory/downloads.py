@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import pathlib
+import time
+import typing
+import urllib.parse
+
+import aiohttp
+import discord
+
+from .store import BlobStore, blob_name
+
+log = logging.getLogger("red.bounty.MemberHistory.downloads")
+
+
+class Download(typing.NamedTuple):
+    asset: discord.Asset
+    queued_at: float
+    # (guild, user, attr, timestamp) of every change waiting for this asset
+    records: typing.List[typing.Tuple[int, int, str, int]]
+
+
+class DownloadQueue:
+    """
+    Downloads changed assets into the blob store with a fixed number of workers.
+
+    Assets are keyed by their blob, so an asset that's requested again while it's still
+    queued or downloading, like a global avatar seen from many guilds, is fetched once and
+    recorded for every request. Failed downloads are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        workers: int = 4,
+        retries: int = 3,
+        backoff: float = 2.0,
+    ):
+        self.store = store
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        # downscale assets to this size on Discord's end before downloading them
+        self.thumbnail_size: typing.Optional[int] = None
+
+        self.queue: asyncio.Queue[str] = asyncio.Queue()
+        self.pending: typing.Dict[str, Download] = {}
+        self._tasks: typing.List[asyncio.Task] = []
+        self.in_flight = 0
+
+        self.requests = 0
+        self.deduplicated = 0
+        self.downloads = 0
+        self.failures = 0
+        self.retried = 0
+        self.bytes = 0
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.downloads if self.downloads else 0.0
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self, timeout: float = 30.0):
+        """Finish the queued and running downloads, then stop the workers."""
+        try:
+            if self._tasks:
+                await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            log.warning(
+                "Dropping %s downloads that didn't finish in time", len(self.pending)
+            )
+
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    def request(self, guild: int, user: int, attr: str, asset: discord.Asset):
+        """Record that a user's attr changed to ``asset``, downloading it if it's new."""
+        self.requests += 1
+        record = (guild, user, attr, int(time.time()))
+        blob = blob_name(
+            asset.key,
+            pathlib.PurePosixPath(urllib.parse.urlparse(asset.url).path).suffix,
+        )
+        if self.store.has_blob(blob):
+            self.deduplicated += 1
+            self.store.add(*record, blob)
+            self.store.save_later()
+
+        elif download := self.pending.get(blob):
+            self.deduplicated += 1
+            download.records.append(record)
+
+        else:
+            self.pending[blob] = Download(asset, time.perf_counter(), [record])
+            self.queue.put_nowait(blob)
+
+    async def _worker(self):
+        while True:
+            blob = await self.queue.get()
+            self.in_flight += 1
+            try:
+                await self._download(blob, self.pending[blob])
+            except Exception as e:
+                self.failures += 1
+                self.pending.pop(blob, None)
+                log.exception("Failed to store %s", blob, exc_info=e)
+            finally:
+                self.in_flight -= 1
+                self.queue.task_done()
+
+    async def _download(self, blob: str, download: Download):
+        asset = download.asset
+        if self.thumbnail_size:
+            asset = asset.with_size(self.thumbnail_size)
+
+        data = await self._read(asset)
+        if data is None:
+            self.failures += 1
+            self.pending.pop(blob)
+            return
+
+        await self.store.put(blob, data)
+        # nothing can join the download anymore once it's out of pending
+        self.pending.pop(blob)
+        for record in download.records:
+            self.store.add(*record, blob)
+        self.store.save_later()
+
+        self.downloads += 1
+        self.bytes += len(data)
+        self.last_latency = time.perf_counter() - download.queued_at
+        self.total_latency += self.last_latency
+        log.debug("Saved %s for %s changes", blob, len(download.records))
+
+    async def _read(self, asset: discord.Asset) -> typing.Optional[bytes]:
+        for attempt in range(self.retries + 1):
+            try:
+                return await asset.read()
+
+            except discord.NotFound:
+                log.debug("%s no longer exists", asset.url)
+                return None
+
+            except (
+                discord.HTTPException,
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+            ) as e:
+                if attempt == self.retries:
+                    log.warning(
+                        "Giving up on downloading %s after %s attempts due to %s",
+                        asset.url,
+                        attempt + 1,
+                        e.__class__.__name__,
+                    )
+                    return None
+
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2**attempt)
@@ -1,18 +1,16 @@
 import datetime
 import io
 import operator
-import shutil
-import urllib.parse
 import discord
 from redbot.core.bot import Red
 from redbot.core import commands, Config
 from redbot.core.utils import chat_formatting as cf
-import pathlib
 from redbot.core.data_manager import cog_data_path
 import aiofiles
 import typing
-import urllib
 import logging
+from .downloads import DownloadQueue
+from .store import BlobStore, Record
 from .views import Paginator
 from redbot.vendored.discord.ext import menus
 from redbot.core.utils.views import ConfirmView
@@ -46,14 +44,7 @@ class PageSource(menus.PageSource):
         super().__init__()
 
     async def prepare(self):
-        self.avs = self.cog.path_util.get_all_user_x(
-            self.user.guild, self.user, self.attr
-        )
-        self.avs.sort(
-            key=lambda x: datetime.datetime.fromtimestamp(
-                int(x.stem.split("_")[0]), tz=datetime.timezone.utc
-            ),
-        )
+        self.avs = self.cog.store.history(self.user.guild.id, self.user.id, self.attr)
 
     async def get_page(self, page_number: int):
         if self.avs and 0 <= page_number < len(self.avs):
@@ -65,7 +56,7 @@ class PageSource(menus.PageSource):
     async def format_page(
         self,
         menu: Paginator,
-        page: typing.Optional[pathlib.Path],
+        page: typing.Optional[Record],
     ):
         if self.get_max_pages() > 0 and not page:
             return f"This page does not exist. Please scroll back to a page between 1 and {self.get_max_pages()}"
@@ -95,13 +86,13 @@ class PageSource(menus.PageSource):
             else:
                 embed.description += " and no current one found."
             return embed
-        filename = f"{self.attr_qname[self.attr].replace(' ', '_')}_{menu.current_page}{page.suffix}"
-        timestamp = int(page.stem.split("_")[0])
-        async with aiofiles.open(page, "rb") as f:
+        path = self.cog.store.blob_path(page.blob)
+        filename = f"{self.attr_qname[self.attr].replace(' ', '_')}_{menu.current_page}{path.suffix}"
+        async with aiofiles.open(path, "rb") as f:
             f = discord.File(io.BytesIO(await f.read()), filename=filename)
         embed = discord.Embed(
             title=f"Past {self.attr_qname[self.attr]}s of {self.user.display_name}",
-            description=f"Changed on: <t:{timestamp}:F>\n",
+            description=f"Changed on: <t:{page.timestamp}:F>\n",
             #f"Page {menu.current_page+1}/{self.get_max_pages()}",
             color=await menu.ctx.embed_color(),
         )
@@ -110,105 +101,8 @@ class PageSource(menus.PageSource):
         return {"file": f, "embed": embed, "content": None}
 
 
-class PathUtil:
-    _global = ["avatar_global", "avatar_deco"]
-
-    def __init__(self, cog: "MemberHistory"):
-        self.cog = cog
-        self.base = cog_data_path(cog) / "history"
-
-    def get_total_size(self, path: pathlib.Path):
-        return sum(f.stat().st_size for f in path.glob("**/*") if f.is_file())
-
-    def get_global(self):
-        return self.base / "global"
-
-    def get_guild(self, guild: typing.Union[discord.Guild, int]):
-        if isinstance(guild, discord.Guild):
-            guild = guild.id
-        path = self.base / str(guild)
-
-        path.mkdir(parents=True, exist_ok=True)
-        return path
-
-    def get_user(
-        self,
-        guild: typing.Union[discord.Guild, int],
-        user: typing.Union[discord.Member, discord.User, int],
-        attr: typing.Optional[
-            typing.Literal["avatar_global", "avatar_guild", "avatar_deco", "banner"]
-        ] = None,
-    ):
-        if isinstance(user, (discord.User, discord.Member)):
-            user = user.id
-        path = self.get_guild(guild) if attr not in self._global else self.get_global()
-        if attr:
-            path = path / attr / str(user)
-        path.mkdir(parents=True, exist_ok=True)
-        return path
-
-    def get_all_user_x(
-        self,
-        guild: typing.Union[discord.Guild, int],
-        user: typing.Union[discord.Member, discord.User, int],
-        attr: typing.Literal["avatar_global", "avatar_guild", "banner", "avatar_deco"],
-    ):
-        user_data = self.get_user(guild, user, attr)
-        return [*filter(lambda x: x.is_file(), user_data.iterdir())]
-
-    def get_all_files_stored(self):
-        return [*self.base.glob("**/*.[!json]*")]
-
-    def get_all_files_stored_guild(self, guild: typing.Union[discord.Guild, int]):
-        return [*self.get_guild(guild).glob("**/*.[!json]*")]
-
-    def delete_all_files(
-        self,
-        user: typing.Optional[typing.Union[discord.Member, discord.User, int]] = None,
-    ):
-        if not user:
-            return shutil.rmtree(self.base)
-
-        if isinstance(user, (discord.User, discord.Member)):
-            user = user.id
-
-        files = self.get_user_all_files(user)
-        common_parents = set(map(lambda x: x.parent, files))
-        # all the parents will be dirs with their children being the files so it's safe to delete them
-        for parent in common_parents:
-            if parent.is_dir() and parent.name == str(user):  # just being cautious
-                shutil.rmtree(parent)
-
-    def get_user_all_files(self, user: typing.Union[discord.Member, discord.User, int]):
-        return [*self.base.glob(f"**/{getattr(user, 'id', user)}/*")]
-
-    def get_all_users_folder(
-        self, guild: typing.Optional[typing.Union[discord.Guild, int]] = None
-    ):
-        if not guild:
-            all_files = self.get_all_files_stored()
-            return [*{*map(lambda x: x.parent, all_files)}]
-
-        if isinstance(guild, discord.Guild):
-            guild = guild.id
-
-        all_guild_files = self.get_all_files_stored_guild(guild)
-        return [*{*map(lambda x: x.parent, all_guild_files)}]
-
-    def get_file_from_hash(
-        self,
-        guild: typing.Union[discord.Guild, int],
-        user: typing.Union[discord.Member, discord.User],
-        hash: str,
-        attr: typing.Optional[
-            typing.Literal["avatar_global", "avatar_guild", "avatar_deco", "banner"]
-        ] = None,
-    ):
-        p = self.get_user(guild, user, attr)
-        return next(p.rglob(f"*_{hash}.*"), None)
-
-
 TIMEDELTA_CONV = commands.get_timedelta_converter(minimum=datetime.timedelta(days=1))
+EXPIRY_BATCH_SIZE = 100
 
 
 class MemberHistory(commands.Cog):
@@ -219,13 +113,25 @@ class MemberHistory(commands.Cog):
         )
         self.config.register_guild(toggle=False, ignorelist=[])
         self.config.register_global(
-            ttl=datetime.timedelta(days=30).total_seconds(), ignorelist=[]
+            ttl=datetime.timedelta(days=30).total_seconds(),
+            ignorelist=[],
+            thumbnail_size=0,
         )
-        self.path_util = PathUtil(self)
+        self.store = BlobStore(cog_data_path(self) / "history")
+        self.downloads = DownloadQueue(self.store)
+        # (timestamp, records, files, bytes) of the last cleanup that expired anything
+        self.last_cleanup: typing.Optional[tuple[int, int, int, int]] = None
+
+    async def cog_load(self):
+        await self.store.load()
+        self.downloads.thumbnail_size = await self.config.thumbnail_size() or None
+        self.downloads.start()
         self.cleanup_task = self.cleanup.start()
 
-    def cog_unload(self):
+    async def cog_unload(self):
         self.cleanup_task.cancel()
+        await self.downloads.close()
+        await self.store.close()
 
     @typing.overload
     def get_user_or_role(
@@ -256,97 +162,41 @@ class MemberHistory(commands.Cog):
         s = round(size_bytes / p, 2)
         return "%s %s" % (s, size_name[i])
 
-    async def save_file(
+    def save_file(
         self,
         user: typing.Union[discord.User, discord.Member],
         guild: typing.Union[discord.Guild, int],
         file: discord.Asset,
         attr: typing.Literal["avatar_global", "avatar_guild", "banner", "avatar_deco"],
     ):
-        if sim_path := self.path_util.get_file_from_hash(guild, user, file.key, attr):
-            log.debug(
-                "A file of %s with a similar hash key (%s) already exists for %s in %s at %s",
-                attr,
-                file.key,
-                user.display_name,
-                guild,
-                sim_path,
-            )
-        path = self.path_util.get_user(guild, user, attr)
-        filename = f"{int(datetime.datetime.now().timestamp())}_{file.key.replace('_', '')}{urllib.parse.urlparse(file.url).path[-4:]}"
-        try:
-            binary = await file.read()
-
-        except Exception as e:
-            log.exception(
-                "Failed to read %s for %s in %s due to %s",
-                attr,
-                user.display_name,
-                guild,
-                e.__class__.__name__,
-                exc_info=e,
-            )
-            return
-
-        else:
-            try:
-                async with aiofiles.open(path / filename, "wb") as f:
-                    await f.write(binary)
-
-            except Exception as e:
-                log.exception(
-                    "Failed to save %s for %s in %s due to %s",
-                    attr,
-                    user.display_name,
-                    guild,
-                    e.__class__.__name__,
-                    exc_info=e,
-                )
-                (path / filename).unlink()
-                return
-
-            log.debug(
-                "Saved %s for %s in %s at %s",
-                attr,
-                user.display_name,
-                guild,
-                path / filename,
-            )
-
-    @tasks.loop(
-        time=datetime.time(hour=0, minute=0, second=0, tzinfo=datetime.timezone.utc)
-    )
-    async def cleanup(self):
-        log.debug("Running cleanup task.")
-        all_files = self.path_util.get_all_files_stored()
-        file_timestamps = map(
-            lambda x: (
-                x,
-                datetime.datetime.fromtimestamp(
-                    int(x.stem.split("_")[0]), tz=datetime.timezone.utc
-                ),
-            ),
-            all_files,
+        log.debug(
+            "Queueing %s (%s) of %s in %s", attr, file.key, user.display_name, guild
         )
-        ttl = datetime.timedelta(seconds=await self.config.ttl())
-        now = datetime.datetime.now(datetime.timezone.utc)
-        filtered = filter(lambda x: (now - x[1]) >= ttl, file_timestamps)
-        index = 0
-        for index, (file, timestamp) in enumerate(filtered, 1):
-            file.unlink()
-            log.debug("Deleted %s because it was older than the set TTL.", file)
-            log.debug(
-                "Created at: %s, Now: %s, Difference: %s",
-                timestamp,
-                now,
-                now - timestamp,
-            )
+        self.downloads.request(getattr(guild, "id", guild), user.id, attr, file)
 
-        if index != 0:
-            log.debug("Deleted %s files.", index)
+    @tasks.loop(minutes=1)
+    async def cleanup(self):
+        ttl = await self.config.ttl()
+        cutoff = datetime.datetime.now(datetime.timezone.utc).timestamp() - ttl
+        records = files = size = 0
+        # small batches, so the event loop gets a turn between them
+        while expired := self.store.pop_expired(cutoff, EXPIRY_BATCH_SIZE):
+            removed = await self.store.remove(expired)
+            records += len(expired)
+            files += removed[0]
+            size += removed[1]
+
+        if not records:
+            return
 
-        else:
-            log.debug("No files to delete.")
+        self.store.save_later()
+        self.last_cleanup = (int(cutoff + ttl), records, files, size)
+        log.debug(
+            "Expired %s records older than the set TTL, deleting %s files (%s).",
+            records,
+            files,
+            self.format_storage(size),
+        )
 
     @commands.Cog.listener()
     async def on_user_update(self, before: discord.User, after: discord.User):
@@ -385,9 +235,7 @@ class MemberHistory(commands.Cog):
                 after.avatar_decoration,
             )
             if after.avatar_decoration:
-                await self.save_file(
-                    before, gid, after.avatar_decoration, "avatar_deco"
-                )
+                self.save_file(before, gid, after.avatar_decoration, "avatar_deco")
 
         if before.avatar != after.avatar:
             log.debug(
@@ -395,14 +243,14 @@ class MemberHistory(commands.Cog):
             )
             if after.avatar:
                 log.debug(f"Saving avatar for {before}")
-                await self.save_file(before, gid, after.avatar, "avatar_global")
+                self.save_file(before, gid, after.avatar, "avatar_global")
 
         if before.banner != after.banner:
             log.debug(
                 f"Banner changed for {before}\n%s\n%s", before.banner, after.banner
             )
             if after.banner:
-                await self.save_file(before, gid, after.banner, "banner")
+                self.save_file(before, gid, after.banner, "banner")
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
@@ -434,7 +282,7 @@ class MemberHistory(commands.Cog):
 
         if before.guild_avatar != after.guild_avatar:
             if after.avatar:
-                await self.save_file(before, before.guild, after.avatar, "avatar_guild")
+                self.save_file(before, before.guild, after.avatar, "avatar_guild")
 
             log.debug(
                 f"Guild avatar changed for {before}\n%s\n%s",
@@ -444,7 +292,7 @@ class MemberHistory(commands.Cog):
 
         if before.banner != after.banner:
             if after.banner:
-                await self.save_file(before, before.guild, after.banner, "banner")
+                self.save_file(before, before.guild, after.banner, "banner")
 
             log.debug(
                 f"Banner changed for {before}\n%s\n%s", before.banner, after.banner
@@ -482,6 +330,40 @@ class MemberHistory(commands.Cog):
             f"Time to live for stored files set to {cf.humanize_timedelta(timedelta=time)}"
         )
 
+    @memberhistory.command(name="thumbnailsize")
+    @commands.is_owner()
+    async def thumbnailsize(self, ctx: commands.Context, size: int = 0):
+        """
+        Set the size newly stored files are downscaled to.
+
+        The size must be a power of 2 between 16 and 4096. Pass 0 to store files at full size.
+        Files that are already stored are not changed.
+        """
+        if size and not discord.utils.valid_icon_size(size):
+            return await ctx.send("The size must be a power of 2 between 16 and 4096.")
+
+        await self.config.thumbnail_size.set(size)
+        self.downloads.thumbnail_size = size or None
+        await ctx.send(
+            f"New files will be stored {size and f'downscaled to {size}x{size}' or 'at full size'}."
+        )
+
+    @memberhistory.command(name="downloadstats", hidden=True)
+    @commands.is_owner()
+    async def downloadstats(self, ctx: commands.Context):
+        """
+        See stats of the download queue.
+        """
+        downloads = self.downloads
+        await ctx.send(
+            f"Queued downloads: **{downloads.queue_depth}** ({downloads.in_flight} in flight)\n"
+            f"Requests: **{downloads.requests}** ({downloads.deduplicated} already stored or queued)\n"
+            f"Downloads: **{downloads.downloads}** ({self.format_storage(downloads.bytes)}, {downloads.failures} failed, {downloads.retried} retries)\n"
+            f"Last latency: **{downloads.last_latency * 1000:.1f}ms**\n"
+            f"Average latency: **{downloads.average_latency * 1000:.1f}ms**\n"
+            f"Workers: **{downloads.workers}**"
+        )
+
     @memberhistory.command(name="purge")
     @commands.is_owner()
     async def purge(self, ctx: commands.Context):
@@ -498,7 +380,7 @@ class MemberHistory(commands.Cog):
 
         if not view.result:
             return await ctx.send("Operation cancelled.")
-        self.path_util.delete_all_files()
+        await self.store.clear()
         await ctx.send("All stored files have been purged.")
 
     @memberhistory.command(name="purgeuser")
@@ -520,7 +402,8 @@ class MemberHistory(commands.Cog):
             return await ctx.send(
                 "Operation cancelled.", allowed_mentions=discord.AllowedMentions.none()
             )
-        self.path_util.delete_all_files(user)
+        await self.store.remove_user(user.id)
+        self.store.save_later()
         await ctx.send(f"All stored files for {user.mention} have been purged.")
 
     @memberhistory.group()
@@ -638,10 +521,8 @@ class MemberHistory(commands.Cog):
         """
         See the configured settings and additional data about MemberHistory.
         """
-        total_files = self.path_util.get_all_files_stored()
-        all_files = self.path_util.get_all_files_stored_guild(ctx.guild)
-        total_guild = len(all_files)
-        total_all = len(total_files)
+        total_guild = self.store.count(ctx.guild.id)
+        total_all = self.store.count()
         is_owner = await self.bot.is_owner(ctx.author)
         conf = await self.config.guild(ctx.guild).all()
         embed = discord.Embed(
@@ -682,9 +563,7 @@ class MemberHistory(commands.Cog):
             name="**Total file space occupied by this server**",
             value=(
                 "*This only includes the size of guild specific avatars and banners.*\n"
-                + self.format_storage(
-                    self.path_util.get_total_size(self.path_util.get_guild(ctx.guild))
-                )
+                + self.format_storage(self.store.size(ctx.guild.id))
             ),
             inline=False,
         )
@@ -702,11 +581,16 @@ class MemberHistory(commands.Cog):
                 name="**Total file space occupied",
                 value=(
                     "*This includes the size of all stored files.*\n"
-                    + self.format_storage(
-                        self.path_util.get_total_size(self.path_util.base)
-                    )
+                    + self.format_storage(self.store.size())
                 ),
             )
+            if self.last_cleanup:
+                timestamp, records, files, size = self.last_cleanup
+                embed.add_field(
+                    name="**Last cleanup**",
+                    value=f"<t:{timestamp}:R>: expired {records} records and deleted {files} files ({self.format_storage(size)})",
+                    inline=False,
+                )
 
         await ctx.send(embed=embed)
 
@@ -716,7 +600,7 @@ class MemberHistory(commands.Cog):
         """
         Get a list of all users with stored files.
         """
-        all_users = self.path_util.get_all_users_folder()
+        all_users = sorted(self.store.stored_users().items())
         if not all_users:
             return await ctx.send("No users with stored files found.")
 
@@ -726,14 +610,14 @@ class MemberHistory(commands.Cog):
         )
         color = await ctx.embed_color()
         format_page: typing.Callable[
-            [Paginator, typing.List[pathlib.Path]],
+            [Paginator, typing.List[typing.Tuple[int, int]]],
             typing.Coroutine[None, None, discord.Embed],
         ] = lambda menu, page: discord.utils.maybe_coroutine(
             lambda x: discord.Embed(
                 title="Users with stored files",
                 description="\n".join(
-                    f"- <@{x.name}> ({x.name})\n  - Total files stored: {len([*x.iterdir()])}"  # iterdir because the folder cannot have sub folders
-                    for i, x in enumerate(page)
+                    f"- <@{user}> ({user})\n  - Total files stored: {count}"
+                    for user, count in page
                 ),
                 color=color,
             ),
@@ -0,0 +1,378 @@
+import asyncio
+import bisect
+import collections
+import heapq
+import json
+import logging
+import operator
+import os
+import pathlib
+import shutil
+import tempfile
+import typing
+
+log = logging.getLogger("red.bounty.MemberHistory.store")
+
+Key = typing.Tuple[int, int, str]
+
+# attrs that belong to the user and not to a guild are filed under this guild id
+GLOBAL = 0
+GLOBAL_ATTRS = ("avatar_global", "avatar_deco")
+
+
+def blob_name(key: str, suffix: str) -> str:
+    """The name of an asset's blob, from its key and file extension."""
+    # underscores are dropped as the files were once named ``<timestamp>_<key>``
+    return key.replace("_", "") + suffix
+
+
+class Record(typing.NamedTuple):
+    guild: int
+    user: int
+    attr: str
+    timestamp: int
+    blob: str
+
+
+class BlobStore:
+    """
+    Content addressed storage of the saved avatars and banners.
+
+    Every asset is stored once under ``blobs/``, named after its asset key, no matter how
+    many users, guilds or attrs it was saved for. Which user had which asset when is kept in
+    an index of records, persisted to ``index.json`` along with the size of every blob, so
+    lookups, purges and stats are answered from memory instead of walking the file system.
+
+    Records are also kept in a min-heap by timestamp, the expiry index, so expiring old
+    records only ever looks at the ones that are due. The index file lists the records
+    oldest first, so the heap is read back in order.
+    """
+
+    def __init__(self, base: pathlib.Path):
+        self.base = base
+        self.blob_dir = base / "blobs"
+        self.index_path = base / "index.json"
+        self._save_task: typing.Optional[asyncio.Task] = None
+        # blobs whose files are being deleted, set once they're gone
+        self._deleting: typing.Dict[str, asyncio.Event] = {}
+        # bumped by clear, so writes that raced it know to write again
+        self._generation = 0
+        self._reset()
+
+    def _reset(self):
+        self.records: typing.Dict[Key, typing.List[Record]] = {}
+        self.expiry: typing.List[typing.Tuple[int, Record]] = []
+        self.user_keys: typing.Dict[int, typing.Set[Key]] = {}
+        self.sizes: typing.Dict[str, int] = {}
+        self.refs: typing.Counter[str] = collections.Counter()
+        self.guild_refs: typing.Dict[int, typing.Counter[str]] = {}
+        self.guild_sizes: typing.Counter[int] = collections.Counter()
+        self.total_size = 0
+        self._dirty = False
+
+    def __len__(self):
+        return sum(map(len, self.records.values()))
+
+    @staticmethod
+    def key(guild: int, user: int, attr: str) -> Key:
+        return (GLOBAL if attr in GLOBAL_ATTRS else guild, user, attr)
+
+    def blob_path(self, blob: str) -> pathlib.Path:
+        return self.blob_dir / blob[:2] / blob
+
+    def has_blob(self, blob: str) -> bool:
+        return blob in self.sizes
+
+    def history(self, guild: int, user: int, attr: str) -> typing.List[Record]:
+        """All records of a user's attr, oldest first."""
+        return list(self.records.get(self.key(guild, user, attr), ()))
+
+    def user_records(self, user: int) -> typing.List[Record]:
+        return [
+            record
+            for key in self.user_keys.get(user, ())
+            for record in self.records[key]
+        ]
+
+    def stored_users(self) -> typing.Dict[int, int]:
+        """The number of records of every user that has any."""
+        return {
+            user: sum(len(self.records[key]) for key in keys)
+            for user, keys in self.user_keys.items()
+        }
+
+    def count(self, guild: typing.Optional[int] = None) -> int:
+        if guild is None:
+            return len(self)
+        return sum(
+            len(records) for key, records in self.records.items() if key[0] == guild
+        )
+
+    def size(self, guild: typing.Optional[int] = None) -> int:
+        """Bytes taken up by all blobs, or by the blobs a guild references."""
+        return self.total_size if guild is None else self.guild_sizes[guild]
+
+    async def put(self, blob: str, data: bytes):
+        """Store a blob. The blob is only on disk once this returns, so add records after."""
+        # a file that's still being deleted would take the new one with it
+        if deleting := self._deleting.get(blob):
+            await deleting.wait()
+        if blob in self.sizes:
+            return
+
+        path = self.blob_path(blob)
+        while True:
+            generation = self._generation
+            await asyncio.to_thread(self._write_blob, path, data)
+            if generation == self._generation:
+                break
+        self.sizes[blob] = len(data)
+        self._dirty = True
+
+    @staticmethod
+    def _write_blob(path: pathlib.Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def add(
+        self, guild: int, user: int, attr: str, timestamp: int, blob: str
+    ) -> Record:
+        if blob not in self.sizes:
+            raise KeyError(f"Blob {blob} is not stored.")
+
+        key = self.key(guild, user, attr)
+        record = Record(*key, timestamp, blob)
+        bisect.insort(self.records.setdefault(key, []), record)
+        heapq.heappush(self.expiry, (timestamp, record))
+        self.user_keys.setdefault(user, set()).add(key)
+        self._ref(record)
+        self._dirty = True
+        return record
+
+    def _ref(self, record: Record):
+        size = self.sizes[record.blob]
+        if not self.refs[record.blob]:
+            self.total_size += size
+        self.refs[record.blob] += 1
+
+        guild_refs = self.guild_refs.setdefault(record.guild, collections.Counter())
+        if not guild_refs[record.blob]:
+            self.guild_sizes[record.guild] += size
+        guild_refs[record.blob] += 1
+
+    def _unref(self, record: Record) -> bool:
+        """Drop a record's reference to its blob, returns whether the blob is unused now."""
+        size = self.sizes[record.blob]
+        guild_refs = self.guild_refs[record.guild]
+        guild_refs[record.blob] -= 1
+        if not guild_refs[record.blob]:
+            del guild_refs[record.blob]
+            self.guild_sizes[record.guild] -= size
+
+        self.refs[record.blob] -= 1
+        if self.refs[record.blob]:
+            return False
+
+        del self.refs[record.blob]
+        self.total_size -= size
+        return True
+
+    def _find(self, record: Record) -> typing.Optional[int]:
+        entries = self.records.get(record[:3], ())
+        index = bisect.bisect_left(entries, record)
+        if index < len(entries) and entries[index] == record:
+            return index
+
+    def pop_expired(self, cutoff: float, limit: int) -> typing.List[Record]:
+        """Take up to ``limit`` records saved at or before ``cutoff`` off the expiry index."""
+        expired: typing.List[Record] = []
+        while self.expiry and self.expiry[0][0] <= cutoff and len(expired) < limit:
+            _, record = heapq.heappop(self.expiry)
+            # records removed some other way are left in the heap until they come up
+            if self._find(record) is not None:
+                expired.append(record)
+        return expired
+
+    async def remove(self, records: typing.Iterable[Record]) -> typing.Tuple[int, int]:
+        """
+        Remove records from the index and delete the blobs nothing references anymore.
+
+        Returns the number of files deleted and the bytes they took up."""
+        unused: typing.Dict[str, int] = {}
+        for record in records:
+            index = self._find(record)
+            if index is None:
+                continue
+
+            key = record[:3]
+            entries = self.records[key]
+            del entries[index]
+            if not entries:
+                del self.records[key]
+                self.user_keys[record.user].discard(key)
+                if not self.user_keys[record.user]:
+                    del self.user_keys[record.user]
+
+            if self._unref(record):
+                unused[record.blob] = self.sizes.pop(record.blob)
+            self._dirty = True
+
+        if len(self.expiry) > 2 * len(self) + 64:
+            self.expiry = sorted(
+                (record.timestamp, record)
+                for records in self.records.values()
+                for record in records
+            )
+
+        done = asyncio.Event()
+        self._deleting.update(dict.fromkeys(unused, done))
+        try:
+            await asyncio.to_thread(self._delete_blobs, [*map(self.blob_path, unused)])
+        finally:
+            for blob in unused:
+                if self._deleting.get(blob) is done:
+                    del self._deleting[blob]
+            done.set()
+        return len(unused), sum(unused.values())
+
+    @staticmethod
+    def _delete_blobs(paths: typing.List[pathlib.Path]):
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    async def remove_user(self, user: int) -> typing.Tuple[int, int]:
+        return await self.remove(self.user_records(user))
+
+    async def clear(self):
+        if self._save_task:
+            self._save_task.cancel()
+        self._reset()
+        self._generation += 1
+        if not self.base.exists():
+            return
+
+        # move the files out of the way right away, so new blobs written while they're
+        # deleted go into a fresh directory
+        trash = pathlib.Path(tempfile.mkdtemp(dir=self.base.parent))
+        os.replace(self.base, trash / self.base.name)
+        await asyncio.to_thread(shutil.rmtree, trash, ignore_errors=True)
+
+    async def load(self):
+        await asyncio.to_thread(self._load)
+
+    def _load(self):
+        if not self.index_path.exists():
+            self._migrate()
+            return
+
+        with self.index_path.open() as f:
+            data = json.load(f)
+        self.sizes = data["blobs"]
+        for guild, user, attr, timestamp, blob in data["records"]:
+            record = Record(guild, user, attr, timestamp, blob)
+            self.records.setdefault(record[:3], []).append(record)
+            self.user_keys.setdefault(user, set()).add(record[:3])
+            self.expiry.append((timestamp, record))
+        for records in self.records.values():
+            records.sort()
+            for record in records:
+                self._ref(record)
+        # the records are saved oldest first, so this leaves the list as it is
+        heapq.heapify(self.expiry)
+
+    def _migrate(self):
+        """Move files saved in the old ``<guild>/<attr>/<user>/<timestamp>_<key>`` layout."""
+        if not self.base.exists():
+            return
+
+        old = [
+            path
+            for path in self.base.glob("*/*/*/*")
+            if path.parts[-4] != self.blob_dir.name and path.is_file()
+        ]
+        for path in old:
+            guild, attr, user = path.parts[-4:-1]
+            try:
+                timestamp, key = path.stem.split("_", 1)
+                record = Record(
+                    GLOBAL if guild == "global" else int(guild),
+                    int(user),
+                    attr,
+                    int(timestamp),
+                    blob_name(key, path.suffix),
+                )
+            except ValueError:
+                log.warning("Skipping unrecognized file %s", path)
+                continue
+
+            if record.blob in self.sizes:
+                path.unlink()
+            else:
+                self.sizes[record.blob] = path.stat().st_size
+                dest = self.blob_path(record.blob)
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(path, dest)
+            self.add(*record)
+
+        # only the directories emptied by the move go, anything that wasn't moved stays
+        for root, _, files in os.walk(self.base, topdown=False):
+            path = pathlib.Path(root)
+            if path == self.base or path.is_relative_to(self.blob_dir):
+                continue
+            if files:
+                log.warning(
+                    "Leaving %s in place, it holds files that weren't moved", path
+                )
+            elif not any(path.iterdir()):
+                path.rmdir()
+
+        if old:
+            log.info("Moved %d stored files to the blob store.", len(old))
+            self._write_index(self._snapshot())
+        self._dirty = False
+
+    def _snapshot(self) -> str:
+        return json.dumps(
+            {
+                "blobs": self.sizes,
+                "records": sorted(
+                    (record for records in self.records.values() for record in records),
+                    key=operator.attrgetter("timestamp"),
+                ),
+            },
+            separators=(",", ":"),
+        )
+
+    def _write_index(self, data: str):
+        self.base.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(data)
+        os.replace(tmp, self.index_path)
+
+    async def save(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        await asyncio.to_thread(self._write_index, self._snapshot())
+
+    def save_later(self, delay: float = 5.0):
+        """Save the index after ``delay`` seconds, folding in any changes made until then."""
+        if self._save_task and not self._save_task.done():
+            return
+
+        async def save():
+            await asyncio.sleep(delay)
+            try:
+                await self.save()
+            except Exception as e:
+                self._dirty = True
+                log.exception("Failed to save the index.", exc_info=e)
+
+        self._save_task = asyncio.create_task(save())
+
+    async def close(self):
+        if self._save_task:
+            self._save_task.cancel()
+        await self.save()
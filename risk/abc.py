@@ -6,7 +6,10 @@ from discord.ext.commands.cog import CogMeta
 if TYPE_CHECKING:
     from redbot.core.bot import Red
 
-    from .common.models import DB
+    from .common.map_generator import RiskBoardRenderer
+    from .common.models import DB, GuildSettings
+    from .common.persistence import SaveScheduler
+    from .common.riskmodels import Territory
     from .views.riskviews.game import GameView
 
 
@@ -21,7 +24,13 @@ class MixinMeta(ABC):
         self.bot: Red
         self.db: DB
         self.cache: dict[int, GameView]
+        self.renderer: RiskBoardRenderer[Territory]
+        self.saver: SaveScheduler
 
     @abstractmethod
-    def save(self) -> None:
+    def save(self, conf: "GuildSettings | None" = None) -> None:
+        pass
+
+    @abstractmethod
+    def end_game(self, channel_id: int) -> None:
         pass
@@ -1,5 +1,45 @@
+import asyncio
+
+from redbot.core import commands
+from redbot.core.data_manager import bundled_data_path
+
+from risk.common.riskmodels import color_names
+
 from ..abc import MixinMeta
 
 
 class Admin(MixinMeta):
-    pass
+    @commands.is_owner()
+    @commands.command(name="riskbenchmark", hidden=True)
+    async def risk_benchmark(self, ctx: commands.Context, rounds: int = 3):
+        """Compare the old floodfill board generation with the cached renderer."""
+        rounds = max(1, min(rounds, 10))
+        async with ctx.typing():
+            results = await asyncio.to_thread(
+                self.renderer.benchmark,
+                bundled_data_path(self) / "risk_board.png",
+                list(color_names),
+                rounds,
+            )
+
+        msg = "\n".join(
+            f"{name.title()}: {seconds * 1000:.2f}ms"
+            for name, seconds in results.items()
+        )
+        await ctx.send(
+            f"Average time per frame over {rounds} rounds:\n{msg}\n\n"
+            f"Frame cache hits: {self.renderer.hits} | misses: {self.renderer.misses}"
+        )
+
+    @commands.is_owner()
+    @commands.command(name="risksavestats", hidden=True)
+    async def risk_savestats(self, ctx: commands.Context):
+        """Show statistics of the write-behind saves."""
+        saver = self.saver
+        await ctx.send(
+            f"Saves: {saver.saves} | Failed: {saver.failures}\n"
+            f"Pending guilds: {len(saver.dirty)}\n"
+            f"Bytes written: {saver.bytes_written}\n"
+            f"Last save latency: {saver.last_latency * 1000:.2f}ms | "
+            f"Average: {saver.average_latency * 1000:.2f}ms"
+        )
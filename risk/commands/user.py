@@ -110,7 +110,7 @@ class User(MixinMeta):
 
                 conf.saves[ctx.channel.id] = self.state
 
-        del self.cache[ctx.channel.id]
+        self.end_game(ctx.channel.id)
         await ctx.send("Game ended.")
 
     @risk.command(name="saves")
@@ -146,7 +146,7 @@ class Base(BaseModel):
 
     async def __aexit__(self, exc_type, exc_value, traceback):
         if exc_type is None:
-            self.cog.save()
+            self.cog.save(self)
         else:
             from ..main import log
 
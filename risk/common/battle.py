@@ -0,0 +1,141 @@
+import functools
+import typing
+
+import numpy as np
+
+MAX_ATTACKER_DICE = 3
+MAX_DEFENDER_DICE = 2
+
+
+class BattleOdds(typing.NamedTuple):
+    win_probability: float
+    expected_attacker_losses: float
+    expected_defender_losses: float
+
+
+class BlitzResult(typing.NamedTuple):
+    attacker_remaining: int
+    defender_remaining: int
+    rounds: int
+
+    @property
+    def captured(self) -> bool:
+        return self.defender_remaining == 0
+
+
+def dice_for(attackers: int, defenders: int) -> tuple[int, int]:
+    """The most dice each side can roll with the given armies on their territories."""
+    return min(MAX_ATTACKER_DICE, attackers - 1), min(MAX_DEFENDER_DICE, defenders)
+
+
+def _fight(
+    attackers: np.ndarray,
+    defenders: np.ndarray,
+    rng: np.random.Generator,
+):
+    """Resolve many battles at once, in place, until each is captured or the attacker has 1 army left.
+
+    Every round rolls the dice of all unfinished battles in one go. Returns the number of rounds fought.
+    """
+    rounds = 0
+    cols_a = np.arange(MAX_ATTACKER_DICE)
+    cols_d = np.arange(MAX_DEFENDER_DICE)
+    while (active := (attackers > 1) & (defenders > 0)).any():
+        rounds += 1
+        adice, ddice = (
+            np.minimum(MAX_ATTACKER_DICE, attackers - 1),
+            np.minimum(MAX_DEFENDER_DICE, defenders),
+        )
+        arolls = rng.integers(1, 7, size=(len(attackers), MAX_ATTACKER_DICE))
+        drolls = rng.integers(1, 7, size=(len(defenders), MAX_DEFENDER_DICE))
+        arolls[cols_a >= adice[:, None]] = 0
+        drolls[cols_d >= ddice[:, None]] = 0
+        arolls = -np.sort(-arolls, axis=1)[:, :MAX_DEFENDER_DICE]
+        drolls = -np.sort(-drolls, axis=1)
+
+        compared = (cols_d < np.minimum(adice, ddice)[:, None]) & active[:, None]
+        attacker_wins = arolls > drolls
+        defenders -= (attacker_wins & compared).sum(axis=1)
+        attackers -= (~attacker_wins & compared).sum(axis=1)
+
+    return rounds
+
+
+def blitz(
+    attackers: int, defenders: int, rng: np.random.Generator | None = None
+) -> BlitzResult:
+    """Fight with the most dice until the territory is captured or the attacker has 1 army left."""
+    a = np.array([attackers], dtype=np.int64)
+    d = np.array([defenders], dtype=np.int64)
+    rounds = _fight(a, d, rng or np.random.default_rng())
+    return BlitzResult(int(a[0]), int(d[0]), rounds)
+
+
+def simulate(
+    attackers: int,
+    defenders: int,
+    trials: int = 10_000,
+    rng: np.random.Generator | None = None,
+) -> BattleOdds:
+    """Estimate the odds of a blitz by running ``trials`` battles side by side."""
+    a = np.full(trials, attackers, dtype=np.int64)
+    d = np.full(trials, defenders, dtype=np.int64)
+    _fight(a, d, rng or np.random.default_rng())
+    return BattleOdds(
+        float((d == 0).mean()),
+        float(attackers - a.mean()),
+        float(defenders - d.mean()),
+    )
+
+
+@functools.cache
+def round_outcomes(
+    attacker_dice: int, defender_dice: int
+) -> tuple[tuple[int, int, float], ...]:
+    """The exact ``(attacker losses, defender losses, probability)`` outcomes of one roll."""
+    dice = attacker_dice + defender_dice
+    rolls = np.indices((6,) * dice).reshape(dice, -1).T + 1
+    arolls = -np.sort(-rolls[:, :attacker_dice], axis=1)
+    drolls = -np.sort(-rolls[:, attacker_dice:], axis=1)
+    compared = min(attacker_dice, defender_dice)
+    attacker_wins = (arolls[:, :compared] > drolls[:, :compared]).sum(axis=1)
+    probabilities = np.bincount(attacker_wins, minlength=compared + 1) / len(rolls)
+    return tuple(
+        (compared - wins, wins, float(p)) for wins, p in enumerate(probabilities) if p
+    )
+
+
+@functools.cache
+def _odds_table(size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Markov tables of the capture probability and expected armies left for every matchup below ``size``."""
+    win = np.zeros((size, size))
+    attackers_left = np.zeros((size, size))
+    defenders_left = np.zeros((size, size))
+    win[1:, 0] = 1
+    attackers_left[:, 0] = np.arange(size)
+    attackers_left[1, :] = 1
+    defenders_left[1, :] = np.arange(size)
+
+    for a in range(2, size):
+        for d in range(1, size):
+            for alost, dlost, p in round_outcomes(*dice_for(a, d)):
+                win[a, d] += p * win[a - alost, d - dlost]
+                attackers_left[a, d] += p * attackers_left[a - alost, d - dlost]
+                defenders_left[a, d] += p * defenders_left[a - alost, d - dlost]
+
+    return win, attackers_left, defenders_left
+
+
+def odds(attackers: int, defenders: int) -> BattleOdds:
+    """Exact odds of blitzing ``defenders`` with ``attackers`` armies on the attacking territory."""
+    if attackers < 1 or defenders < 0:
+        raise ValueError("attackers must be at least 1 and defenders at least 0")
+    size = 64
+    while size <= max(attackers, defenders):
+        size *= 2
+    win, attackers_left, defenders_left = _odds_table(size)
+    return BattleOdds(
+        float(win[attackers, defenders]),
+        float(attackers - attackers_left[attackers, defenders]),
+        float(defenders - defenders_left[attackers, defenders]),
+    )
@@ -1,7 +1,15 @@
+import collections
 import io
 import pathlib
+import random
+import threading
+import time
+import typing
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+K = typing.TypeVar("K", bound=typing.Hashable)
+Color = tuple[int, int, int] | tuple[int, int, int, int]
 
 
 class RiskMapGenerator:
@@ -44,3 +52,179 @@ class RiskMapGenerator:
         image.save(file, format="PNG")
         file.seek(0)
         return file
+
+
+class _Layer(typing.NamedTuple):
+    image: Image.Image
+    colors: dict[typing.Hashable, Color]
+
+
+class RiskBoardRenderer(typing.Generic[K]):
+    """Renders the RISK board from territory masks computed once up front.
+
+    Instead of re-opening the board and flood filling every territory on each update,
+    the decoded board and a mask per territory are kept in memory. Every game gets a
+    colored layer that only has the territories whose owner changed repainted, army
+    counts are drawn on a copy of that layer and finished frames are cached by their
+    contents so identical boards are never encoded twice.
+
+    This class is thread safe so it can be used with ``asyncio.to_thread``."""
+
+    FILL_THRESHOLD = 30
+
+    def __init__(
+        self,
+        board_path: pathlib.Path,
+        territory_coords: dict[K, tuple[int, int]],
+        *,
+        max_frames: int = 32,
+        max_layers: int = 16,
+    ):
+        self.base = Image.open(board_path).convert("RGBA")
+        self.base.load()
+        self.font = ImageFont.load_default(size=50)
+        self.coords = territory_coords
+        self.masks: dict[K, tuple[tuple[int, int, int, int], Image.Image]] = {
+            key: self._build_mask(xy) for key, xy in territory_coords.items()
+        }
+
+        self.max_frames = max_frames
+        self.max_layers = max_layers
+        self._frames = collections.OrderedDict[tuple, bytes]()
+        self._layers = collections.OrderedDict[typing.Hashable, _Layer]()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _build_mask(self, xy: tuple[int, int]):
+        # Fill with an alpha far from the seed's so every filled pixel's alpha changes
+        # (floodfill is a no-op when the fill is within the threshold of the seed).
+        fill = (0, 0, 0, 0 if self.base.getpixel(xy)[3] > 127 else 255)
+        filled = self.base.copy()
+        ImageDraw.floodfill(filled, xy, fill, thresh=self.FILL_THRESHOLD)
+        mask = ImageChops.difference(
+            filled.getchannel("A"), self.base.getchannel("A")
+        ).point(lambda v: 255 if v else 0)
+        box = mask.getbbox() or (xy[0], xy[1], xy[0] + 1, xy[1] + 1)
+        return box, mask.crop(box)
+
+    @staticmethod
+    def frame_key(territories: dict[K, tuple[Color, str]]) -> tuple:
+        return tuple(territories.items())
+
+    def _get_layer(self, layer_key: typing.Hashable) -> _Layer:
+        layer = self._layers.get(layer_key)
+        if layer is None:
+            layer = _Layer(self.base.copy(), {})
+            self._layers[layer_key] = layer
+            if len(self._layers) > self.max_layers:
+                self._layers.popitem(last=False)
+        else:
+            self._layers.move_to_end(layer_key)
+        return layer
+
+    def render(
+        self,
+        territories: dict[K, tuple[Color, str]],
+        *,
+        layer_key: typing.Hashable = None,
+    ) -> io.BytesIO:
+        """Render a board where ``territories`` maps each territory to its fill color and army text.
+
+        ``layer_key`` identifies the game the board belongs to, so consecutive frames of the
+        same game only repaint the territories that changed since the previous one."""
+        key = self.frame_key(territories)
+        with self._lock:
+            if (data := self._frames.get(key)) is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return io.BytesIO(data)
+
+            self.misses += 1
+            layer = self._get_layer(layer_key)
+            for territory, (color, _) in territories.items():
+                color = (*color[:3], 255)
+                if layer.colors.get(territory) == color:
+                    continue
+                box, mask = self.masks[territory]
+                layer.image.paste(color, box, mask)
+                layer.colors[territory] = color
+
+            image = layer.image.copy()
+
+        draw = ImageDraw.Draw(image)
+        for territory, (color, text) in territories.items():
+            x, y = self.coords[territory]
+            left, top, right, bottom = draw.textbbox((0, 0), text, font=self.font)
+            draw.text(
+                (x - (right - left) // 2, y - (bottom - top) // 2),
+                text,
+                fill=RiskMapGenerator.get_text_color(color),
+                font=self.font,
+            )
+
+        file = io.BytesIO()
+        image.save(file, format="PNG")
+        data = file.getvalue()
+        file.seek(0)
+
+        with self._lock:
+            self._frames[key] = data
+            if len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+
+        return file
+
+    def forget(self, layer_key: typing.Hashable):
+        """Drop the colored layer kept for a game that is no longer running."""
+        with self._lock:
+            self._layers.pop(layer_key, None)
+
+    def benchmark(
+        self,
+        board_path: pathlib.Path,
+        colors: typing.Sequence[Color],
+        rounds: int = 5,
+    ) -> dict[str, float]:
+        """Time the legacy floodfill path against this renderer on random boards.
+
+        Returns the average seconds per frame for the legacy path, a cold render (fresh
+        layer), an incremental render (one territory changed hands) and a cached render.
+        """
+        results = collections.defaultdict[str, float](float)
+        for i in range(rounds):
+            territories = {
+                key: (random.choice(colors), str(random.randint(1, 30)))
+                for key in self.coords
+            }
+
+            start = time.perf_counter()
+            RiskMapGenerator.color_territories(
+                board_path,
+                {self.coords[k]: c for k, (c, _) in territories.items()},
+                {self.coords[k]: a for k, (_, a) in territories.items()},
+            )
+            results["legacy"] += time.perf_counter() - start
+
+            layer_key = ("benchmark", i)
+            start = time.perf_counter()
+            self.render(territories, layer_key=layer_key)
+            results["cold"] += time.perf_counter() - start
+
+            changed = random.choice(list(territories))
+            territories[changed] = (
+                random.choice([c for c in colors if c != territories[changed][0]]),
+                "1",
+            )
+            start = time.perf_counter()
+            self.render(territories, layer_key=layer_key)
+            results["incremental"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            self.render(territories, layer_key=layer_key)
+            results["cached"] += time.perf_counter() - start
+
+            self.forget(layer_key)
+
+        return {name: total / rounds for name, total in results.items()}
@@ -14,6 +14,11 @@ if typing.TYPE_CHECKING:
 class GuildSettings(Base):
     cog: typing.ClassVar[typing.Optional["Risk"]]
     saves: dict[int, RiskState] = pydantic.Field(default_factory=dict)
+    _guild_id: typing.Optional[int] = pydantic.PrivateAttr(default=None)
+
+    @property
+    def guild_id(self) -> typing.Optional[int]:
+        return self._guild_id
 
 
 class DB(Base):
@@ -22,4 +27,6 @@ class DB(Base):
 
     def get_conf(self, guild: discord.Guild | int) -> GuildSettings:
         gid = guild if isinstance(guild, int) else guild.id
-        return self.configs.setdefault(gid, GuildSettings())
+        conf = self.configs.setdefault(gid, GuildSettings())
+        conf._guild_id = gid
+        return conf
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import logging
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+    from risk.main import Risk
+
+    from .models import GuildSettings
+
+log = logging.getLogger("red.craycogs.risk.persistence")
+
+
+class SaveScheduler:
+    """Write-behind persistence for the risk DB.
+
+    Guilds are marked dirty when their settings change and are written to their own
+    config slice after ``delay`` seconds, so bursts of changes are coalesced into a
+    single write per guild. Changes made while a flush is running are picked up by
+    that same flush, so the last mutation is always persisted."""
+
+    def __init__(self, cog: "Risk", delay: float = 2.0):
+        self.cog = cog
+        self.delay = delay
+        self.dirty: set[int] = set()
+        self.global_dirty = False
+        self._task: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+
+        self.saves = 0
+        self.failures = 0
+        self.bytes_written = 0
+        self.total_latency = 0.0
+        self.last_latency = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.saves if self.saves else 0.0
+
+    def mark(self, conf: typing.Optional["GuildSettings"] = None):
+        """Mark a guild's settings (or the global settings if None) as needing a save."""
+        if conf is None:
+            self.global_dirty = True
+        else:
+            assert conf.guild_id is not None
+            self.dirty.add(conf.guild_id)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.delay)
+        await self.flush()
+
+    async def close(self):
+        """Cancel the pending delayed flush and write everything that is still dirty."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            while self.dirty or self.global_dirty:
+                failed = False
+                if self.global_dirty:
+                    self.global_dirty = False
+                    if not await self._write(
+                        self.cog.config.db, self.cog.db, exclude={"configs"}
+                    ):
+                        self.global_dirty = failed = True
+
+                guild_ids, self.dirty = self.dirty, set()
+                for guild_id in guild_ids:
+                    group = self.cog.config.guild_from_id(guild_id)
+                    conf = self.cog.db.configs.get(guild_id)
+                    if conf is None:
+                        await group.clear()
+
+                    elif not await self._write(group.settings, conf):
+                        self.dirty.add(guild_id)
+                        failed = True
+
+                if failed:
+                    # whatever failed stays dirty and is retried on the next flush
+                    break
+
+    async def _write(self, value, model, *, exclude=None) -> bool:
+        def dump():
+            data = model.model_dump(mode="json", exclude=exclude)
+            return data, len(json.dumps(data, separators=(",", ":")))
+
+        start = time.perf_counter()
+        try:
+            data, size = await asyncio.to_thread(dump)
+            await value.set(data)
+        except Exception as e:
+            self.failures += 1
+            log.exception("Failed to save config", exc_info=e)
+            return False
+
+        self.last_latency = time.perf_counter() - start
+        self.total_latency += self.last_latency
+        self.saves += 1
+        self.bytes_written += size
+        return True
@@ -1,4 +1,5 @@
 import asyncio
+import bisect
 import enum
 import functools
 import itertools
@@ -9,9 +10,6 @@ import discord
 import pydantic
 from redbot.core import commands
 from redbot.core.bot import Red
-from redbot.core.data_manager import bundled_data_path
-
-from risk.common.map_generator import RiskMapGenerator
 
 from . import Base
 
@@ -28,22 +26,35 @@ color_names = {
 
 
 class RangeDict(dict[range, T]):
+    """A dict of non-overlapping ranges that can be indexed by any int inside them."""
+
+    def _index(self) -> tuple[list[int], list[range]]:
+        if getattr(self, "_sorted", None) is None:
+            ranges = sorted(super().__iter__(), key=lambda r: r.start)
+            self._sorted = ([r.start for r in ranges], ranges)
+        return self._sorted
+
+    def _find(self, key: int) -> range | None:
+        starts, ranges = self._index()
+        index = bisect.bisect_right(starts, key) - 1
+        if index >= 0 and key in ranges[index]:
+            return ranges[index]
+        return None
+
     def __getitem__(self, key: int) -> T:
-        for r in self:
-            if key in r:
-                return super().__getitem__(r)
-        raise KeyError(key)
+        if (r := self._find(key)) is None:
+            raise KeyError(key)
+        return super().__getitem__(r)
 
     def __setitem__(self, key: int | range, value: T) -> None:
         if isinstance(key, range):
             super().__setitem__(key, value)
+            self._sorted = None
 
         elif isinstance(key, int):
-            for r in self:
-                if key in r:
-                    super().__setitem__(r, value)
-                    return
-            raise KeyError(key)
+            if (r := self._find(key)) is None:
+                raise KeyError(key)
+            super().__setitem__(r, value)
 
         else:
             raise TypeError(f"key must be int or range, not {type(key)}")
@@ -55,8 +66,10 @@ class RangeDict(dict[range, T]):
         return super().__iter__()
 
     def __contains__(self, key: int | range | typing.Any) -> bool:
-        if isinstance(key, (int, range)):
-            return any(key == r or key in r for r in self)
+        if isinstance(key, int):
+            return self._find(key) is not None
+        elif isinstance(key, range):
+            return super().__contains__(key) or any(key in r for r in self)
         else:
             return False
 
@@ -64,17 +77,19 @@ class RangeDict(dict[range, T]):
         return f"RangeDict({super().__repr__()})"
 
 
-class Continent(enum.IntEnum):
-    NORTH_AMERICA = 5
-    SOUTH_AMERICA = 2
-    EUROPE = 5
-    AFRICA = 3
-    ASIA = 7
-    AUSTRALIA = 2
+class Continent(enum.Enum):
+    # (id, capture_armies_award), the id keeps continents with the same award distinct
+    NORTH_AMERICA = 0, 5
+    SOUTH_AMERICA = 1, 2
+    EUROPE = 2, 5
+    AFRICA = 3, 3
+    ASIA = 4, 7
+    AUSTRALIA = 5, 2
 
-    def __init__(self, capture_armies_award: int):
-        super().__init__()
+    def __init__(self, id: int, capture_armies_award: int):
+        self.capture_armies_award = capture_armies_award
         self.territories = list["Territory"]()
+        self.mask = 0
 
 
 territory_ranges = RangeDict(
@@ -141,6 +156,7 @@ class Territory(enum.IntEnum):
     def __init__(self, id: int):
         self.continent = territory_ranges[self.value]
         self.continent.territories.append(self)
+        self.continent.mask |= 1 << self.value
 
     @classmethod
     @functools.cache
@@ -215,11 +231,16 @@ class Card(Base):
 
 cards: list[Card] = []
 
-for continent in Continent:
+# continents with the same award used to share one card cycle, keep that so the
+# denominations still match the bundled card images
+for award in dict.fromkeys(c.capture_armies_award for c in Continent):
     cycle = itertools.cycle(ArmyDenominations)
-    for territory in continent.territories:
-        card = Card(army=next(cycle), territory=territory)
-        cards.append(card)
+    for continent in Continent:
+        if continent.capture_armies_award != award:
+            continue
+        for territory in continent.territories:
+            card = Card(army=next(cycle), territory=territory)
+            cards.append(card)
 
 cards.extend(
     # wildcards
@@ -316,10 +337,55 @@ class RiskState(Base):
         default_factory=lambda: set(color_names)
     )
 
+    _owned: typing.Optional[dict[int, int]] = pydantic.PrivateAttr(default=None)
+
     @property
     def turn_player(self) -> Player:
         return self.players[self.turn]
 
+    @property
+    def owned_masks(self) -> dict[int, int]:
+        """Bitmask of the territories owned by each player turn"""
+        if self._owned is None:
+            owned: dict[int, int] = {}
+            for territory, turn in self.territories.items():
+                if turn is not None:
+                    owned[turn] = owned.get(turn, 0) | 1 << territory
+            self._owned = owned
+        return self._owned
+
+    def owned_mask(self, turn: int | None) -> int:
+        if turn is None:
+            return 0
+        return self.owned_masks.get(turn, 0)
+
+    def set_owner(self, territory: "Territory", turn: int | None):
+        """Change the owner of a territory, keeping the owned bitmasks in sync."""
+        previous = self.territories[territory]
+        self.territories[territory] = turn
+        if self._owned is not None:
+            bit = 1 << territory
+            if previous is not None:
+                self._owned[previous] = self._owned.get(previous, 0) & ~bit
+            if turn is not None:
+                self._owned[turn] = self._owned.get(turn, 0) | bit
+
+    def attackable_from(self, territory: "Territory") -> list["Territory"]:
+        """Enemy held territories adjacent to ``territory``"""
+        occupied = 0
+        for mask in self.owned_masks.values():
+            occupied |= mask
+        own = self.owned_mask(self.territories[territory])
+        return territories_in(adjacency_masks[territory] & occupied & ~own)
+
+    def fortify_targets(self, territory: "Territory") -> list["Territory"]:
+        """Territories connected to ``territory`` through territories of the same owner"""
+        own = self.owned_mask(self.territories[territory])
+        return territories_in(reachable_mask(territory, own) & ~(1 << territory))
+
+    def owns_continent(self, turn: int, continent: "Continent") -> bool:
+        return self.owned_mask(turn) & continent.mask == continent.mask
+
     @pydantic.model_validator(mode="after")
     def sort_players_properly(self):
         self.players.sort(key=lambda p: p.turn)
@@ -338,25 +404,18 @@ class RiskState(Base):
             else inter.client.get_cog("Risk")
         )
 
-        territory_armies = {
-            coords[terr]: str(self.players[turn].captured_territories[terr])
+        territories = {
+            terr: (
+                self.players[turn].color,
+                str(self.players[turn].captured_territories[terr]),
+            )
             if turn is not None
-            else "?"
-            for terr, turn in self.territories.items()
-        }
-
-        territory_colors = {
-            coords[terr]: self.players[turn].color
-            if turn is not None
-            else (128, 128, 128)
+            else ((128, 128, 128), "?")
             for terr, turn in self.territories.items()
         }
 
         image = await asyncio.to_thread(
-            RiskMapGenerator.color_territories,
-            clear_image_path=bundled_data_path(cog) / "risk_board.png",
-            territory_colors=territory_colors,
-            territory_armies=territory_armies,
+            cog.renderer.render, territories, layer_key=inter.channel.id
         )
 
         return discord.File(image, filename="risk_board.png")
@@ -572,3 +631,36 @@ territory_adjacency = {
     Territory.NEW_GUINEA: [Territory.INDONESIA, Territory.EASTERN_AUSTRALIA],
     Territory.WESTERN_AUSTRALIA: [Territory.EASTERN_AUSTRALIA, Territory.INDONESIA],
 }
+
+
+_territories = tuple(Territory)
+
+adjacency_masks: list[int] = [0] * len(_territories)
+"""Bitmask of the territories adjacent to each territory, indexed by territory value"""
+
+for _territory, _neighbours in territory_adjacency.items():
+    for _neighbour in _neighbours:
+        adjacency_masks[_territory] |= 1 << _neighbour
+
+
+def territories_in(mask: int) -> list[Territory]:
+    """The territories whose bits are set in ``mask``."""
+    result: list[Territory] = []
+    while mask:
+        low = mask & -mask
+        result.append(_territories[low.bit_length() - 1])
+        mask ^= low
+    return result
+
+
+@functools.lru_cache(maxsize=4096)
+def reachable_mask(start: Territory, allowed: int) -> int:
+    """Bitmask of every territory in ``allowed`` connected to ``start`` through ``allowed`` territories."""
+    reach = frontier = 1 << start
+    while frontier:
+        expanded = 0
+        for territory in territories_in(frontier):
+            expanded |= adjacency_masks[territory]
+        frontier = expanded & allowed & ~reach
+        reach |= frontier
+    return reach
@@ -4,10 +4,14 @@ import typing as t
 
 from redbot.core import Config, commands
 from redbot.core.bot import Red
+from redbot.core.data_manager import bundled_data_path
 
 from .abc import CompositeMetaClass
 from .commands import Commands
+from .common.map_generator import RiskBoardRenderer
 from .common.models import DB, GuildSettings
+from .common.persistence import SaveScheduler
+from .common.riskmodels import coords
 from .listeners import Listeners
 from .tasks import TaskLoops
 
@@ -31,9 +35,10 @@ class Risk(
         super().__init__()
         self.bot: Red = bot
         self.config = Config.get_conf(self, 117, force_registration=True)
-        self.config.register_global(db={})
+        self.config.register_global(db={}, version=1)
+        self.config.register_guild(settings={})
         self.db: DB = DB()
-        self.saving = False
+        self.saver = SaveScheduler(self)
 
     def format_help_for_context(self, ctx: commands.Context):
         helpcmd = super().format_help_for_context(ctx)
@@ -52,26 +57,46 @@ class Risk(
     async def cog_unload(self):
         for view in self.cache.values():
             view.stop()
+        await self.saver.close()
 
     async def initialize(self) -> None:
         await self.bot.wait_until_red_ready()
+        if (await self.config.version()) == 1:
+            await self.migrate_to_v2()
+
         data = await self.config.db()
+        data["configs"] = {
+            guild_id: guild_data["settings"]
+            for guild_id, guild_data in (await self.config.all_guilds()).items()
+        }
         GuildSettings.cog = self
         self.db = await asyncio.to_thread(DB.model_validate, data)
         self.cache = {}
         log.info("Config loaded")
+        self.renderer = await asyncio.to_thread(
+            RiskBoardRenderer,
+            bundled_data_path(self) / "risk_board.png",
+            coords,
+        )
+        log.info("Board renderer ready")
+
+    def save(self, conf: GuildSettings | None = None) -> None:
+        """Schedule a save of the given guild's settings, or of the global settings if None.
+
+        Saves are coalesced by the SaveScheduler, only the changed guilds are written.
+        """
+        self.saver.mark(conf)
+
+    def end_game(self, channel_id: int) -> None:
+        """Drop the game running in a channel, along with the board layer kept for it."""
+        self.cache.pop(channel_id, None)
+        self.renderer.forget(channel_id)
+
+    async def migrate_to_v2(self):
+        """Move every guild's settings out of the global DB blob into its own guild scope."""
+        data = await self.config.db()
+        for guild_id, settings in data.pop("configs", {}).items():
+            await self.config.guild_from_id(int(guild_id)).settings.set(settings)
 
-    def save(self) -> None:
-        async def _save():
-            if self.saving:
-                return
-            try:
-                self.saving = True
-                dump = await asyncio.to_thread(self.db.model_dump, mode="json")
-                await self.config.db.set(dump)
-            except Exception as e:
-                log.exception("Failed to save config", exc_info=e)
-            finally:
-                self.saving = False
-
-        asyncio.create_task(_save())
+        await self.config.db.set(data)
+        await self.config.version.set(2)
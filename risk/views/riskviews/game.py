@@ -7,12 +7,13 @@ from redbot.core import commands
 from redbot.core.data_manager import bundled_data_path
 from redbot.core.utils.views import ConfirmView
 
+from risk.common import battle
 from risk.common.riskmodels import (
     Continent,
+    Player,
     RiskState,
     Territory,
     TurnPhase,
-    territory_adjacency,
 )
 from risk.views.riskviews.trade_cards import CardSelect
 from risk.views.utilviews import NumberedButtonsView, SelectView
@@ -204,7 +205,7 @@ class GameView(discord.ui.View):
         territory = Territory._value2member_map_.get(int(result.pop().value))
         assert territory is not None
 
-        self.state.territories[territory] = self.state.turn
+        self.state.set_owner(territory, self.state.turn)
 
         if self.state.turn_phase is TurnPhase.INITIAL_ARMY_PLACEMENT:
             armies = 1
@@ -220,7 +221,7 @@ class GameView(discord.ui.View):
             )
             if await aview.wait():
                 if self.state.turn_player.captured_territories.get(territory) is None:
-                    self.state.territories[territory] = None
+                    self.state.set_owner(territory, None)
                 await interaction.followup.send(
                     "Why you take so long to respond bro?", ephemeral=True
                 )
@@ -312,8 +313,7 @@ class GameView(discord.ui.View):
                 description=f"Captured by: {interaction.guild.get_member(player.id).display_name} "
                 f"|| Armies: {player.captured_territories[territory]}",
             )
-            for territory in territory_adjacency[_from]
-            if self.state.territories[territory] == self.state.turn
+            for territory in self.state.fortify_targets(_from)
         ]
 
         if not options:
@@ -455,12 +455,9 @@ class GameView(discord.ui.View):
         kwargs = {"wait": True} if isinstance(interaction, discord.Interaction) else {}
 
         for continent in Continent:
-            if all(
-                territory in self.state.turn_player.captured_territories
-                for territory in continent.territories
-            ):
-                self.state.turn_player.armies += continent
-                alert += f"- {self.state.turn_player.mention} has received {continent.value} armies for capturing {continent.name}\n"
+            if self.state.owns_continent(self.state.turn, continent):
+                self.state.turn_player.armies += continent.capture_armies_award
+                alert += f"- {self.state.turn_player.mention} has received {continent.capture_armies_award} armies for capturing {continent.name}\n"
 
         if alert:
             msg = await ctx.send(alert, **kwargs)
@@ -524,7 +521,7 @@ class GameView(discord.ui.View):
 
                 conf.saves[interaction.channel.id] = self.state
 
-        self.cog.cache.pop(interaction.channel.id, None)
+        self.cog.end_game(interaction.channel.id)
 
         self.stop()
         await interaction.followup.send("Game ended")
@@ -638,12 +635,11 @@ class GameView(discord.ui.View):
                 label=f"{territory.name.replace('_', ' ').title()} - {territory.continent.name.replace('_', ' ').title()}",
                 value=str(territory.value),
                 description=f"Captured by: {inter.guild.get_member(player.id).display_name} "
-                f"|| Armies: {armies}",
+                f"|| Armies: {armies} "
+                f"|| Capture chance: {battle.odds(self.state.turn_player.captured_territories[_from], armies).win_probability:.0%}",
             )
-            for territory in territory_adjacency[_from]
-            if (player_turn := self.state.territories[territory]) is not None
-            and player_turn != self.state.turn
-            and (player := self.state.players[player_turn])
+            for territory in self.state.attackable_from(_from)
+            if (player := self.state.players[self.state.territories[territory]])
             and (armies := player.captured_territories[territory])
         ]
 
@@ -674,90 +670,45 @@ class GameView(discord.ui.View):
         defender = self.state.players[defender_turn]
         attacker = self.state.turn_player
 
-        arng = range(1, min(4, attacker.captured_territories[_from]))
-
-        if len(arng) == 1:
-            attacker_dice = 1
+        attacker_armies = attacker.captured_territories[_from]
+        defender_armies = defender.captured_territories[to]
+        battle_odds = battle.odds(attacker_armies, defender_armies)
+        view = ConfirmView(inter.user)
+        view.message = await inter.followup.send(
+            f"Do you want to blitz {to.name.replace('_', ' ').title()} from {_from.name.replace('_', ' ').title()}? "
+            "Blitzing keeps rolling the most dice until you capture it or have 1 army left.\n"
+            f"Chance of capture: {battle_odds.win_probability:.0%} | "
+            f"Expected losses: {battle_odds.expected_attacker_losses:.1f} (you) vs {battle_odds.expected_defender_losses:.1f} (defender)\n"
+            "Press **No** to choose your dice and roll one battle at a time.",
+            view=view,
+            ephemeral=True,
+            wait=True,
+        )
 
-        else:
-            view = NumberedButtonsView(arng, allowed_to_interact=[attacker.id])
-            await inter.followup.send(
-                f"Select the amount of dice to roll to attack {to.name.replace('_', ' ').title()} from {_from.name.replace('_', ' ').title()}",
-                view=view,
-                ephemeral=True,
+        if await view.wait():
+            if self.edit_task is not None and self.edit_task.done() is False:
+                self.edit_task.cancel()
+            self.edit_task = asyncio.create_task(self.show_updated_board(inter))
+            return await inter.followup.send(
+                "You took too long to respond. Please try again.", ephemeral=True
             )
-            if await view.wait():
-                self.disable_except_essentials()
-                await inter.edit_original_response(
-                    content="Please wait while the updated board is being generated...",
-                    view=self,
-                    embed=None,
-                    attachments=[],
-                )
-                self.update_acc_to_state()
-                file = await self.state.format_embed(inter)
-                await inter.edit_original_response(attachments=[file], view=self)
-                return await inter.followup.send(
-                    "Why you take so long to respond bro?", ephemeral=True
-                )
-
-            attacker_dice = view.result
-
-        drng = range(1, min(3, defender.captured_territories[to] + 1))
 
-        if len(drng) == 1:
-            defender_dice = 1
+        if view.result:
+            result = battle.blitz(attacker_armies, defender_armies)
+            alost = attacker_armies - result.attacker_remaining
+            dlost = defender_armies - result.defender_remaining
+            attacker.captured_territories[_from] = result.attacker_remaining
+            defender.captured_territories[to] = result.defender_remaining
+            message = f"{attacker.mention} blitzed {to.name.replace('_', ' ').title()} from {_from.name.replace('_', ' ').title()} over {result.rounds} rolls.\n\n"
 
         else:
-            view = NumberedButtonsView(drng)
-            await inter.followup.send(
-                f"{defender.mention} Select the amount of dice to roll to defend {to.name.replace('_', ' ').title()} from {_from.name.replace('_', ' ').title()}",
-                view=view,
-            )
-            if await view.wait():
-                self.disable_except_essentials()
-                await inter.edit_original_response(
-                    content="Please wait while the updated board is being generated...",
-                    view=self,
-                    embed=None,
-                    attachments=[],
-                )
-                self.update_acc_to_state()
-                file = await self.state.format_embed(inter)
-                await inter.edit_original_response(file=file, view=self)
-                return await inter.followup.send(
-                    "Why you take so long to respond bro?", ephemeral=True
-                )
-
-            defender_dice = view.result
-
-        arolls = [random.randrange(1, 7) for _ in range(attacker_dice)]
-        drolls = [random.randrange(1, 7) for _ in range(defender_dice)]
-
-        attacker_rolls = sorted(arolls, reverse=True)
-        defender_rolls = sorted(drolls, reverse=True)
-
-        await asyncio.sleep(3)
-
-        message = f"{attacker.mention} rolled {attacker_dice} dice and got {', '.join(map(str, arolls))}\n"
-        message += f"{defender.mention} rolled {defender_dice} dice and got {', '.join(map(str, drolls))}\n\n"
-        message += f"{attacker.mention}'s highest rolls are {', '.join(map(str, attacker_rolls[: len(defender_rolls)]))}\n"
-        message += f"{defender.mention}'s highest rolls are {', '.join(map(str, defender_rolls))}\n\n"
-
-        alost = 0
-        dlost = 0
+            outcome = await self.dice_battle(inter, attacker, defender, _from, to)
+            if outcome is None:
+                return
+            alost, dlost, message = outcome
 
         captured = False
 
-        for aroll, droll in zip(attacker_rolls, defender_rolls):
-            if aroll > droll:
-                defender.captured_territories[to] -= 1
-                dlost += 1
-
-            else:
-                attacker.captured_territories[_from] -= 1
-                alost += 1
-
         if alost == 0:
             message += f"{attacker.mention} lost no armies meanwhile {defender.mention} lost {dlost} armies\n"
 
@@ -769,7 +720,7 @@ class GameView(discord.ui.View):
 
         if defender.captured_territories[to] == 0:
             captured = True
-            self.state.territories[to] = self.state.turn
+            self.state.set_owner(to, self.state.turn)
             defender.captured_territories.pop(to)
             attacker.captured_territories[to] = 0
 
@@ -793,7 +744,7 @@ class GameView(discord.ui.View):
                 wait=True,
             )
             self.stop()
-            self.cog.cache.pop(inter.channel.id, None)
+            self.cog.end_game(inter.channel.id)
             return
 
         if captured:
@@ -834,3 +785,97 @@ class GameView(discord.ui.View):
         if self.edit_task is not None and self.edit_task.done() is False:
             self.edit_task.cancel()
         self.edit_task = asyncio.create_task(self.show_updated_board(inter))
+
+    async def dice_battle(
+        self,
+        inter: discord.Interaction,
+        attacker: Player,
+        defender: Player,
+        _from: Territory,
+        to: Territory,
+    ) -> tuple[int, int, str] | None:
+        arng = range(1, min(4, attacker.captured_territories[_from]))
+
+        if len(arng) == 1:
+            attacker_dice = 1
+
+        else:
+            view = NumberedButtonsView(arng, allowed_to_interact=[attacker.id])
+            await inter.followup.send(
+                f"Select the amount of dice to roll to attack {to.name.replace('_', ' ').title()} from {_from.name.replace('_', ' ').title()}",
+                view=view,
+                ephemeral=True,
+            )
+            if await view.wait():
+                self.disable_except_essentials()
+                await inter.edit_original_response(
+                    content="Please wait while the updated board is being generated...",
+                    view=self,
+                    embed=None,
+                    attachments=[],
+                )
+                self.update_acc_to_state()
+                file = await self.state.format_embed(inter)
+                await inter.edit_original_response(attachments=[file], view=self)
+                await inter.followup.send(
+                    "Why you take so long to respond bro?", ephemeral=True
+                )
+                return None
+
+            attacker_dice = view.result
+
+        drng = range(1, min(3, defender.captured_territories[to] + 1))
+
+        if len(drng) == 1:
+            defender_dice = 1
+
+        else:
+            view = NumberedButtonsView(drng)
+            await inter.followup.send(
+                f"{defender.mention} Select the amount of dice to roll to defend {to.name.replace('_', ' ').title()} from {_from.name.replace('_', ' ').title()}",
+                view=view,
+            )
+            if await view.wait():
+                self.disable_except_essentials()
+                await inter.edit_original_response(
+                    content="Please wait while the updated board is being generated...",
+                    view=self,
+                    embed=None,
+                    attachments=[],
+                )
+                self.update_acc_to_state()
+                file = await self.state.format_embed(inter)
+                await inter.edit_original_response(file=file, view=self)
+                await inter.followup.send(
+                    "Why you take so long to respond bro?", ephemeral=True
+                )
+                return None
+
+            defender_dice = view.result
+
+        arolls = [random.randrange(1, 7) for _ in range(attacker_dice)]
+        drolls = [random.randrange(1, 7) for _ in range(defender_dice)]
+
+        attacker_rolls = sorted(arolls, reverse=True)
+        defender_rolls = sorted(drolls, reverse=True)
+
+        await asyncio.sleep(3)
+
+        message = f"{attacker.mention} rolled {attacker_dice} dice and got {', '.join(map(str, arolls))}\n"
+        message += f"{defender.mention} rolled {defender_dice} dice and got {', '.join(map(str, drolls))}\n\n"
+        message += f"{attacker.mention}'s highest rolls are {', '.join(map(str, attacker_rolls[: len(defender_rolls)]))}\n"
+        message += f"{defender.mention}'s highest rolls are {', '.join(map(str, defender_rolls))}\n\n"
+
+        alost = 0
+        dlost = 0
+
+        for aroll, droll in zip(attacker_rolls, defender_rolls):
+            if aroll > droll:
+                defender.captured_territories[to] -= 1
+                dlost += 1
+
+            else:
+                attacker.captured_territories[_from] -= 1
+                alost += 1
+
+        return alost, dlost, message
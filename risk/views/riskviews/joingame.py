@@ -172,7 +172,7 @@ class JoinGame(discord.ui.View):
                         armies += 1
                         remaining_armies -= 1
                     player.captured_territories[t] = armies
-                    self.state.territories[t] = player.turn
+                    self.state.set_owner(t, player.turn)
                     player.armies -= armies
 
                 start_index = end_index
@@ -0,0 +1,164 @@
+"""
+MIT License
+
+Copyright (c) 2020-2023 phenom4n4n
+Copyright (c) 2023-present i-am-zaidali
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import random
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+import discord
+from discord.app_commands.transformers import CommandParameter
+
+from .objects import ApplicationCommand, ProcessorFactory, SlashTag
+
+if TYPE_CHECKING:
+    from .core import SlashTags
+
+__all__ = ("BenchmarkResult", "dispatch_benchmark", "startup_benchmark")
+
+COMMAND_TYPES = (
+    discord.AppCommandType.chat_input,
+    discord.AppCommandType.user,
+    discord.AppCommandType.message,
+)
+
+
+class BenchmarkResult:
+    """Timings of a single benchmark section, in microseconds per operation."""
+
+    __slots__ = ("name", "operations", "timings")
+
+    def __init__(self, name: str, operations: int):
+        self.name = name
+        self.operations = operations
+        self.timings: Dict[str, float] = {}
+
+    def time(self, label: str, func: Callable[[], object], rounds: int = 3):
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        self.timings[label] = best * 1_000_000 / self.operations
+
+    def to_rows(self) -> List[List[str]]:
+        return [
+            [self.name, label, f"{timing:,.2f}µs"]
+            for label, timing in self.timings.items()
+        ]
+
+
+def _fake_tags(cog: "SlashTags", count: int, guild_id: int) -> List[SlashTag]:
+    tags = []
+    for i in range(count):
+        command = ApplicationCommand(
+            cog,
+            id=i,
+            application_id=0,
+            name=f"tag{i}",
+            description="benchmark",
+            guild_id=guild_id,
+            type=COMMAND_TYPES[i % len(COMMAND_TYPES)],
+        )
+        tags.append(
+            SlashTag(cog, "{args}", guild_id=guild_id, real=False, command=command)
+        )
+    return tags
+
+
+def dispatch_benchmark(
+    cog: "SlashTags", count: int = 1000, lookups: int = 10_000
+) -> BenchmarkResult:
+    """
+    Compare resolving a tag by name with a linear scan over the guild cache against the
+    `(guild_id, name, type)` index, using `count` throwaway tags that never reach the
+    real caches.
+    """
+    guild_id = 0
+    tags = _fake_tags(cog, count, guild_id)
+    cache = {tag.id: tag for tag in tags}
+    index = {tag.name_key: tag for tag in tags}
+    queries = [(tag.name, tag.type) for tag in random.choices(tags, k=lookups)]
+
+    def linear():
+        for name, type in queries:
+            discord.utils.get(cache.values(), name=name, type=type)
+
+    def indexed():
+        for name, type in queries:
+            index.get((guild_id, name, type))
+
+    result = BenchmarkResult(f"dispatch ({count:,} tags)", lookups)
+    result.time("linear scan", linear)
+    result.time("name index", indexed)
+    return result
+
+
+def startup_benchmark(cog: "SlashTags", count: int = 1000) -> BenchmarkResult:
+    """
+    Compare building the dpy processors of `count` chat input tags by compiling each one
+    against reusing the compiled code per option signature.
+    """
+    shapes = [
+        [
+            CommandParameter(
+                name=f"arg{i}",
+                description="benchmark",
+                type=option_type,
+                required=i < required,
+            )
+            for i, option_type in enumerate(option_types)
+        ]
+        for option_types, required in (
+            ((), 0),
+            ((discord.AppCommandOptionType.string,), 1),
+            ((discord.AppCommandOptionType.string,), 0),
+            (
+                (
+                    discord.AppCommandOptionType.user,
+                    discord.AppCommandOptionType.string,
+                ),
+                1,
+            ),
+            ((discord.AppCommandOptionType.integer,) * 3, 2),
+        )
+    ]
+    commands = [
+        (tag.command, shapes[i % len(shapes)])
+        for i, tag in enumerate(_fake_tags(cog, count, 0))
+    ]
+
+    def compile_each():
+        for _, options in commands:
+            ProcessorFactory.compile(options)
+
+    def factory():
+        processor_factory = ProcessorFactory()
+        for command, options in commands:
+            processor_factory.create(command, options)
+
+    result = BenchmarkResult(f"processors ({count:,} tags)", count)
+    result.time("compile per tag", compile_each, rounds=1)
+    result.time("signature cache", factory, rounds=1)
+    return result
@@ -0,0 +1,108 @@
+"""
+MIT License
+
+Copyright (c) 2020-2023 phenom4n4n
+Copyright (c) 2023-present i-am-zaidali
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import TagScriptEngine as tse
+
+log = logging.getLogger("red.phenom4n4n.slashtags.compiler")
+
+__all__ = ("CompiledTagCache",)
+
+Coordinates = Tuple[Tuple[int, int], ...]
+
+
+class CompiledTagCache:
+    """
+    An LRU cache of parsed TagScript node trees.
+
+    Entries are keyed by tag ID and checked against the hash of the tagscript they were
+    built from, so an edited tagscript is never run with a stale tree. Nodes are mutated
+    while a tag is processed, so only their coordinates are cached and fresh nodes are
+    built from them for every run.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[Hashable, Tuple[int, str, Coordinates]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def compile(self, tag_id: Hashable, tagscript: str) -> Coordinates:
+        tagscript_hash = hash(tagscript)
+        entry = self._cache.get(tag_id)
+        if entry is not None and entry[0] == tagscript_hash and entry[1] == tagscript:
+            self._cache.move_to_end(tag_id)
+            self.hits += 1
+            return entry[2]
+
+        self.misses += 1
+        coordinates = tuple(node.coordinates for node in tse.build_node_tree(tagscript))
+        self._cache[tag_id] = (tagscript_hash, tagscript, coordinates)
+        self._cache.move_to_end(tag_id)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return coordinates
+
+    def invalidate(self, tag_id: Hashable):
+        self._cache.pop(tag_id, None)
+
+    def clear(self):
+        self._cache.clear()
+
+    def process(
+        self,
+        interpreter: tse.Interpreter,
+        tag_id: Hashable,
+        tagscript: str,
+        seed_variables: Optional[Dict[str, tse.Adapter]] = None,
+        *,
+        charlimit: Optional[int] = None,
+        dot_parameter: bool = False,
+        **kwargs: Any,
+    ) -> tse.Response:
+        """Same as `Interpreter.process` but reuses the cached node tree of the tag."""
+        nodes = [tse.Node(coords) for coords in self.compile(tag_id, tagscript)]
+        response = tse.Response(variables=seed_variables, extra_kwargs=kwargs)
+        try:
+            output = interpreter._solve(
+                tagscript,
+                nodes,
+                response,
+                charlimit=charlimit,
+                dot_parameter=dot_parameter,
+            )
+        except tse.TagScriptError:
+            raise
+        except Exception as error:
+            raise tse.ProcessError(error, response, interpreter) from error
+        return interpreter._return_response(response, output)
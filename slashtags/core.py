@@ -24,14 +24,17 @@ SOFTWARE.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
+import time
 from collections import defaultdict
-from functools import partial
-from typing import Coroutine, Dict, Optional, TYPE_CHECKING
+from typing import Coroutine, Dict, Optional, Tuple, TYPE_CHECKING
 
 import aiohttp
 import discord
 import TagScriptEngine as tse
+from discord.ext import tasks
 from redbot.core import commands
 from redbot.core.bot import Red
 from redbot.core.config import Config
@@ -47,6 +50,8 @@ from .views import ConfirmationView
 
 log = logging.getLogger("red.phenom4n4n.slashtags")
 
+GUILD_SYNC_CONCURRENCY = 5
+
 
 class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass):
     """
@@ -86,6 +91,7 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
             "tags": {},
             "error_dispatching": True,
             "testing_enabled": False,
+            "guild_sync_hashes": {},
         }
         self.config.register_guild(**default_guild)
         self.config.register_global(**default_global)
@@ -93,6 +99,13 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
         self.command_cache: Dict[int, ApplicationCommand] = {}
         self.guild_tag_cache: Dict[int, Dict[int, SlashTag]] = defaultdict(dict)
         self.global_tag_cache: Dict[int, SlashTag] = {}
+        # (guild ID or None for global tags, name, type) -> tag
+        self.tag_name_index: Dict[
+            Tuple[Optional[int], str, discord.AppCommandType], SlashTag
+        ] = {}
+        # guild ID (None for global tags) -> tag ID -> tag with unsaved uses
+        self.pending_uses: Dict[Optional[int], Dict[int, SlashTag]] = defaultdict(dict)
+        self.guild_sync_stats: Optional[Dict[str, float]] = None
 
         self.load_task = self.create_task(self.initialize_task())
 
@@ -135,6 +148,8 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
         self.bot.tree.sync = self.old_sync
 
         self.load_task.cancel()
+        self.flush_uses_loop.cancel()
+        await self.flush_tag_uses()
 
         for command in self.command_cache.copy().values():
             command.remove_from_cache()
@@ -145,9 +160,40 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
         self.error_dispatching = data["error_dispatching"]
         self.testing_enabled = data["testing_enabled"]
         self.monkeypatch_redtree_sync()
+        self.flush_uses_loop.start()
         if app_id := data["application_id"] or self.bot.application_id:
             self.application_id = app_id
 
+    def record_use(self, tag: SlashTag):
+        """Queue a tag's use count to be saved with the next batched flush."""
+        if tag._real_tag:
+            self.pending_uses[tag.guild_id][tag.id] = tag
+
+    async def flush_tag_uses(self):
+        """Write the pending use counts, in one config write per guild."""
+        pending, self.pending_uses = self.pending_uses, defaultdict(dict)
+        for guild_id, tags in pending.items():
+            config_path = (
+                self.config.guild_from_id(guild_id) if guild_id else self.config
+            )
+            try:
+                async with config_path.tags() as data:
+                    for tag_id, tag in tags.items():
+                        if (tag_data := data.get(str(tag_id))) is not None:
+                            tag_data["uses"] = tag.uses
+            except Exception as error:
+                log.exception(
+                    "Failed to save slash tag uses for guild %s",
+                    guild_id,
+                    exc_info=error,
+                )
+                for tag_id, tag in tags.items():
+                    self.pending_uses[guild_id].setdefault(tag_id, tag)
+
+    @tasks.loop(minutes=1)
+    async def flush_uses_loop(self):
+        await self.flush_tag_uses()
+
     async def _sync(
         self, *args, guild: Optional[discord.abc.Snowflake] = None, **kwargs
     ):
@@ -189,72 +235,147 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
             cached,
         )
 
+    @staticmethod
+    def tag_payload_hash(application_id: Optional[int], tags: Dict[str, dict]) -> str:
+        """Hash the command payloads of a guild's tags, ignoring use counts and scripts."""
+        payload = {
+            "application_id": application_id,
+            "commands": {tag_id: data["command"] for tag_id, data in tags.items()},
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
     async def cache_and_sync_guild_tags(self, guild_data: Optional[dict] = None):
+        guilds_data = guild_data or await self.config.all_guilds()
+        sync_hashes = await self.config.guild_sync_hashes()
+        semaphore = asyncio.Semaphore(GUILD_SYNC_CONCURRENCY)
+        new_hashes: Dict[str, str] = {}
+        start = time.perf_counter()
+
+        async def sync(guild_id: int, data: dict) -> Optional[bool]:
+            payload_hash = self.tag_payload_hash(self.application_id, data["tags"])
+            if sync_hashes.get(str(guild_id)) == payload_hash:
+                for tag_data in data["tags"].values():
+                    SlashTag.from_dict(self, tag_data, guild_id=guild_id).add_to_cache()
+                log.debug("Slash tags unchanged in guild %s, skipping sync", guild_id)
+                return False
+            async with semaphore:
+                try:
+                    synced_hash = await self.sync_guild_tags(guild_id, data)
+                except Exception as error:
+                    log.exception(
+                        "Failed to sync slash tags for guild %s",
+                        guild_id,
+                        exc_info=error,
+                    )
+                    return None
+            if synced_hash is not None:
+                new_hashes[str(guild_id)] = synced_hash
+            return True
+
+        jobs = [
+            sync(guild_id, data)
+            for guild_id, data in guilds_data.items()
+            if data["tags"] and self.bot.get_guild(guild_id)
+        ]
+        results = await asyncio.gather(*jobs)
+
+        if new_hashes:
+            async with self.config.guild_sync_hashes() as hashes:
+                hashes.update(new_hashes)
+
+        self.guild_sync_stats = {
+            "synced": results.count(True),
+            "skipped": results.count(False),
+            "failed": results.count(None),
+            "seconds": time.perf_counter() - start,
+        }
+        log.info(
+            "Guild slash tag sync finished in %.2fs: %d synced, %d unchanged, %d failed",
+            self.guild_sync_stats["seconds"],
+            self.guild_sync_stats["synced"],
+            self.guild_sync_stats["skipped"],
+            self.guild_sync_stats["failed"],
+        )
+
+    async def sync_guild_tags(self, guild_id: int, guild_data: dict) -> Optional[str]:
+        """
+        Sync a guild's slash tags with Discord and cache them.
+
+        The synced tags are saved with a single config write. Returns the payload hash
+        of the synced tags, or None if there was nothing to sync.
+        """
         if TYPE_CHECKING:
             from discord.types.command import ApplicationCommand as APTD
 
-        guilds_data = guild_data or await self.config.all_guilds()
-        for guild_id, guild_data in guilds_data.items():
-            guild = self.bot.get_guild(guild_id)
-            if not guild or not guild_data["tags"]:
-                continue
-            all_commands = dict[int, SlashTag](
-                map(
-                    lambda x: (
-                        x,
-                        SlashTag.from_dict(
-                            self, guild_data["tags"][str(x)], guild_id=guild_id
-                        ),
+        all_commands = dict[int, SlashTag](
+            map(
+                lambda x: (
+                    x,
+                    SlashTag.from_dict(
+                        self, guild_data["tags"][str(x)], guild_id=guild_id
                     ),
-                    map(int, guild_data["tags"].keys()),
-                )
+                ),
+                map(int, guild_data["tags"].keys()),
             )
-            commands_synced = dict[int, "APTD"](
-                map(
-                    lambda x: (int(x["id"]), x),
-                    await self.bot.http.get_guild_commands(
-                        self.application_id, guild_id
-                    ),
-                )
+        )
+        commands_synced = dict[int, "APTD"](
+            map(
+                lambda x: (int(x["id"]), x),
+                await self.bot.http.get_guild_commands(self.application_id, guild_id),
             )
+        )
 
-            commands_not_synced = dict[int, SlashTag](
-                filter(
-                    lambda x: commands_synced.pop(x[0], False)
-                    and all_commands.pop(x[0], False),
-                    all_commands.copy().items(),
-                )
+        commands_not_synced = dict[int, SlashTag](
+            filter(
+                lambda x: commands_synced.pop(x[0], False)
+                and all_commands.pop(x[0], False),
+                all_commands.copy().items(),
             )
+        )
 
-            if not commands_synced and not commands_not_synced:
-                log.info("No slash tags to sync in guild %s", guild_id)
-                continue
+        if not commands_synced and not commands_not_synced:
+            log.info("No slash tags to sync in guild %s", guild_id)
+            return None
 
-            synced = await self.bot.http.bulk_upsert_guild_commands(
-                self.application_id,
-                guild_id,
-                [*map(lambda x: x.command.to_request(), commands_not_synced.values())]
-                + [*commands_synced.values()],
-            )
+        synced = await self.bot.http.bulk_upsert_guild_commands(
+            self.application_id,
+            guild_id,
+            [*map(lambda x: x.command.to_request(), commands_not_synced.values())]
+            + [*commands_synced.values()],
+        )
 
-            for com in synced:
-                tag = discord.utils.get(
-                    [*commands_not_synced.values()],
-                    name=com["name"],
-                    type=discord.AppCommandType(com["type"]),
-                )
-                if not tag:
-                    log.debug("tag not found: %s", com)
-                    continue
-                tag.command._parse_response_data(com)
-                await tag.initialize()
-
-            log.info(
-                "Completed caching slash tags for guild %s: %d commands (non tags) and %d tags were synced",
-                guild_id,
-                len(commands_synced),
-                len(commands_not_synced),
-            )
+        tags_by_name = {
+            (tag.name, tag.type): (tag_id, tag)
+            for tag_id, tag in commands_not_synced.items()
+        }
+        initialized: Dict[int, SlashTag] = {}
+        for com in synced:
+            key = (com["name"], discord.AppCommandType(com["type"]))
+            if key not in tags_by_name:
+                log.debug("tag not found: %s", com)
+                continue
+            old_id, tag = tags_by_name[key]
+            tag.command._parse_response_data(com)
+            tag.add_to_cache()
+            initialized[old_id] = tag
+
+        async with self.config.guild_from_id(guild_id).tags() as tags:
+            for old_id, tag in initialized.items():
+                tags.pop(str(old_id), None)
+                tags[str(tag.id)] = tag.to_dict()
+            synced_tags = {
+                str(tag.id): tags[str(tag.id)] for tag in initialized.values()
+            }
+
+        log.info(
+            "Completed caching slash tags for guild %s: %d commands (non tags) and %d tags were synced",
+            guild_id,
+            len(commands_synced),
+            len(commands_not_synced),
+        )
+        return self.tag_payload_hash(self.application_id, synced_tags)
 
     @commands.Cog.listener()
     async def on_slash_commands_synced(
@@ -267,15 +388,7 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
             guild_id,
         )
         for command in commands:
-            tag = discord.utils.get(
-                (
-                    self.global_tag_cache.values()
-                    if guild is None
-                    else self.guild_tag_cache[guild_id].values()
-                ),
-                name=command.name,
-                type=command.type,
-            )
+            tag = self.tag_name_index.get((guild_id, command.name, command.type))
             if not tag:
                 continue
 
@@ -329,17 +442,23 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
         guild: Optional[discord.Guild],
         tag_name: str,
         *,
+        type: Optional[discord.AppCommandType] = None,
         check_global: bool = True,
         global_priority: bool = False,
     ) -> Optional[SlashTag]:
-        tag = None
-        get = partial(discord.utils.get, name=tag_name)
+        types = (type,) if type is not None else tuple(discord.AppCommandType)
+
+        def get(guild_id: Optional[int]) -> Optional[SlashTag]:
+            for command_type in types:
+                key = (guild_id, tag_name, command_type)
+                if (tag := self.tag_name_index.get(key)) is not None:
+                    return tag
+
         if global_priority and check_global:
-            return get(self.global_tag_cache.values())
-        if guild is not None:
-            tag = get(self.guild_tag_cache[guild.id].values())
+            return get(None)
+        tag = get(guild.id) if guild is not None else None
         if tag is None and check_global:
-            tag = get(self.global_tag_cache.values())
+            tag = get(None)
         return tag
 
     @staticmethod
@@ -401,7 +520,9 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
             command_id = interaction.command_id
             command_guild = self.bot.get_guild(interaction.command_guild_id)
             tag = self.get_tag(command_guild, command_id) or self.get_tag_by_name(
-                command_guild, interaction.command_name
+                command_guild,
+                interaction.command_name,
+                type=interaction.command_type,
             )
             command = getattr(tag, "command", None)
             if isinstance(command, ApplicationCommand):
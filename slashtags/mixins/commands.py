@@ -39,6 +39,7 @@ from redbot.core.utils.predicates import MessagePredicate
 from tabulate import tabulate
 
 from ..abc import MixinMeta
+from ..benchmarks import dispatch_benchmark, startup_benchmark
 from ..converters import (
     GlobalTagConverter,
     GuildTagConverter,
@@ -774,7 +775,18 @@ class Commands(MixinMeta):
             f"Application ID: **{self.application_id}**",
             f"Eval command: {eval_command}",
             f"Test cog loaded: {testing_enabled}",
+            f"Compiled tag cache: **{len(self.compiled_tags)}/{self.compiled_tags.maxsize}** "
+            f"(hits: {self.compiled_tags.hits}, misses: {self.compiled_tags.misses})",
         ]
+        description.append(
+            f"Compiled processors: **{len(self.processor_factory)}** "
+            f"(hits: {self.processor_factory.hits}, misses: {self.processor_factory.misses})"
+        )
+        if stats := self.guild_sync_stats:
+            description.append(
+                f"Last guild sync: **{stats['seconds']:.2f}s** ({stats['synced']} synced, "
+                f"{stats['skipped']} unchanged, {stats['failed']} failed)"
+            )
         embed = discord.Embed(
             color=0xC9C9C9,
             title="SlashTags Settings",
@@ -782,6 +794,20 @@ class Commands(MixinMeta):
         )
         await ctx.send(embed=embed)
 
+    @slashtagset.command("benchmark", hidden=True)
+    async def slashtagset_benchmark(self, ctx: commands.Context, tags: int = 1000):
+        """Time tag dispatch lookups and processor creation against a set of throwaway tags."""
+        if not 1 <= tags <= 100_000:
+            return await ctx.send("The tag count must be between 1 and 100,000.")
+        async with ctx.typing():
+            results = [
+                await asyncio.to_thread(dispatch_benchmark, self, tags),
+                await asyncio.to_thread(startup_benchmark, self, tags),
+            ]
+        rows = [row for result in results for row in result.to_rows()]
+        table = tabulate(rows, headers=["Section", "Method", "Per operation"])
+        await ctx.send(box(table))
+
     @slashtagset.command("appid")
     async def slashtagset_appid(self, ctx: commands.Context, id: int = None):
         """
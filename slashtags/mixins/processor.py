@@ -36,9 +36,10 @@ from discord.ext.commands.context import Typing, DeferTyping
 
 from ..abc import MixinMeta
 from ..blocks import HideBlock, ReactBlock
+from ..compiler import CompiledTagCache
 from ..errors import RequireCheckFailure
 from ..models import InteractionWrapper
-from ..objects import FakeMessage, SlashTag, ApplicationCommand
+from ..objects import FakeMessage, SlashTag, ApplicationCommand, ProcessorFactory
 from ..utils import dev_check, TemporaryAttributes
 
 PL = commands.PrivilegeLevel
@@ -87,6 +88,8 @@ class Processor(MixinMeta):
         ]
         slash_blocks = [HideBlock(), ReactBlock()]
         self.engine = tse.Interpreter(tse_blocks + slash_blocks)
+        self.compiled_tags = CompiledTagCache()
+        self.processor_factory = ProcessorFactory()
 
         self.role_converter = commands.RoleConverter()
         self.channel_converter = commands.TextChannelConverter()
@@ -163,7 +166,7 @@ class Processor(MixinMeta):
             interaction, seed_variables or {}
         )
         output = tag.run(self.engine, seed_variables=seed_variables, **kwargs)
-        await tag.update_config()
+        self.record_use(tag)
         content = output.body[:2000] if output.body else None
         actions = output.actions
 
@@ -25,7 +25,8 @@ SOFTWARE.
 
 import asyncio
 import logging
-from typing import Any, List, Optional, Union, TYPE_CHECKING
+import types
+from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import discord
 import TagScriptEngine as tse
@@ -44,6 +45,7 @@ if TYPE_CHECKING:
 log = logging.getLogger("red.phenom4n4n.slashtags.objects")
 
 __all__ = (
+    "ProcessorFactory",
     "ApplicationCommand",
     "SlashTag",
     "FakeMessage",
@@ -101,6 +103,94 @@ python_keywords = [
 pk_refined_mapping = {x: f"_{x}" for x in python_keywords}
 
 
+class ProcessorFactory:
+    """
+    Builds the dpy callbacks for chat input slash tags.
+
+    The callback source only depends on the option signature, so it is compiled once per
+    signature and every tag of that shape gets a new function sharing the code object.
+    """
+
+    __slots__ = ("_templates", "hits", "misses")
+
+    def __init__(self):
+        self._templates: Dict[Tuple[Tuple[str, Any, bool], ...], types.FunctionType] = (
+            {}
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    @staticmethod
+    def signature(options: List[CommandParameter]) -> Tuple[Tuple[str, Any, bool], ...]:
+        return tuple((opt.name, opt.type, opt.required) for opt in options)
+
+    @staticmethod
+    def compile(options: List[CommandParameter]) -> types.FunctionType:
+        command_args = ", ".join(
+            (
+                f"{opt.name}: {ACOT_to_DTA_mapping.get(opt.type, 'str')}"
+                if opt.required
+                else f"{opt.name}: Optional[{ACOT_to_DTA_mapping.get(opt.type, 'str')}] = None"
+            )
+            for opt in options
+        )
+
+        d = {
+            "discord": discord,
+            "log": log,
+            "self": None,
+            "InteractionWrapper": InteractionWrapper,
+            "Union": Union,
+            "Optional": Optional,
+        }
+        fn_string = (
+            f"async def processor(interaction: discord.Interaction, {command_args}):\n"
+            "   if interaction.type != discord.InteractionType.application_command:\n"
+            "      return\n"
+            "   log.debug('Received slash command %r', interaction)\n"
+            "   ctx = await self.cog.bot.get_context(interaction)\n"
+            "   wrapper = InteractionWrapper(ctx)\n"
+            "   await self.cog.handle_slash_interaction(wrapper)\n\n"
+        )
+
+        log.debug('Compiling dpy command processor\n"""\n%s"""', fn_string)
+
+        exec(
+            fn_string,
+            d,
+        )
+        return d["processor"]
+
+    def create(
+        self, command: "ApplicationCommand", options: List[CommandParameter]
+    ) -> types.FunctionType:
+        """Create a processor bound to `command` for the given (required first) options."""
+        key = self.signature(options)
+        try:
+            template = self._templates[key]
+        except KeyError:
+            template = self._templates[key] = self.compile(options)
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        # dpy's decorators set attributes on the function, so every command gets its own.
+        processor = types.FunctionType(
+            template.__code__,
+            {**template.__globals__, "self": command},
+            template.__name__,
+            template.__defaults__,
+        )
+        processor.__annotations__ = template.__annotations__.copy()
+        return processor
+
+    def clear(self):
+        self._templates.clear()
+
+
 class ApplicationCommand:
     __slots__ = (
         "cog",
@@ -341,44 +431,7 @@ class ApplicationCommand:
 
             decos.extend([deco, describe, choices, rename])
 
-            command_args = ", ".join(
-                (
-                    f"{opt.name}: {ACOT_to_DTA_mapping.get(opt.type, 'str')}"
-                    if opt.required
-                    else f"{opt.name}: Optional[{ACOT_to_DTA_mapping.get(opt.type, 'str')}] = None"
-                )
-                for opt in opts
-            )
-
-            d = {
-                "discord": discord,
-                "log": log,
-                "self": self,
-                "InteractionWrapper": InteractionWrapper,
-                "Union": Union,
-                "Optional": Optional,
-            }
-            fn_string = (
-                f"async def processor(interaction: discord.Interaction, {command_args}):\n"
-                "   if interaction.type != discord.InteractionType.application_command:\n"
-                "      return\n"
-                "   log.debug('Received slash command %r', interaction)\n"
-                "   ctx = await self.cog.bot.get_context(interaction)\n"
-                "   wrapper = InteractionWrapper(ctx)\n"
-                "   await self.cog.handle_slash_interaction(wrapper)\n\n"
-            )
-
-            log.debug(
-                'Creating dpy command processor for slashtag %s\n"""\n%s"""',
-                self.name,
-                fn_string,
-            )
-
-            exec(
-                fn_string,
-                d,
-            )
-            processor = d["processor"]
+            processor = self.cog.processor_factory.create(self, opts)
 
         else:
             decos.append(self.cog.bot.tree.context_menu(name=self.name, guild=guild))
@@ -511,6 +564,10 @@ class SlashTag:
             else self.cog.global_tag_cache
         )
 
+    @property
+    def name_key(self) -> tuple:
+        return (self.guild_id, self.name, self.type)
+
     @property
     def config_path(self):
         return (
@@ -550,7 +607,9 @@ class SlashTag:
     ) -> tse.Response:
         self.uses += 1
         seed_variables.update(uses=tse.IntAdapter(self.uses))
-        return interpreter.process(self.tagscript, seed_variables, **kwargs)
+        return self.cog.compiled_tags.process(
+            interpreter, self.id, self.tagscript, seed_variables, **kwargs
+        )
 
     async def update_config(self):
         if self._real_tag:
@@ -607,7 +666,9 @@ class SlashTag:
         return f"{self.name_prefix} `{self}` restored."
 
     def remove_from_cache(self):
+        self.cog.compiled_tags.invalidate(self.id)
         self.command.remove_from_cache()
+        self._remove_from_name_index()
         try:
             del self.cache_path[self.id]
         except KeyError:
@@ -616,12 +677,24 @@ class SlashTag:
     def add_to_cache(self):
         if self.command.add_to_cache():
             self.cache_path[self.id] = self
+            self.cog.tag_name_index[self.name_key] = self
             return True
 
         return False
 
+    def _remove_from_name_index(self) -> bool:
+        if self.cog.tag_name_index.get(self.name_key) is self:
+            del self.cog.tag_name_index[self.name_key]
+            return True
+        return False
+
     async def edit(self, **kwargs):
-        await self.command.edit(**kwargs)
+        indexed = self._remove_from_name_index()
+        try:
+            await self.command.edit(**kwargs)
+        finally:
+            if indexed:
+                self.cog.tag_name_index[self.name_key] = self
         await self.update_config()
 
     async def get_info(self, ctx: commands.Context) -> discord.Embed:
@@ -670,6 +743,7 @@ class SlashTag:
     async def edit_tagscript(self, tagscript: str) -> str:
         old_tagscript = self.tagscript
         self.tagscript = tagscript
+        self.cog.compiled_tags.invalidate(self.id)
         await self.update_config()
         return f"{self.name_prefix} `{self}`'s tagscript has been edited from {len(old_tagscript)} to {len(tagscript)} characters."
 
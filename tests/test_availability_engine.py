@@ -0,0 +1,39 @@
+import pathlib
+import sys
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("numpy")
+pytz = pytest.importorskip("pytz")
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+engine = pytest.importorskip("availability.engine")
+
+
+def attendee(start: str, end: str):
+    return {"optimal": [{"from": start, "to": end}], "suboptimal": []}
+
+
+def test_common_hours_need_overlapping_slots():
+    grid = engine.AvailabilityGrid(
+        {
+            "1": attendee("2024-01-01T10:00:00+00:00", "2024-01-01T10:15:00+00:00"),
+            "2": attendee("2024-01-01T10:45:00+00:00", "2024-01-01T11:00:00+00:00"),
+        }
+    )
+    assert grid.counts().tolist() == [1, 0, 0, 1]
+    assert grid.best_windows(2, timedelta(minutes=15)) == []
+    assert grid.common_hours(pytz.UTC).tolist() == []
+
+
+def test_common_hours_with_overlapping_slots():
+    grid = engine.AvailabilityGrid(
+        {
+            "1": attendee("2024-01-01T10:00:00+00:00", "2024-01-01T11:30:00+00:00"),
+            "2": attendee("2024-01-01T11:15:00+00:00", "2024-01-01T12:00:00+00:00"),
+        }
+    )
+    hours, *_ = grid.hourly(pytz.UTC)
+    common = grid.common_hours(pytz.UTC).tolist()
+    assert [hours[column].hour for column in common] == [11]
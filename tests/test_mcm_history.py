@@ -0,0 +1,52 @@
+import importlib.util
+import pathlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# load the module on its own, the mcm package needs a running Red to import
+spec = importlib.util.spec_from_file_location(
+    "mcm_history",
+    pathlib.Path(__file__).parent.parent / "mcm" / "common" / "history.py",
+)
+history = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(history)
+
+
+def torn(path: pathlib.Path, column: str, rows: int):
+    """Cut the last ``rows`` rows off a column, like a crash mid append would."""
+    dtype = history.SUBMISSION_COLUMNS.get(column) or history.ROW_COLUMNS[column]
+    file = path / f"{column}.bin"
+    with file.open("r+b") as f:
+        f.truncate(file.stat().st_size - rows * dtype.itemsize)
+
+
+def test_torn_row_append(tmp_path):
+    h = history.GuildHistory(tmp_path)
+    h.append(1, 10, {"car": 1, "bike": 2})
+    h.append(2, 11, {"car": 3})
+    torn(tmp_path, "amount", 1)
+
+    h = history.GuildHistory(tmp_path)
+    assert len(h) == 1
+    h.append(3, 11, {"car": 5, "bike": 1})
+    assert len(h.read("vehicle")) == len(h.read("amount")) == 4
+    assert h.vehicle_totals("car", [1, 2, 3]) == [1, 1, 6]
+    assert h.vehicle_totals("bike", [3]) == [3]
+
+
+def test_torn_submission_append(tmp_path):
+    h = history.GuildHistory(tmp_path)
+    h.append(1, 10, {"car": 1})
+    h.append(2, 10, {"car": 4, "bike": 2})
+    torn(tmp_path, "count", 1)
+    torn(tmp_path, "offset", 1)
+
+    h = history.GuildHistory(tmp_path)
+    assert len(h) == 1
+    assert len(h.read("vehicle")) == len(h.read("amount")) == 1
+    h.append(3, 11, {"bike": 7})
+    assert h.vehicle_totals("car", [3]) == [1]
+    assert h.vehicle_totals("bike", [3]) == [7]
+    assert h.read("total").tolist() == [1, 7]
@@ -7,6 +7,7 @@ if TYPE_CHECKING:
     from redbot.core.bot import Red
 
     from .common.models import DB
+    from .common.updates import ChartUpdater
 
 
 class CompositeMetaClass(CogMeta, ABCMeta):
@@ -19,6 +20,8 @@ class MixinMeta(ABC):
     def __init__(self, *_args):
         self.bot: "Red"
         self.db: "DB"
+        self.charts: dict[int, tuple[str, bytes]]
+        self.updater: "ChartUpdater"
 
     @abstractmethod
     def save(self) -> None:
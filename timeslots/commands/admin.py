@@ -1,4 +1,3 @@
-import asyncio
 import typing
 
 import discord
@@ -70,10 +69,7 @@ class Admin(MixinMeta):
                     f"I have updated it in my memory but you will have to manually delete it {confmessage.jump_url}."
                 )
             conf.started_on = conf.started_on or discord.utils.utcnow().date()
-            chart = await asyncio.to_thread(
-                TimeSlotsGenerator(self, ctx.guild).get_colored_organized_chart,
-                {uid: data.reserved_times for uid, data in conf.users.items()},
-            )
+            chart = await TimeSlotsGenerator(self, ctx.guild).get_chart()
             msg = await channel.send(
                 content=f"## Time Slot Selection for the week {conf.started_on.strftime('%A %m/%d/%Y')} to {conf.next_chart_reset.strftime('%A %m/%d/%Y')}",
                 file=discord.File(chart, "timeslots.png"),
@@ -147,10 +143,7 @@ class Admin(MixinMeta):
                     "The slot selection message does not exist anymore."
                 )
 
-            chart = await asyncio.to_thread(
-                TimeSlotsGenerator(self, ctx.guild).get_colored_organized_chart,
-                {uid: data.reserved_times for uid, data in conf.users.items()},
-            )
+            chart = await TimeSlotsGenerator(self, ctx.guild).get_chart()
             await confmessage.edit(
                 content=f"## Time Slot Selection for the week {conf.started_on.strftime('%A %m/%d/%Y')} to {conf.next_chart_reset.strftime('%A %m/%d/%Y')}",
                 attachments=[discord.File(chart, "timeslots.png")],
@@ -186,6 +179,20 @@ class Admin(MixinMeta):
         self.save()
         await ctx.send(f"Timezone set to UTC{utcoffset:+}")
 
+    @timeslots.command(name="updatestats", hidden=True)
+    @commands.is_owner()
+    async def updatestats(self, ctx: commands.Context):
+        """Show stats of the slot selection message updates"""
+        updater = self.updater
+        await ctx.send(
+            f"Pending updates: **{updater.queue_depth}**\n"
+            f"Requests: **{updater.requests}**\n"
+            f"Updates: **{updater.updates}** ({updater.failures} failed)\n"
+            f"Last render time: **{updater.last_render_time * 1000:.1f}ms**\n"
+            f"Average render time: **{updater.average_render_time * 1000:.1f}ms**\n"
+            f"Update interval: **{updater.interval}s**"
+        )
+
     @timeslots.command(name="showsettings", aliases=["settings", "ss"])
     async def showsettings(self, ctx: commands.Context):
         """Show the current settings for the guild"""
@@ -1,20 +1,166 @@
+import asyncio
 import datetime
+import hashlib
 import typing
 from io import BytesIO
 
 import discord
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas
-from matplotlib.patches import Patch
 from redbot.core.utils.chat_formatting import humanize_list
 
-from ..common.models import DAYS
+from ..common.models import DAYS, GuildSettings
 from ..common.utils import dates_iter
 
 if typing.TYPE_CHECKING:
     from ..main import TimeSlots
 
+EMPTY_CELL = "■" * 11
+WHITE = (1.0, 1.0, 1.0)
+
+
+class Occupancy:
+    """Which users reserved which hour of the week.
+
+    ``bits`` is a 7x24 matrix (day of the week x hour) of user bitsets, bit ``i`` of a
+    cell is set if the ``i``th user reserved that hour. The bitsets are packed into bytes
+    along the last axis so the matrix is ``(7, 24, ceil(users / 8))``."""
+
+    def __init__(self, names: list[str], colors: np.ndarray, bits: np.ndarray):
+        self.names = names
+        self.colors = colors
+        self.bits = bits
+
+    @classmethod
+    def from_conf(cls, guild: discord.Guild, conf: GuildSettings) -> "Occupancy":
+        names: list[str] = []
+        colors: list[tuple[float, float, float]] = []
+        grids: list[np.ndarray] = []
+        for uid, data in conf.users.items():
+            member = guild.get_member(uid)
+            if not member or not any(data.reserved_times.values()):
+                continue
+
+            grid = np.zeros((len(DAYS), 24), bool)
+            for day, times in data.reserved_times.items():
+                grid[int(day), times] = True
+            names.append(member.display_name)
+            colors.append(data.color)
+            grids.append(grid)
+
+        users = np.zeros((len(DAYS), 24, len(grids)), bool)
+        if grids:
+            users = np.stack(grids, axis=-1)
+        return cls(
+            names,
+            np.array(colors, float).reshape(-1, 3),
+            np.packbits(users, axis=-1, bitorder="little"),
+        )
+
+    @property
+    def users(self) -> np.ndarray:
+        """The unpacked ``(7, 24, users)`` boolean matrix."""
+        return np.unpackbits(
+            self.bits, axis=-1, count=len(self.names), bitorder="little"
+        ).astype(bool)
+
+    def fingerprint(self, *extra: typing.Any) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.bits.tobytes())
+        digest.update(self.colors.tobytes())
+        digest.update(repr((self.names, extra)).encode())
+        return digest.hexdigest()
+
+    def blended_colors(self) -> np.ndarray:
+        """The average colour of the users in every cell, white for empty cells."""
+        users = self.users
+        counts = users.sum(axis=-1, keepdims=True)
+        summed = users.astype(float) @ self.colors
+        return np.where(counts > 0, summed / np.maximum(counts, 1), WHITE)
+
+    def cell_text(self) -> np.ndarray:
+        users = self.users
+        text = np.full((len(DAYS), 24), EMPTY_CELL, object)
+        for day, hour in zip(*np.nonzero(users.any(axis=-1))):
+            text[day, hour] = "\n".join(
+                self.names[i] for i in np.flatnonzero(users[day, hour])
+            )
+        return text
+
+    def legend(self, colors: np.ndarray) -> dict[tuple[str, ...], np.ndarray]:
+        """Every distinct group of users sharing a cell and the colour of that group."""
+        flat = self.bits.reshape(-1, self.bits.shape[-1])
+        occupied = np.flatnonzero(flat.any(axis=-1))
+        if not len(occupied):
+            return {}
+
+        _, first = np.unique(flat[occupied], axis=0, return_index=True)
+        users = self.users.reshape(-1, len(self.names))
+        colors = colors.reshape(-1, 3)
+        legend = {}
+        # single users first, then the groups, each in the order they first appear
+        for cell in sorted(occupied[np.sort(first)], key=lambda c: users[c].sum()):
+            group = tuple(self.names[i] for i in np.flatnonzero(users[cell]))
+            legend[group] = colors[cell]
+        return legend
+
+
+def render_chart(
+    columns: list[str],
+    text: np.ndarray,
+    colors: np.ndarray,
+    legend: dict[tuple[str, ...], np.ndarray],
+) -> bytes:
+    """Render the chart as a PNG. ``text`` and ``colors`` are indexed (hour, column)."""
+    # matplotlib is only needed here, so don't pay for importing it at cog load
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+
+    fig = Figure(figsize=(10, 15))
+    ax = fig.subplots()
+    ax.axis("off")  # Hide the axes
+
+    rows = [f"{hour:02d}:00" for hour in range(24)]
+    row_heights = [
+        0.025 * max(cell.count("\n") + 1 for cell in row) for row in text
+    ]  # Count lines in each cell
+
+    table = ax.table(
+        cellText=text.tolist(),
+        rowLabels=rows,
+        colLabels=columns,
+        loc="center",
+        cellColours=colors.tolist(),
+    )
+
+    for i, row_height in enumerate(row_heights, 1):
+        table._cells[(i, -1)].set_height(row_height)  # Adjust height for row labels
+        for j in range(len(columns)):
+            if i == 1:
+                table._cells[(i - 1, j)].set_height(0.03)
+            table._cells[(i, j)].set_height(row_height)  # Adjust cell heights
+
+    table.auto_set_font_size(False)
+    table.set_fontsize(10)
+    table.auto_set_column_width(col=list(range(len(columns))))
+    table.scale(2.5, 1)
+
+    if legend:
+        fig.legend(
+            handles=[
+                Patch(facecolor=color, edgecolor="black", label=humanize_list(users))
+                for users, color in legend.items()
+            ],
+            loc="lower center",
+            bbox_to_anchor=(0.5, -0.1),
+            ncol=2,
+            fontsize=12,
+        )
+
+    fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+    io = BytesIO()
+    fig.savefig(io, bbox_inches="tight", format="png")
+    return io.getvalue()
+
 
 class TimeSlotsGenerator:
     def __init__(self, cog: "TimeSlots", guild: discord.Guild):
@@ -23,163 +169,41 @@ class TimeSlotsGenerator:
         self.guild = guild
         self.conf = cog.db.get_conf(guild.id)
 
-    def get_user_color(self, uid: int) -> tuple[float, float, float]:
-        return self.conf.get_user(uid).color
-
-    @staticmethod
-    def get_merged_color(
-        *colors: tuple[float, float, float],
-    ) -> tuple[float, float, float]:
-        if not colors:
-            return (1, 1, 1)  # Default to white if no colors are provided
-        blended_color = np.mean(colors, axis=0)  # Average the RGB values
-        return tuple(blended_color)
-
-    @staticmethod
-    def color_string_to_tuple(color_string: str) -> tuple[float, float, float]:
-        if isinstance(color_string, tuple) and len(color_string) == 3:
-            return color_string
-        if color_string.count(",") != 2:
-            raise ValueError(f"Invalid color string: {color_string}")
-        return tuple(map(float, color_string.split(",")))
-
-    @staticmethod
-    def color_tuple_to_string(color: tuple[float, float, float]) -> str:
-        return ",".join(map(str, color))
-
-    def color_chart(
-        self,
-        time_chart: pandas.DataFrame,
-        color_chart: pandas.DataFrame,
-        user_timeslots: dict[int, dict[DAYS, list[int]]],
-        day_to_date: dict[DAYS, str],
-    ):
-        user_colors: dict[tuple[str], tuple[float, float, float]] = {}
-        for uid, timeslots in user_timeslots.items():
-            user = self.guild.get_member(uid)
-            if not user:
-                continue
-            for day, times in timeslots.items():
-                day = day_to_date[day]
-                for time in times:
-                    ftime = f"{time:02d}:00"
-                    ccat = color_chart.at[ftime, day]
-                    if ccat != "1,1,1":
-                        color = self.get_merged_color(
-                            self.color_string_to_tuple(ccat),
-                            self.color_string_to_tuple(self.get_user_color(uid)),
-                        )
-                        color_chart.at[ftime, day] = self.color_tuple_to_string(color)
-                        time_chart.at[ftime, day] += f"\n{user.display_name}"
-                        listed_users: list[str] = time_chart.at[ftime, day].split("\n")
-                        user_colors[tuple(listed_users)] = color
-
-                    else:
-                        color = user_colors[(user.display_name,)] = self.get_user_color(
-                            uid
-                        )
-                        color_chart.at[ftime, day] = self.color_tuple_to_string(color)
-                        time_chart.at[ftime, day] = user.display_name
-
-        return user_colors
-
-    def visualize_time_chart(
-        self,
-        time_chart: pandas.DataFrame,
-        color_chart: pandas.DataFrame,
-        user_colors: dict[tuple[str], tuple[float, float, float]],
-    ):
-        fig, ax = plt.subplots(figsize=(10, 15))
-        ax.axis("off")  # Hide the axes
-
-        row_heights = [
-            0.025
-            * max(
-                cell.count("\n") + 1 for cell in time_chart.loc[row]
-            )  # Count lines in each cell
-            for row in time_chart.index
-        ]
-
-        # Create the table
-        table = ax.table(
-            cellText=time_chart.values,
-            rowLabels=time_chart.index,
-            colLabels=time_chart.columns,
-            loc="center",
-            cellColours=[
-                [
-                    self.color_string_to_tuple(color_chart.at[row, col])
-                    for col in color_chart.columns
-                ]
-                for row in color_chart.index
-            ],
-        )
-
-        for i, row_height in enumerate(row_heights, 1):
-            table._cells[(i, -1)].set_height(row_height)  # Adjust height for row labels
-            for j in range(len(time_chart.columns)):
-                if i == 1:
-                    table._cells[(i - 1, j)].set_height(0.03)
-                table._cells[(i, j)].set_height(row_height)  # Adjust cell heights
-
-        table.auto_set_font_size(False)
-        table.set_fontsize(10)
-        table.auto_set_column_width(col=list(range(len(color_chart.columns))))
-        table.scale(2.5, 1)
-
-        legend_handles = [
-            Patch(
-                facecolor=self.color_string_to_tuple(color),
-                edgecolor="black",
-                label=humanize_list(users),
-            )
-            for users, color in user_colors.items()
-        ]
-
-        if user_colors:
-            fig.legend(
-                handles=legend_handles,
-                loc="lower center",
-                bbox_to_anchor=(0.5, -0.1),
-                ncol=2,
-                fontsize=12,
-            )
-
-        fig.tight_layout(rect=[0, 0.03, 1, 0.95])
-        io = BytesIO()
-        fig.savefig(io, bbox_inches="tight")
-        io.seek(0)
-        return io
-
-    @staticmethod
-    def get_blank_chart(fillvalue):
-        return pandas.DataFrame(
-            index=[f"{hour:02d}:00" for hour in range(24)],
-            columns=[day.name.title() for day in DAYS],
-        ).fillna(fillvalue)
-
-    def get_colored_organized_chart(
-        self, user_timeslots: dict[int, dict[DAYS, list[int]]]
-    ):
+    def get_dates(self) -> list[datetime.date]:
         assert self.conf.next_chart_reset is not None
-        colour_chart = self.get_blank_chart("1,1,1")
-        time_chart = self.get_blank_chart("■" * 11)
-        user_colors = {}
-        day_to_date = {
-            DAYS(date.weekday()): date.strftime("%A\n%m/%d/%Y")
-            for date in dates_iter(
+        return list(
+            dates_iter(
                 self.conf.next_chart_reset - datetime.timedelta(days=6),
                 self.conf.next_chart_reset,
             )
-        }
-        colour_chart.columns = time_chart.columns = list(day_to_date.values())
-        if user_timeslots:
-            user_colors = self.color_chart(
-                time_chart=time_chart,
-                color_chart=colour_chart,
-                user_timeslots=user_timeslots,
-                day_to_date=day_to_date,
-            )
-        return self.visualize_time_chart(
-            time_chart=time_chart, color_chart=colour_chart, user_colors=user_colors
         )
+
+    async def get_chart(self) -> BytesIO:
+        """The chart of the guild's current reservations.
+
+        The rendered chart is cached per guild and only rendered again once the
+        reservations, the users' names or colours, or the week change."""
+        occupancy = Occupancy.from_conf(self.guild, self.conf)
+        dates = self.get_dates()
+        key = occupancy.fingerprint(dates)
+
+        cached = self.cog.charts.get(self.guild.id)
+        if cached is None or cached[0] != key:
+
+            def render():
+                # columns are the days of the week in order of their dates
+                order = [date.weekday() for date in dates]
+                colors = occupancy.blended_colors()
+                return render_chart(
+                    [date.strftime("%A\n%m/%d/%Y") for date in dates],
+                    occupancy.cell_text()[order].T,
+                    colors[order].transpose(1, 0, 2),
+                    occupancy.legend(colors),
+                )
+
+            cached = self.cog.charts[self.guild.id] = (
+                key,
+                await asyncio.to_thread(render),
+            )
+
+        return BytesIO(cached[1])
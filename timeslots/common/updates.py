@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+import typing
+
+import discord
+
+from ..views.updatemytimes import UpdateMyTimes
+from .timeslotgen import TimeSlotsGenerator
+
+if typing.TYPE_CHECKING:
+    from ..main import TimeSlots
+
+log = logging.getLogger("red.craycogs.timeslots.updates")
+
+
+class ChartUpdater:
+    """Debounced updates of the slot selection messages.
+
+    Asking for a guild's message to be updated schedules an update ``interval`` seconds
+    later, and every request for that guild until then is folded into it, so a burst of
+    submissions costs one render and one edit."""
+
+    def __init__(self, cog: "TimeSlots", interval: float = 10.0):
+        self.cog = cog
+        self.interval = interval
+        self._pending: dict[int, asyncio.Task[None]] = {}
+
+        self.requests = 0
+        self.updates = 0
+        self.failures = 0
+        self.last_render_time = 0.0
+        self.total_render_time = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def average_render_time(self) -> float:
+        return self.total_render_time / self.updates if self.updates else 0.0
+
+    def request(self, guild_id: int):
+        self.requests += 1
+        if guild_id not in self._pending:
+            self._pending[guild_id] = asyncio.create_task(self._update_later(guild_id))
+
+    async def close(self):
+        """Make the pending updates right away instead of waiting out their interval."""
+        pending, self._pending = self._pending, {}
+        for task in pending.values():
+            task.cancel()
+        await asyncio.gather(*map(self._update_now, pending))
+
+    async def _update_later(self, guild_id: int):
+        await asyncio.sleep(self.interval)
+        # requests made while this update runs get an update of their own
+        self._pending.pop(guild_id, None)
+        await self._update_now(guild_id)
+
+    async def _update_now(self, guild_id: int):
+        try:
+            await self.update(guild_id)
+        except Exception as e:
+            self.failures += 1
+            log.exception(
+                "Failed to update the slot selection message of guild %d",
+                guild_id,
+                exc_info=e,
+            )
+
+    async def update(self, guild_id: int):
+        guild = self.cog.bot.get_guild(guild_id)
+        conf = self.cog.db.get_conf(guild_id)
+        if not guild or not conf.started_on:
+            return
+
+        channel = guild.get_channel(conf.slot_selection_channel)
+        if not channel:
+            return
+
+        start = time.perf_counter()
+        io = await TimeSlotsGenerator(self.cog, guild).get_chart()
+        self.last_render_time = time.perf_counter() - start
+        self.total_render_time += self.last_render_time
+
+        await channel.get_partial_message(conf.slot_selection_message).edit(
+            content=f"## Time Slot Selection for the week {conf.started_on.strftime('%A %m/%d/%Y')} to {conf.next_chart_reset.strftime('%A %m/%d/%Y')}",
+            attachments=[discord.File(io, "timeslots.png")],
+            view=discord.ui.View(timeout=None).add_item(UpdateMyTimes()),
+        )
+        self.updates += 1
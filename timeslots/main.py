@@ -8,6 +8,7 @@ from redbot.core.bot import Red
 from .abc import CompositeMetaClass
 from .commands import Commands
 from .common.models import DB
+from .common.updates import ChartUpdater
 from .listeners import Listeners
 from .tasks import TaskLoops
 from .views.updatemytimes import UpdateMyTimes
@@ -43,6 +44,9 @@ class TimeSlots(
         self.config.register_global(db={})
         self.db: DB = DB()
         self.saving: asyncio.Future[t.Literal[True]] | t.Literal[False] = False
+        # guild id -> (fingerprint of the chart's contents, rendered PNG)
+        self.charts: dict[int, tuple[str, bytes]] = {}
+        self.updater = ChartUpdater(self)
         self.reset_task = self.reset_chart.start()
 
     def format_help_for_context(self, ctx: commands.Context):
@@ -69,6 +73,7 @@ class TimeSlots(
     async def cog_unload(self):
         self.bot.remove_dynamic_items(UpdateMyTimes)
         self.reset_task.cancel()
+        await self.updater.close()
 
     def save(self) -> None:
         async def _save():
@@ -60,9 +60,7 @@ class TaskLoops(MixinMeta, metaclass=CompositeMetaClass):
                 channel = self.bot.get_channel(conf.slot_selection_channel)
                 if channel:
                     message = channel.get_partial_message(conf.slot_selection_message)
-                    io = await asyncio.to_thread(
-                        TimeSlotsGenerator(self, guild).get_colored_organized_chart, {}
-                    )
+                    io = await TimeSlotsGenerator(self, guild).get_chart()
                     await message.edit(attachments=[discord.File(io, "timeslots.png")])
                 else:
                     log.warning(
@@ -1,4 +1,3 @@
-import asyncio
 import datetime
 import re
 import typing
@@ -8,7 +7,6 @@ import discord.ui
 from redbot.core.bot import Red
 
 from ..common.models import DAYS
-from ..common.timeslotgen import TimeSlotsGenerator
 from ..common.utils import dates_iter
 from .utilviews import SelectView
 
@@ -115,21 +113,9 @@ class UpdateMyTimes(
         user.reserved_times[day] = times
         cog.save()
 
-        await interaction.edit_original_response(
-            content="Please wait...\nGenerating the new timeslots chart. This may take a while.",
-            attachments=[],
-            view=None,
-        )
-
-        timeslots = {uid: data.reserved_times for uid, data in conf.users.items()}
-
-        io = await asyncio.to_thread(
-            TimeSlotsGenerator(cog, interaction.guild).get_colored_organized_chart,
-            timeslots,
-        )
-
-        await interaction.edit_original_response(
-            content=f"## Time Slot Selection for the week {conf.started_on.strftime('%A %m/%d/%Y')} to {conf.next_chart_reset.strftime('%A %m/%d/%Y')}",
-            attachments=[discord.File(io, "timeslots.png")],
-            view=self.view,
+        await interaction.followup.send(
+            f"Your times for {day.name.title()} have been updated. "
+            "The timeslots chart will be refreshed shortly.",
+            ephemeral=True,
         )
+        cog.updater.request(interaction.guild.id)
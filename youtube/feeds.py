@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+import aiohttp
+import feedparser
+from redbot.core.utils import bounded_gather
+
+YOUTUBE_FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+
+log = logging.getLogger("red.craycogs.youtube.feeds")
+
+
+@dataclass
+class FeedState:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    entries: list = field(default_factory=list)
+    # whether the feed was ever fetched, until then its entries say nothing
+    fetched: bool = False
+
+
+class FeedHub:
+    """
+    Fetches the RSS feeds of youtube channels for all guilds at once.
+
+    Every channel is fetched once per check however many guilds subscribe to it, with at
+    most ``concurrency`` requests at a time. The ETag and Last-Modified headers of every feed
+    are sent back on the next fetch, so feeds that didn't change aren't downloaded or parsed
+    again and their last entries are reused.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, concurrency: int = 8):
+        self.session = session
+        self.concurrency = concurrency
+        self.feeds: dict[str, FeedState] = {}
+
+        self.fetches = 0
+        self.not_modified = 0
+        self.failures = 0
+
+    async def fetch(self, channel_id: str) -> Optional[list]:
+        state = self.feeds.setdefault(channel_id, FeedState())
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+
+        self.fetches += 1
+        try:
+            async with self.session.get(
+                YOUTUBE_FEED_URL.format(channel_id=channel_id), headers=headers
+            ) as resp:
+                if resp.status == 304:
+                    self.not_modified += 1
+                    return state.entries
+
+                if resp.status != 200:
+                    self.failures += 1
+                    log.error(
+                        f"Failed to fetch feed for channel {channel_id}, error code: {resp.status} ({resp.reason})",
+                    )
+                    return None
+
+                text = await resp.text()
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.failures += 1
+            log.error(f"Failed to fetch feed for channel {channel_id}", exc_info=e)
+            return None
+
+        feed = await asyncio.to_thread(feedparser.parse, text)
+        state.etag, state.last_modified = etag, last_modified
+        state.entries = feed["entries"]
+        state.fetched = True
+        log.debug(f"Got {len(state.entries)} videos from channel {channel_id}")
+        return state.entries
+
+    def last_entries(self, channel_id: str) -> Optional[list]:
+        """
+        The entries of a channel's feed as of the last successful fetch, or None if it
+        wasn't fetched successfully yet.
+        """
+        state = self.feeds.get(channel_id)
+        return state.entries if state and state.fetched else None
+
+    async def fetch_all(self, channel_ids: Iterable[str]) -> dict[str, list]:
+        """The entries of every feed that could be fetched."""
+        channel_ids = list(set(channel_ids))
+        # forget the feeds no guild subscribes to anymore
+        for channel_id in self.feeds.keys() - set(channel_ids):
+            del self.feeds[channel_id]
+
+        results = await bounded_gather(
+            *map(self.fetch, channel_ids), limit=self.concurrency
+        )
+        return {
+            channel_id: entries
+            for channel_id, entries in zip(channel_ids, results)
+            if entries is not None
+        }
+
+
+class SeenVideos:
+    """
+    The ids of the videos a guild was already notified of, and when they were first seen.
+
+    Ids are pruned once they're older than ``ttl`` seconds, and the oldest ones once there's
+    more than ``max_size`` of them, unless they're still in one of the guild's feeds, as they
+    would be posted again otherwise.
+    """
+
+    def __init__(self, seen: dict[str, float], ttl: float, max_size: int):
+        self.seen = seen
+        self.ttl = ttl
+        self.max_size = max_size
+
+    def __contains__(self, video_id: str):
+        return video_id in self.seen
+
+    def __len__(self):
+        return len(self.seen)
+
+    def add(self, video_ids: Iterable[str], now: Optional[float] = None):
+        now = now or time.time()
+        for video_id in video_ids:
+            self.seen.setdefault(video_id, now)
+
+    def prune(self, keep: set[str], now: Optional[float] = None) -> int:
+        """Drop the expired ids that aren't in ``keep``, returns how many were dropped."""
+        cutoff = (now or time.time()) - self.ttl
+        droppable = sorted(
+            (seen, video_id)
+            for video_id, seen in self.seen.items()
+            if video_id not in keep
+        )
+        overflow = len(self.seen) - self.max_size
+        dropped = 0
+        for seen, video_id in droppable:
+            if seen > cutoff and dropped >= overflow:
+                break
+            del self.seen[video_id]
+            dropped += 1
+        return dropped
@@ -3,7 +3,7 @@ import logging
 import re
 from datetime import datetime, timezone
 from pprint import pformat
-from typing import Optional, Union
+from typing import Iterable, Optional, Union
 
 import aiohttp
 import dateparser
@@ -16,12 +16,16 @@ from redbot.core.utils import bounded_gather
 from redbot.core.utils import chat_formatting as cf
 
 from .errors import APIError, InvalidYoutubeCredentials, YoutubeQuotaExceeded
+from .feeds import FeedHub, SeenVideos
 
-YOUTUBE_FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
 YOUTUBE_BASE_URL = "https://www.googleapis.com/youtube/v3"
 YOUTUBE_CHANNELS_ENDPOINT = YOUTUBE_BASE_URL + "/channels"
 YOUTUBE_VIDEOS_ENDPOINT = YOUTUBE_BASE_URL + "/videos"
 YOUTUBE_DURATION_REGEX = r"P(?:(?P<days>\d+)D)?T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?"
+YOUTUBE_VIDEOS_PER_REQUEST = 50
+
+SEEN_VIDEOS_TTL = 30 * 24 * 60 * 60
+SEEN_VIDEOS_MAX = 1000
 
 log = logging.getLogger("red.craycogs.youtube")
 
@@ -35,13 +39,15 @@ class Youtube(commands.Cog):
         default_guild = {
             "subscribed_channels": [],
             "last_checked": datetime.now(timezone.utc).isoformat(),
-            "posted_vids": [],
+            "posted_vids": [],  # old list of seen video ids, moved to seen_videos
+            "seen_videos": {},  # video id -> when it was first seen
             "post_channels": {},  # would be like {"shorts": channel_id, "videos": channel_id, "live": channel_id}
         }
         self.config.register_guild(**default_guild)
         self.config.register_global(checking_interval=300)
 
         self.session = aiohttp.ClientSession()
+        self.feeds = FeedHub(self.session)
         self.check_task = self.checking.start()
 
     async def cog_unload(self):
@@ -50,75 +56,66 @@ class Youtube(commands.Cog):
 
     @tasks.loop(seconds=1)
     async def checking(self):
+        guilds: dict[discord.Guild, dict] = {}
         for guild_id, data in (await self.config.all_guilds()).items():
             guild = self.bot.get_guild(guild_id)
             if guild is None:
                 continue
 
-            subscribed_channels = data["subscribed_channels"]
-            last_checked = datetime.fromisoformat(data["last_checked"])
-            post_channels = data["post_channels"]
-            posted_vids = data["posted_vids"]
-
-            if len(subscribed_channels) == 0 or all(
-                (val is None for val in post_channels.values())
+            if len(data["subscribed_channels"]) == 0 or all(
+                (val is None for val in data["post_channels"].values())
             ):
                 log.info(
                     f"Skipping checking subscribed channels for {guild_id} because there are either 0 subbed channel or No post channels set"
                 )
                 continue
 
-            ids = set()
-            msgs = []
-            latest_videos = set()
-            for channel_id in subscribed_channels:
-                async with self.session.get(
-                    YOUTUBE_FEED_URL.format(channel_id=channel_id)
-                ) as resp:
-                    if resp.status != 200:
-                        log.error(
-                            f"Failed to fetch feed for channel {channel_id}, error code: {resp.status} ({resp.reason})",
-                        )
-                        continue
+            guilds[guild] = data
 
-                    feed = feedparser.parse(await resp.text())
-                    videos = feed["entries"]
-                    log.debug(f"Got {len(videos)} videos from channel {channel_id}")
-                    latest_videos_cc = set(
-                        filter(
-                            lambda x:
-                            # datetime.strptime(
-                            #     x["published"], "%Y-%m-%dT%H:%M:%S%z"
-                            # )
-                            # >= last_checked and
-                            x["yt_videoid"] not in posted_vids,
-                            videos,
-                        )
-                    )
-                    latest_videos |= latest_videos_cc
-
-                    if len(latest_videos_cc) == 0:
-                        log.info(f"No new videos found from channel {channel_id}")
-                        continue
-
-                    ids |= {vid.yt_videoid for vid in latest_videos_cc}
+        feeds = await self.feeds.fetch_all(
+            channel_id
+            for data in guilds.values()
+            for channel_id in data["subscribed_channels"]
+        )
 
-                    log.info(
-                        f"Found {len(latest_videos_cc)} new videos from channel {channel_id}"
-                    )
+        new_videos: dict[discord.Guild, dict[str, feedparser.FeedParserDict]] = {}
+        seen_videos: dict[discord.Guild, SeenVideos] = {}
+        for guild, data in guilds.items():
+            seen = seen_videos[guild] = SeenVideos(
+                data["seen_videos"], SEEN_VIDEOS_TTL, SEEN_VIDEOS_MAX
+            )
+            latest_videos = new_videos[guild] = {}
+            for channel_id in data["subscribed_channels"]:
+                latest_videos_cc = [
+                    vid
+                    for vid in feeds.get(channel_id, [])
+                    if vid["yt_videoid"] not in seen
+                ]
+                if len(latest_videos_cc) == 0:
+                    log.info(f"No new videos found from channel {channel_id}")
+                    continue
+
+                latest_videos.update((vid.yt_videoid, vid) for vid in latest_videos_cc)
+                log.info(
+                    f"Found {len(latest_videos_cc)} new videos from channel {channel_id}"
+                )
 
-            try:
-                data = await self.get_video_data_from_id(ids)
+        ids = {
+            vid_id for latest_videos in new_videos.values() for vid_id in latest_videos
+        }
+        try:
+            videos = await self.get_video_data_from_id(ids)
 
-            except Exception as e:
-                log.error("Error fetching video data", exc_info=e)
-                continue
+        except Exception as e:
+            log.error("Error fetching video data", exc_info=e)
+            return
 
-            for ytvid in data:
-                reelvid = next(
-                    vid for vid in latest_videos if vid.yt_videoid == ytvid["id"]
-                )
-                # reelvid would always be present since we requested based on it
+        for guild, latest_videos in new_videos.items():
+            post_channels = guilds[guild]["post_channels"]
+            msgs = []
+            for vid_id, reelvid in latest_videos.items():
+                if not (ytvid := videos.get(vid_id)):
+                    continue
                 log.debug(pformat(ytvid))
                 log.debug(pformat(reelvid))
                 published = dateparser.parse(ytvid["snippet"]["publishedAt"])
@@ -173,15 +170,27 @@ class Youtube(commands.Cog):
                     )
             await bounded_gather(*msgs)
 
-            now = datetime.now(timezone.utc)
-            log.info(
-                f"Checked for new videos at human readabale time: {now.strftime('%c')}"
-            )
+            seen = seen_videos[guild]
+            seen.add(latest_videos)
+            # ids that are still in a feed have to be kept or they'd be posted again, so
+            # nothing is pruned until every feed of the guild was fetched at least once
+            entries = [
+                self.feeds.last_entries(channel_id)
+                for channel_id in guilds[guild]["subscribed_channels"]
+            ]
+            if None not in entries:
+                seen.prune(
+                    {vid["yt_videoid"] for channel in entries for vid in channel}
+                )
             await self.config.guild(guild).last_checked.set(
                 datetime.now(timezone.utc).isoformat()
             )
-            async with self.config.guild(guild).posted_vids() as posted_vids_conf:
-                posted_vids_conf.extend(ids)
+            await self.config.guild(guild).seen_videos.set(seen.seen)
+
+        now = datetime.now(timezone.utc)
+        log.info(
+            f"Checked {len(feeds)} channels for {len(guilds)} guilds at human readabale time: {now.strftime('%c')}"
+        )
 
     @checking.before_loop
     async def before_checking(self):
@@ -191,6 +200,17 @@ class Youtube(commands.Cog):
             return
         self.checking.change_interval(seconds=await self.config.checking_interval())
 
+        # posted_vids were kept without the time they were seen, so they count as seen now
+        now = datetime.now(timezone.utc).timestamp()
+        for guild_id, data in (await self.config.all_guilds()).items():
+            if data["posted_vids"]:
+                async with self.config.guild_from_id(
+                    guild_id
+                ).seen_videos() as seen_videos:
+                    for video_id in data["posted_vids"]:
+                        seen_videos.setdefault(video_id, now)
+                await self.config.guild_from_id(guild_id).posted_vids.clear()
+
     @checking.error
     async def checking_error(self, error):
         log.exception("There was an error in the youtube checking loop", exc_info=error)
@@ -208,7 +228,17 @@ class Youtube(commands.Cog):
 
         return seconds
 
-    async def get_video_data_from_id(self, video_ids: list[int]):
+    async def get_video_data_from_id(self, video_ids: Iterable[str]) -> dict[str, dict]:
+        """The data of the videos by their id, fetched in as few requests as possible."""
+        video_ids = list(video_ids)
+        chunks = [
+            video_ids[i : i + YOUTUBE_VIDEOS_PER_REQUEST]
+            for i in range(0, len(video_ids), YOUTUBE_VIDEOS_PER_REQUEST)
+        ]
+        results = await bounded_gather(*map(self._get_video_data, chunks))
+        return {video["id"]: video for items in results for video in items}
+
+    async def _get_video_data(self, video_ids: list[str]):
         params = {
             "part": "snippet,liveStreamingDetails,contentDetails",
             "id": ",".join(video_ids),